@@ -1,32 +1,217 @@
-from flask import Flask, render_template, request
+import hashlib
+import io
+import json
+import math
+import time
 
+from flask import Flask, Response, g, jsonify, render_template, request, stream_with_context
+
+from src.asgi_adapter import WsgiToAsgi
+from src.bulk_valuation import peek_columns, read_csv_rows, read_ndjson_rows, value_dcf_rows, write_csv, write_ndjson
 from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
 from src.discounted_cash_flow import DiscountedCashFlow
+from src.job_queue import JobQueueFull, job_queue
+from src.metrics import format_metric, request_metrics
+from src.scenario_set import ScenarioSet
+from src.valuation_cache import valuation_cache
 
 # Initialize Flask app
 application = Flask(__name__)
 
+# Seconds browsers and proxies may reuse a page or API result before revalidating it with its ETag
+STATIC_PAGE_MAX_AGE = 300
+API_RESULT_MAX_AGE = 3600
+
+# Part of every API result ETag. Bump it whenever a release can change the body returned for the same inputs, such
+# as a model fix or a serialization change, so clients holding an old ETag are not answered 304 with a stale body
+API_RESULT_VERSION = 2
+
+# Seconds a client should wait before polling an unfinished job again
+JOB_POLL_INTERVAL = 1
+
+# Most growth rates and most desired annual returns in one sensitivity grid, so a grid has at most 250,000 cells
+MAX_SENSITIVITY_RATES = 500
+
+# Longest horizon with a per-year breakdown, which bounds the size of every body kept in the valuation cache
+MAX_BREAKDOWN_YEARS = 1000
+
+DCF_PARAMETER_TYPES = {
+    "revenue": float,
+    "revenue_growth_rate": float,
+    "time_in_years": int,
+    "fcf_margin": float,
+    "desired_annual_return": float,
+    "terminal_multiple": float,
+    "terminal_method": str,
+    "terminal_growth_rate": float,
+}
+CAGR_PARAMETER_TYPES = {"starting_value": float, "ending_value": float, "time_in_years": int}
+
+# Template name -> (rendered page, ETag), filled in on the first request for each page
+_static_pages = {}
+
+
+def _time_phase(phase):
+    """
+    Times a phase of the current request, such as "parse" or "render", into the route's latency histogram.
+
+    :param phase: Phase name
+    :return: Context manager
+    """
+
+    return request_metrics.time(request.url_rule.rule, phase)
+
+
+def _calculate_cached(valuation_class, **parameters):
+    """
+    Same as valuation_cache.calculate(), timing construction and calculation separately on a cache miss.
+
+    :param valuation_class: DiscountedCashFlow or CompoundedAnnualGrowthRate
+    :param parameters: Constructor parameters
+    :return: Calculated value
+    """
+
+    def construct_and_calculate():
+        with _time_phase("construct"):
+            valuation = valuation_class(**parameters)
+
+        with _time_phase("calculate"):
+            return valuation.calculate()
+
+    return valuation_cache.get_or_compute(
+        valuation_cache.make_key(valuation_class.__name__, **parameters), construct_and_calculate
+    )
+
+
+def _static_page(template_name):
+    """
+    Serves a template without context variables from a page rendered once per process, with a strong ETag so
+    repeat visits are answered with 304 Not Modified. Pages are re-rendered on every request in debug mode, so
+    template edits show up immediately.
+
+    :param template_name: Template file name
+    :return: Response
+    """
+
+    page = _static_pages.get(template_name)
+
+    if page is None:
+        body = render_template(template_name).encode()
+        page = (body, hashlib.sha256(body).hexdigest())
+
+        if not application.debug:
+            _static_pages[template_name] = page
+
+    response = Response(page[0], mimetype="text/html")
+    response.set_etag(page[1])
+    response.cache_control.public = True
+    response.cache_control.max_age = STATIC_PAGE_MAX_AGE
+
+    return response.make_conditional(request)
+
+
+def _finite_or_none(values):
+    """
+    Replaces non-finite values, which JSON cannot represent, with None.
+
+    :param values: Iterable of floats
+    :return: List of floats and Nones
+    """
+
+    return [value if math.isfinite(value) else None for value in values]
+
+
+def _get_api_parameters(parameter_types):
+    """
+    Reads valuation parameters from the JSON body of a POST request, or from the query string of a GET request,
+    converting each query parameter with its type.
+
+    :param parameter_types: Dict mapping each parameter name to its type
+    :return: Dict of parameters
+    """
+
+    if request.method == "POST":
+        parameters = request.get_json(silent=True)
+
+        assert isinstance(parameters, dict), "request body must be a JSON object"
+
+        return parameters
+
+    parameters = {}
+
+    for name, value in request.args.items():
+        if name != "breakdown":
+            assert name in parameter_types, f"{name} is not a valuation parameter"
+
+            parameters[name] = parameter_types[name](value)
+
+    return parameters
+
+
+def _cached_api_response(compute, parameters):
+    """
+    Serves an API result from the valuation cache with a strong ETag derived from the cache key and
+    API_RESULT_VERSION, so the ETag is known before anything is computed. A GET or HEAD request whose If-None-Match matches is answered with 304 Not
+    Modified without computing or serializing the result.
+
+    :param compute: Function without arguments returning the response dict
+    :param parameters: Valuation parameters
+    :return: Response
+    """
+
+    key = valuation_cache.make_key(request.url_rule.rule, breakdown=request.args.get("breakdown"), **parameters)
+    etag = hashlib.sha256(repr((API_RESULT_VERSION, key)).encode()).hexdigest()
+
+    if request.method in ("GET", "HEAD") and request.if_none_match.contains(etag):
+        response = Response(status=304)
+
+    else:
+        body = valuation_cache.get_or_compute(key, lambda: json.dumps(compute(), separators=(",", ":")))
+        response = Response(body, mimetype="application/json")
+
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = API_RESULT_MAX_AGE
+
+    return response
+
+
+@application.before_request
+def start_request_timer():
+    g.request_started_at = time.perf_counter()
+
+
+@application.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    request_metrics.observe(route, "total", time.perf_counter() - g.request_started_at)
+    request_metrics.count_request(route, request.method, response.status_code)
+
+    return response
+
 
 @application.route("/", methods=["GET"])
 def index():
     if request.method == "GET":
-        return render_template("index.html")
+        return _static_page("index.html")
 
 
 @application.route("/dcf-calculator", methods=["GET", "POST"])
 def dcf_calculator():
     if request.method == "GET":
-        return render_template("dcf.html")
+        return _static_page("dcf.html")
 
     else:
-        revenue = float(request.form.get("revenue").replace(",", ""))
-        revenue_growth_rate = float(request.form.get("revenue-growth-rate"))
-        fcf_margin = float(request.form.get("fcf-margin"))
-        pfcf_ratio = float(request.form.get("pfcf-ratio"))
-        desired_annual_return = float(request.form.get("return"))
-        time_in_years = int(request.form.get("time"))
-
-        discounted_cash_flow = DiscountedCashFlow(
+        with _time_phase("parse"):
+            revenue = float(request.form.get("revenue").replace(",", ""))
+            revenue_growth_rate = float(request.form.get("revenue-growth-rate"))
+            fcf_margin = float(request.form.get("fcf-margin"))
+            pfcf_ratio = float(request.form.get("pfcf-ratio"))
+            desired_annual_return = float(request.form.get("return"))
+            time_in_years = int(request.form.get("time"))
+
+        dcf_value = _calculate_cached(
+            DiscountedCashFlow,
             revenue=revenue,
             revenue_growth_rate=revenue_growth_rate,
             time_in_years=time_in_years,
@@ -34,31 +219,345 @@ def dcf_calculator():
             desired_annual_return=desired_annual_return,
             terminal_multiple=pfcf_ratio,
         )
-
-        dcf_value = discounted_cash_flow.calculate()
         dcf_value_formatted = "{:,.2f}".format(dcf_value)
 
-        return render_template("dcf.html", discounted_cash_flow=dcf_value_formatted)
+        with _time_phase("render"):
+            return render_template("dcf.html", discounted_cash_flow=dcf_value_formatted)
+
+
+def _parse_rates(value):
+    """
+    Parses a comma-separated list of percentages such as "5,7.5,10".
+
+    :param value: Comma-separated string
+    :return: List of floats
+    """
+
+    return [float(rate) for rate in value.split(",") if rate.strip()]
+
+
+@application.route("/dcf-calculator/sensitivity", methods=["GET", "POST"])
+def dcf_sensitivity():
+    try:
+        with _time_phase("parse"):
+            revenue = float(request.values.get("revenue").replace(",", ""))
+            fcf_margin = float(request.values.get("fcf-margin"))
+            pfcf_ratio = float(request.values.get("pfcf-ratio"))
+            time_in_years = int(request.values.get("time"))
+            growth_rates = _parse_rates(request.values.get("revenue-growth-rates"))
+            discount_rates = _parse_rates(request.values.get("returns"))
+
+            assert (
+                len(growth_rates) <= MAX_SENSITIVITY_RATES
+            ), f"revenue-growth-rates must have at most {MAX_SENSITIVITY_RATES} rates"
+            assert (
+                len(discount_rates) <= MAX_SENSITIVITY_RATES
+            ), f"returns must have at most {MAX_SENSITIVITY_RATES} rates"
+
+        with _time_phase("construct"):
+            discounted_cash_flow = DiscountedCashFlow(
+                revenue=revenue,
+                time_in_years=time_in_years,
+                fcf_margin=fcf_margin,
+                terminal_multiple=pfcf_ratio,
+            )
+
+        with _time_phase("calculate"):
+            grid = discounted_cash_flow.sensitivity_grid(growth_rates, discount_rates)
+
+    except (AssertionError, AttributeError, TypeError, ValueError) as error:
+        return jsonify(error=str(error) or "invalid sensitivity grid parameters"), 400
+
+    # Cells whose DCF value is out of range are null in JSON and empty in CSV
+    values = [_finite_or_none(row) for row in grid.tolist()]
+
+    if request.values.get("format") == "csv":
+
+        def generate_csv():
+            yield ",".join(["revenue_growth_rate"] + [repr(rate) for rate in discount_rates]) + "\n"
+
+            for growth_rate, row in zip(growth_rates, values):
+                yield ",".join([repr(growth_rate)] + ["" if value is None else repr(value) for value in row]) + "\n"
+
+        return Response(generate_csv(), mimetype="text/csv")
+
+    return jsonify(revenue_growth_rates=growth_rates, desired_annual_returns=discount_rates, values=values)
 
 
 @application.route("/cagr-calculator", methods=["GET", "POST"])
 def cagr_calculator():
     if request.method == "GET":
-        return render_template("cagr.html")
+        return _static_page("cagr.html")
 
     else:
-        starting_value = float(request.form.get("starting-value"))
-        ending_value = float(request.form.get("ending-value"))
-        time_in_years = int(request.form.get("time"))
+        with _time_phase("parse"):
+            starting_value = float(request.form.get("starting-value"))
+            ending_value = float(request.form.get("ending-value"))
+            time_in_years = int(request.form.get("time"))
 
-        cagr = CompoundedAnnualGrowthRate(
-            starting_value=starting_value, ending_value=ending_value, time_in_years=time_in_years
+        cagr_value = _calculate_cached(
+            CompoundedAnnualGrowthRate,
+            starting_value=starting_value,
+            ending_value=ending_value,
+            time_in_years=time_in_years,
         )
-
-        cagr_value = cagr.calculate()
         cagr_value_formatted = "{:,.2f}".format(cagr_value)
 
-        return render_template("cagr.html", cagr=cagr_value_formatted)
+        with _time_phase("render"):
+            return render_template("cagr.html", cagr=cagr_value_formatted)
+
+
+@application.route("/api/v1/dcf", methods=["GET", "POST"])
+def dcf_api():
+    try:
+        with _time_phase("parse"):
+            parameters = _get_api_parameters(DCF_PARAMETER_TYPES)
+
+        def compute():
+            with _time_phase("construct"):
+                discounted_cash_flow = DiscountedCashFlow(**parameters)
+
+            with _time_phase("calculate"):
+                dcf_value = discounted_cash_flow.calculate()
+
+            assert math.isfinite(dcf_value), "dcf_value is out of range"
+
+            with _time_phase("render"):
+                response = {"dcf_value": dcf_value, "terminal_value": discounted_cash_flow.get_terminal_value()}
+
+                if request.args.get("breakdown", "true") != "false":
+                    assert discounted_cash_flow.time_in_years <= MAX_BREAKDOWN_YEARS, (
+                        f"time_in_years must be less than or equal to {MAX_BREAKDOWN_YEARS} with a breakdown; "
+                        "pass breakdown=false"
+                    )
+
+                    projection = discounted_cash_flow.get_projection()
+                    response["years"] = {
+                        component: _finite_or_none(values.tolist()) for component, values in projection.items()
+                    }
+
+                return response
+
+        return _cached_api_response(compute, parameters)
+
+    except (AssertionError, TypeError, ValueError) as error:
+        return jsonify(error=str(error)), 400
+
+    except ArithmeticError:
+        return jsonify(error="dcf_value is out of range"), 400
+
+
+@application.route("/api/v1/dcf/bulk", methods=["POST"])
+def dcf_bulk_api():
+    try:
+        chunk_size = int(request.args.get("chunk_size", 10_000))
+        assert chunk_size > 0, "chunk_size must be greater than 0"
+
+    except (AssertionError, ValueError) as error:
+        return jsonify(error=str(error)), 400
+
+    # The CSV output takes its header from the CSV input, so rows that cannot be read do not drop any column
+    columns = None
+
+    if "file" in request.files:
+        columns, lines = peek_columns(io.TextIOWrapper(request.files["file"].stream, encoding="utf-8"), "csv")
+        rows = read_csv_rows(lines)
+        output_format = "csv"
+
+    elif request.mimetype == "text/csv":
+        columns, lines = peek_columns(io.TextIOWrapper(request.stream, encoding="utf-8"), "csv")
+        rows = read_csv_rows(lines)
+        output_format = "csv"
+
+    elif request.mimetype == "application/x-ndjson":
+        rows = read_ndjson_rows(io.TextIOWrapper(request.stream, encoding="utf-8"))
+        output_format = "ndjson"
+
+    else:
+        rows = request.get_json(silent=True)
+        output_format = "ndjson"
+
+        if not isinstance(rows, list):
+            return jsonify(error="request body must be a JSON array, NDJSON or CSV"), 400
+
+    results = value_dcf_rows(rows, chunk_size=chunk_size)
+
+    if output_format == "csv":
+        return Response(stream_with_context(write_csv(results, columns=columns)), mimetype="text/csv")
+
+    return Response(stream_with_context(write_ndjson(results)), mimetype="application/x-ndjson")
+
+
+@application.route("/api/v1/dcf/scenarios", methods=["POST"])
+def dcf_scenarios_api():
+    try:
+        with _time_phase("parse"):
+            body = request.get_json(silent=True)
+
+            assert isinstance(body, dict), "request body must be a JSON object"
+            assert isinstance(body.get("base"), dict), "base must be a JSON object"
+            assert isinstance(body.get("scenarios"), list), "scenarios must be a JSON array"
+
+            scenarios = {}
+
+            for scenario in body["scenarios"]:
+                assert isinstance(scenario, dict) and "name" in scenario, "every scenario must be an object with a name"
+                assert scenario["name"] not in scenarios, f"scenario {scenario['name']} is not unique"
+
+                scenarios[scenario["name"]] = {key: value for key, value in scenario.items() if key != "name"}
+
+            scenario_set = ScenarioSet(scenarios)
+
+        with _time_phase("construct"):
+            discounted_cash_flow = DiscountedCashFlow(**body["base"])
+
+        with _time_phase("calculate"):
+            result = scenario_set.evaluate(discounted_cash_flow)
+
+        assert math.isfinite(result["weighted_value"]), "dcf_value is out of range"
+
+        return jsonify(
+            scenarios=[
+                {"name": name, "probability": scenario_set.probabilities[name], "dcf_value": dcf_value}
+                for name, dcf_value in result["values"].items()
+            ],
+            weighted_value=result["weighted_value"],
+        )
+
+    except (AssertionError, TypeError, ValueError) as error:
+        return jsonify(error=str(error)), 400
+
+    except ArithmeticError:
+        return jsonify(error="dcf_value is out of range"), 400
+
+
+@application.route("/api/v1/cagr", methods=["GET", "POST"])
+def cagr_api():
+    try:
+        with _time_phase("parse"):
+            parameters = _get_api_parameters(CAGR_PARAMETER_TYPES)
+
+        def compute():
+            cagr_value = _calculate_cached(CompoundedAnnualGrowthRate, **parameters)
+
+            assert math.isfinite(cagr_value), "cagr is out of range"
+
+            response = {"cagr": cagr_value}
+
+            if request.args.get("breakdown", "true") != "false":
+                assert parameters["time_in_years"] <= MAX_BREAKDOWN_YEARS, (
+                    f"time_in_years must be less than or equal to {MAX_BREAKDOWN_YEARS} with a breakdown; "
+                    "pass breakdown=false"
+                )
+
+                growth_factor = 1 + cagr_value / 100
+                starting_value = parameters["starting_value"]
+                response["years"] = {
+                    "value": [
+                        starting_value * growth_factor**time for time in range(1, parameters["time_in_years"] + 1)
+                    ]
+                }
+
+            return response
+
+        return _cached_api_response(compute, parameters)
+
+    except (AssertionError, TypeError, ValueError) as error:
+        return jsonify(error=str(error)), 400
+
+    except ArithmeticError:
+        return jsonify(error="cagr is out of range"), 400
+
+
+@application.route("/api/v1/jobs", methods=["GET", "POST"])
+def jobs_api():
+    if request.method == "GET":
+        return jsonify(job_queue.get_stats())
+
+    job = request.get_json(silent=True)
+
+    try:
+        assert isinstance(job, dict), "request body must be a JSON object"
+
+        job_id = job_queue.submit(job.get("type"), job.get("parameters", {}))
+
+    except AssertionError as error:
+        return jsonify(error=str(error)), 400
+
+    except JobQueueFull as error:
+        return jsonify(error=str(error)), 429, {"Retry-After": str(JOB_POLL_INTERVAL)}
+
+    return jsonify(job_queue.get(job_id)), 202, {"Location": f"/api/v1/jobs/{job_id}"}
+
+
+@application.route("/api/v1/jobs/<job_id>", methods=["GET"])
+def job_api(job_id):
+    # Polls never block: a request thread held by a waiting poller is one less for the calculator routes
+    job = job_queue.get(job_id)
+
+    if job is None:
+        return jsonify(error=f"job {job_id} does not exist"), 404
+
+    if job["status"] in ("queued", "running"):
+        return jsonify(job), 200, {"Retry-After": str(JOB_POLL_INTERVAL)}
+
+    return jsonify(job)
+
+
+@application.route("/api/v1/jobs/<job_id>/result", methods=["GET"])
+def job_result_api(job_id):
+    job = job_queue.get(job_id)
+
+    if job is None:
+        return jsonify(error=f"job {job_id} does not exist"), 404
+
+    if job["status"] == "failed":
+        return jsonify(error=job["error"]), 400
+
+    if job["status"] != "succeeded":
+        return jsonify(job), 202, {"Retry-After": str(JOB_POLL_INTERVAL)}
+
+    result = job_queue.get_result(job_id)
+
+    if job["type"] == "dcf_bulk":
+        return Response(write_ndjson(result), mimetype="application/x-ndjson")
+
+    return jsonify(result)
+
+
+@application.route("/metrics", methods=["GET"])
+def metrics():
+    cache_stats = valuation_cache.get_stats()
+    job_stats = job_queue.get_stats()
+    text = request_metrics.render()
+
+    for name, metric_type, description in [
+        ("hits", "counter", "Valuation cache hits."),
+        ("misses", "counter", "Valuation cache misses."),
+        ("evictions", "counter", "Valuation cache evictions."),
+        ("expirations", "counter", "Valuation cache expirations."),
+        ("size", "gauge", "Valuations in the cache."),
+    ]:
+        suffix = "_total" if metric_type == "counter" else ""
+        text += format_metric(
+            f"valuation_cache_{name}{suffix}", metric_type, description, [("", {}, cache_stats[name])]
+        )
+
+    for name, metric_type, description in [
+        ("pending", "gauge", "Jobs queued or running."),
+        ("submitted", "counter", "Submitted jobs."),
+        ("rejected", "counter", "Jobs rejected because the queue was full."),
+        ("succeeded", "counter", "Succeeded jobs."),
+        ("failed", "counter", "Failed jobs."),
+    ]:
+        suffix = "_total" if metric_type == "counter" else ""
+        text += format_metric(f"valuation_jobs_{name}{suffix}", metric_type, description, [("", {}, job_stats[name])])
+
+    return Response(text, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ASGI entry point, served with e.g. "uvicorn application:asgi_application"
+asgi_application = WsgiToAsgi(application)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+"""
+Benchmarks of the DCF and CAGR hot paths with a regression gate.
+
+Every benchmark is timed with timeit and reported in operations per second, best of --repeat runs. The results
+are compared with benchmarks/baseline.json, and the script exits with status 1 if any benchmark is more than
+--threshold slower than its baseline in two consecutive measurements. Run from the repository root:
+
+    python benchmarks/bench_valuation.py
+    python benchmarks/bench_valuation.py --filter batch
+    python benchmarks/bench_valuation.py --update-baseline
+
+Baselines are machine specific; update them on the machine that runs the gate.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(REPOSITORY_ROOT, "benchmarks", "baseline.json")
+
+sys.path.insert(0, REPOSITORY_ROOT)
+
+from application import application  # noqa: E402
+from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate  # noqa: E402
+from src.discounted_cash_flow import DiscountedCashFlow  # noqa: E402
+from src.valuation_cache import valuation_cache  # noqa: E402
+
+DCF_ASSUMPTIONS = {
+    "revenue": 1_000_000,
+    "revenue_growth_rate": 5,
+    "time_in_years": 10,
+    "fcf_margin": 10,
+    "desired_annual_return": 10,
+    "terminal_multiple": 10,
+}
+BATCH_SIZES = (1, 100, 10_000, 1_000_000)
+
+
+def get_batch_columns(size, seed=0):
+    """
+    Builds random DCF input columns in the constructor's units.
+
+    :param size: Number of rows
+    :param seed: Random seed
+    :return: Tuple of arrays in calculate_batch() order
+    """
+
+    generator = np.random.default_rng(seed)
+
+    return (
+        generator.uniform(1e6, 1e9, size),
+        generator.uniform(-10, 30, size),
+        generator.integers(1, 30, size),
+        generator.uniform(0, 40, size),
+        generator.uniform(5, 15, size),
+        generator.uniform(5, 30, size),
+    )
+
+
+def get_benchmarks():
+    """
+    Builds the benchmarks. Inputs are created here so only the calls themselves are timed.
+
+    :return: Dict mapping each benchmark name to a function without arguments
+    """
+
+    benchmarks = {
+        "dcf_calculate": lambda: DiscountedCashFlow(**DCF_ASSUMPTIONS).calculate(),
+        "dcf_calculate_1000_years": lambda: DiscountedCashFlow(**dict(DCF_ASSUMPTIONS, time_in_years=1000)).calculate(),
+        "dcf_calculate_reference_loop": lambda: DiscountedCashFlow(**DCF_ASSUMPTIONS).calculate(closed_form=False),
+        "cagr_calculate": lambda: CompoundedAnnualGrowthRate(100, 200, 10).calculate(),
+    }
+
+    dcf_object = DiscountedCashFlow(**DCF_ASSUMPTIONS)
+
+    def update_terminal_multiple():
+        dcf_object.terminal_multiple = 12
+        return dcf_object.calculate()
+
+    benchmarks["dcf_recalculate_terminal_multiple"] = update_terminal_multiple
+
+    for size in BATCH_SIZES:
+        columns = get_batch_columns(size)
+        cagr_columns = (columns[0], columns[0] * 2, columns[2])
+        benchmarks[f"dcf_calculate_batch_{size}"] = lambda columns=columns: DiscountedCashFlow.calculate_batch(*columns)
+        benchmarks[
+            f"cagr_calculate_batch_{size}"
+        ] = lambda columns=cagr_columns: CompoundedAnnualGrowthRate.calculate_batch(*columns)
+
+    rates = np.linspace(-10, 30, 50)
+    benchmarks["dcf_sensitivity_grid_50x50"] = lambda: dcf_object.sensitivity_grid(rates, rates + 15)
+
+    client = application.test_client()
+    form = {
+        "revenue": "1,000,000",
+        "revenue-growth-rate": "5",
+        "fcf-margin": "10",
+        "pfcf-ratio": "10",
+        "return": "10",
+        "time": "10",
+    }
+    sensitivity = {
+        "revenue": "1,000,000",
+        "fcf-margin": "10",
+        "pfcf-ratio": "10",
+        "time": "10",
+        "revenue-growth-rates": ",".join(str(rate) for rate in range(-10, 31)),
+        "returns": ",".join(str(rate) for rate in range(5, 16)),
+    }
+
+    def post_dcf_form_uncached():
+        valuation_cache.clear()
+        return client.post("/dcf-calculator", data=form)
+
+    benchmarks["route_dcf_form_uncached"] = post_dcf_form_uncached
+    benchmarks["route_dcf_form_cached"] = lambda: client.post("/dcf-calculator", data=form)
+    benchmarks["route_api_dcf"] = lambda: client.post("/api/v1/dcf", json=DCF_ASSUMPTIONS)
+    benchmarks["route_api_dcf_without_breakdown"] = lambda: client.post(
+        "/api/v1/dcf?breakdown=false", json=DCF_ASSUMPTIONS
+    )
+    benchmarks["route_sensitivity_41x11"] = lambda: client.get("/dcf-calculator/sensitivity", query_string=sensitivity)
+
+    return benchmarks
+
+
+def measure(function, repeat, min_seconds):
+    """
+    Measures the operations per second of a function, best of repeat runs of at least min_seconds each.
+
+    :param function: Function without arguments
+    :param repeat: Number of runs
+    :param min_seconds: Minimum duration of a run
+    :return: Operations per second
+    """
+
+    timer = timeit.Timer(function)
+    number = 1
+
+    while timer.timeit(number) < min_seconds:
+        number *= 2
+
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results with the baseline.
+
+    :param results: Dict mapping benchmark names to operations per second
+    :param baseline: Dict mapping benchmark names to baseline operations per second
+    :param threshold: Maximum allowed slowdown as a fraction, such as 0.25 for 25%
+    :return: List of names of the benchmarks that regressed
+    """
+
+    return [
+        name
+        for name, operations_per_second in results.items()
+        if name in baseline and operations_per_second < baseline[name] * (1 - threshold)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per benchmark")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="minimum duration of a timed run")
+    parser.add_argument("--threshold", type=float, default=0.25, help="maximum allowed slowdown, 0.25 for 25%%")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to the baseline file")
+    arguments = parser.parse_args()
+
+    baseline = {}
+
+    if os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = {}
+
+    print(f"{'benchmark':<40}{'ops/sec':>16}{'baseline':>16}{'change':>10}")
+
+    for name, function in get_benchmarks().items():
+        if arguments.filter not in name:
+            continue
+
+        results[name] = measure(function, arguments.repeat, arguments.min_seconds)
+        baseline_value = baseline.get(name)
+        change = f"{results[name] / baseline_value - 1:+.1%}" if baseline_value else "new"
+        baseline_text = f"{baseline_value:,.1f}" if baseline_value else "-"
+        print(f"{name:<40}{results[name]:>16,.1f}{baseline_text:>16}{change:>10}")
+
+    if arguments.update_baseline:
+        with open(arguments.baseline, "w") as baseline_file:
+            json.dump(
+                dict(baseline, **{name: round(value, 1) for name, value in results.items()}),
+                baseline_file,
+                indent=4,
+                sort_keys=True,
+            )
+            baseline_file.write("\n")
+
+        print(f"Updated {arguments.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, arguments.threshold)
+
+    if regressions:
+        # Timings are noisy on shared machines, so a regression only counts if a second measurement confirms it
+        benchmarks = get_benchmarks()
+
+        for name in regressions:
+            results[name] = max(results[name], measure(benchmarks[name], arguments.repeat, arguments.min_seconds))
+            print(f"{name:<40}{results[name]:>16,.1f}{'re-measured':>26}")
+
+        regressions = compare(results, baseline, arguments.threshold)
+
+    if regressions:
+        print(f"Slower than the baseline by more than {arguments.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+"""
+Load test comparing the WSGI development server with the ASGI entry point.
+
+Starts each server in its own process, fires concurrent POST /api/v1/dcf requests at it and prints the throughput
+and latency percentiles. Run from the repository root:
+
+    python benchmarks/load_test.py --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_COMMANDS = {
+    "wsgi": [sys.executable, "-m", "flask", "--app", "application", "run", "--port", "{port}"],
+    "asgi": [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "application:asgi_application",
+        "--port",
+        "{port}",
+        "--log-level",
+        "warning",
+        "--backlog",
+        "4096",
+    ],
+}
+
+DCF_PARAMETERS = {
+    "revenue": 1_000_000,
+    "revenue_growth_rate": 5,
+    "time_in_years": 10,
+    "fcf_margin": 10,
+    "desired_annual_return": 10,
+    "terminal_multiple": 10,
+}
+
+
+def get_free_port():
+    """
+    Finds a free local TCP port.
+
+    :return: Port number
+    """
+
+    with socket.socket() as server_socket:
+        server_socket.bind(("127.0.0.1", 0))
+        return server_socket.getsockname()[1]
+
+
+def start_server(mode, port, timeout=15):
+    """
+    Starts a server process and waits until it accepts connections.
+
+    :param mode: "wsgi" or "asgi"
+    :param port: Port to listen on
+    :param timeout: Seconds to wait for the server
+    :return: Server process
+    """
+
+    command = [part.format(port=port) for part in SERVER_COMMANDS[mode]]
+    process = subprocess.Popen(command, cwd=REPOSITORY_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            return process
+
+        except OSError:
+            time.sleep(0.1)
+
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+async def send_request(port, request_bytes):
+    """
+    Sends one request on a new connection and reads the response until the server closes it.
+
+    :param port: Server port
+    :param request_bytes: Raw HTTP request
+    :return: HTTP status code
+    """
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    try:
+        writer.write(request_bytes)
+        await writer.drain()
+        response = await reader.read()
+
+    finally:
+        writer.close()
+
+    return int(response.split(b" ", 2)[1])
+
+
+async def run_load(port, number_of_requests, concurrency):
+    """
+    Sends number_of_requests requests with at most concurrency in flight.
+
+    :param port: Server port
+    :param number_of_requests: Total number of requests
+    :param concurrency: Maximum number of requests in flight
+    :return: Tuple (elapsed seconds, list of latencies in seconds, number of failed requests)
+    """
+
+    body = json.dumps(DCF_PARAMETERS).encode()
+    request_bytes = (
+        b"POST /api/v1/dcf?breakdown=false HTTP/1.1\r\n"
+        b"Host: 127.0.0.1\r\n"
+        b"Content-Type: application/json\r\n"
+        b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+        b"Connection: close\r\n\r\n" + body
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def timed_request():
+        nonlocal failures
+
+        async with semaphore:
+            started = time.perf_counter()
+
+            try:
+                status = await send_request(port, request_bytes)
+
+            except (OSError, IndexError, ValueError):
+                status = None
+
+            latencies.append(time.perf_counter() - started)
+
+            if status != 200:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[timed_request() for _ in range(number_of_requests)])
+
+    return time.perf_counter() - started, latencies, failures
+
+
+def benchmark(mode, number_of_requests, concurrency):
+    """
+    Starts a server, warms it up, runs the load and stops the server.
+
+    :param mode: "wsgi" or "asgi"
+    :param number_of_requests: Total number of requests
+    :param concurrency: Maximum number of requests in flight
+    :return: Dict of results
+    """
+
+    port = get_free_port()
+    process = start_server(mode, port)
+
+    try:
+        asyncio.run(run_load(port, min(100, number_of_requests), min(10, concurrency)))
+        elapsed, latencies, failures = asyncio.run(run_load(port, number_of_requests, concurrency))
+
+    finally:
+        process.terminate()
+        process.wait()
+
+    percentiles = statistics.quantiles(latencies, n=100)
+
+    return {
+        "mode": mode,
+        "requests_per_second": number_of_requests / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "failures": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="total number of requests per server")
+    parser.add_argument("--concurrency", type=int, default=200, help="maximum number of requests in flight")
+    parser.add_argument("--modes", nargs="+", choices=sorted(SERVER_COMMANDS), default=["wsgi", "asgi"])
+    arguments = parser.parse_args()
+
+    print(f"{'mode':<6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failures':>10}")
+
+    for mode in arguments.modes:
+        result = benchmark(mode, arguments.requests, arguments.concurrency)
+        print(
+            f"{result['mode']:<6}{result['requests_per_second']:>10.0f}{result['p50_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{result['failures']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+# Routes whose requests can keep a worker busy for seconds, served by their own smaller executor
+HEAVY_PATH_PREFIXES = ("/api/v1/dcf/bulk", "/dcf-calculator/sensitivity")
+
+
+class WsgiToAsgi:
+    """
+    ASGI application serving a WSGI application, such as the Flask app, from bounded thread pools. The event loop
+    only parses requests and writes responses, so one process can hold thousands of concurrent connections while
+    at most max_workers valuations run at a time. Requests for heavy routes, such as bulk valuation, run in a
+    separate executor of max_heavy_workers threads so they can never starve the light routes.
+    """
+
+    def __init__(
+        self,
+        wsgi_application,
+        max_workers=32,
+        max_heavy_workers=None,
+        heavy_path_prefixes=HEAVY_PATH_PREFIXES,
+        buffer_size=64 * 1024,
+        spool_size=1024 * 1024,
+    ):
+        """
+        Constructor.
+
+        :param wsgi_application: WSGI application
+        :param max_workers: Maximum number of light requests handled at the same time
+        :param max_heavy_workers: Maximum number of heavy requests handled at the same time; None for the number
+            of CPUs
+        :param heavy_path_prefixes: Path prefixes of the heavy routes
+        :param buffer_size: Number of response bytes buffered before they are sent to the client
+        :param spool_size: Number of request body bytes kept in memory before the body is spooled to disk
+        """
+
+        assert isinstance(max_workers, int), "max_workers must be of type int"
+        assert max_workers > 0, "max_workers must be greater than 0"
+        assert max_heavy_workers is None or isinstance(max_heavy_workers, int), "max_heavy_workers must be of type int"
+        assert max_heavy_workers is None or max_heavy_workers > 0, "max_heavy_workers must be greater than 0"
+        assert buffer_size > 0, "buffer_size must be greater than 0"
+
+        self.wsgi_application = wsgi_application
+        self.heavy_path_prefixes = tuple(heavy_path_prefixes)
+        self.buffer_size = buffer_size
+        self.spool_size = spool_size
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asgi-light")
+        self.heavy_executor = ThreadPoolExecutor(
+            max_workers=max_heavy_workers or os.cpu_count() or 1, thread_name_prefix="asgi-heavy"
+        )
+
+    async def __call__(self, scope, receive, send):
+        """
+        ASGI entry point.
+
+        :param scope: ASGI connection scope
+        :param receive: Awaitable returning the next ASGI event
+        :param send: Awaitable sending an ASGI event
+        :return: None
+        """
+
+        if scope["type"] == "lifespan":
+            await self._handle_lifespan(receive, send)
+            return
+
+        assert scope["type"] == "http", f"{scope['type']} connections are not supported"
+
+        body = await self._read_body(receive)
+
+        if body is None:
+            return
+
+        with body:
+            environ = self.build_environ(scope, body)
+            executor = self.heavy_executor if scope["path"].startswith(self.heavy_path_prefixes) else self.executor
+            loop = asyncio.get_running_loop()
+
+            await loop.run_in_executor(executor, self._run_wsgi_application, environ, send, loop)
+
+    def shutdown(self, wait=True):
+        """
+        Shuts the executors down.
+
+        :param wait: True to wait for running requests to finish
+        :return: None
+        """
+
+        self.executor.shutdown(wait=wait)
+        self.heavy_executor.shutdown(wait=wait)
+
+    async def _handle_lifespan(self, receive, send):
+        """
+        Acknowledges the server's startup and shutdown events, shutting the executors down on shutdown.
+
+        :param receive: Awaitable returning the next ASGI event
+        :param send: Awaitable sending an ASGI event
+        :return: None
+        """
+
+        while True:
+            message = await receive()
+
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+
+            elif message["type"] == "lifespan.shutdown":
+                await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, receive):
+        """
+        Reads the request body into a file that only spills to disk for large bodies, such as bulk uploads.
+
+        :param receive: Awaitable returning the next ASGI event
+        :return: Body file positioned at its start, or None if the client disconnected
+        """
+
+        body = SpooledTemporaryFile(max_size=self.spool_size)
+        more_body = True
+
+        while more_body:
+            message = await receive()
+
+            if message["type"] == "http.disconnect":
+                body.close()
+                return None
+
+            body.write(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        body.seek(0)
+
+        return body
+
+    @staticmethod
+    def build_environ(scope, body):
+        """
+        Builds a WSGI environ from an ASGI HTTP scope, as described in PEP 3333.
+
+        :param scope: ASGI HTTP scope
+        :param body: File containing the request body
+        :return: WSGI environ
+        """
+
+        server_name, server_port = scope.get("server") or ("localhost", 80)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": server_name,
+            "SERVER_PORT": str(server_port),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": body,
+            "wsgi.input_terminated": True,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+        }
+
+        if scope.get("client"):
+            environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = scope["client"][0], str(scope["client"][1])
+
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+
+            if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                name = f"HTTP_{name}"
+
+            environ[name] = f"{environ[name]},{value}" if name in environ else value
+
+        return environ
+
+    def _run_wsgi_application(self, environ, send, loop):
+        """
+        Calls the WSGI application and iterates its response on a worker thread, handing buffered chunks to the
+        event loop. The whole response is iterated on one thread, so streamed responses keep their request
+        context, and each chunk waits until it is sent, so slow clients apply backpressure.
+
+        :param environ: WSGI environ
+        :param send: Awaitable sending an ASGI event
+        :param loop: Event loop running send
+        :return: None
+        """
+
+        response_start = {}
+        buffer = []
+
+        def send_message(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response_start.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+
+            response_start["status"] = int(status.split(" ", 1)[0])
+            response_start["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+            ]
+
+            return buffer.append
+
+        def flush(more_body):
+            if not response_start.get("sent"):
+                send_message(
+                    {
+                        "type": "http.response.start",
+                        "status": response_start["status"],
+                        "headers": response_start["headers"],
+                    }
+                )
+                response_start["sent"] = True
+
+            send_message({"type": "http.response.body", "body": b"".join(buffer), "more_body": more_body})
+            buffer.clear()
+
+        response = self.wsgi_application(environ, start_response)
+
+        try:
+            buffered_size = 0
+
+            for chunk in response:
+                buffer.append(chunk)
+                buffered_size += len(chunk)
+
+                if buffered_size >= self.buffer_size:
+                    flush(more_body=True)
+                    buffered_size = 0
+
+            flush(more_body=False)
+
+        finally:
+            if hasattr(response, "close"):
+                response.close()
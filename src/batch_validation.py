@@ -0,0 +1,40 @@
+import numpy as np
+
+
+def format_batch_errors(errors):
+    """
+    Joins the rules violated by a batch into one message naming the offending rows of each rule.
+
+    :param errors: Dict mapping each violated rule to the array of offending row indices, as returned by
+        validate_batch()
+    :return: Error message
+    """
+
+    return "; ".join(f"{message} (rows {rows.tolist()})" for message, rows in errors.items())
+
+
+def calculate_valid_rows(calculate, columns, errors, invalid):
+    """
+    Applies a vectorized calculation to the rows of a batch that passed validation only, so rows that are already
+    validated are not validated again, and fills the other rows with a placeholder.
+
+    :param calculate: Function taking the input arrays of the valid rows and returning an array of their values
+    :param columns: List of input arrays or scalars, broadcast against each other
+    :param errors: Dict mapping each violated rule to the array of offending row indices, as returned by
+        validate_batch()
+    :param invalid: Value of the rows with errors, such as NaN
+    :return: Array of values
+    """
+
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(values, dtype=float)) for values in columns))
+    valid = np.ones(columns[0].shape, dtype=bool)
+
+    for invalid_rows in errors.values():
+        valid[invalid_rows] = False
+
+    values = np.full(valid.shape, invalid, dtype=float)
+
+    if valid.any():
+        values[valid] = calculate(*(column[valid] for column in columns))
+
+    return values
@@ -0,0 +1,240 @@
+import csv
+import io
+import json
+import math
+from itertools import chain, islice
+
+import numpy as np
+
+from src.discounted_cash_flow import DiscountedCashFlow
+
+DCF_COLUMNS = (
+    "revenue",
+    "revenue_growth_rate",
+    "time_in_years",
+    "fcf_margin",
+    "desired_annual_return",
+    "terminal_multiple",
+)
+
+# Number of NDJSON lines searched for a readable row to take the CSV header from
+HEADER_SEARCH_LINES = 1000
+
+
+def read_csv_rows(lines):
+    """
+    Lazily parses CSV lines with a header row into dicts. A line the csv module cannot parse is yielded as a
+    ValueError describing it, so value_dcf_rows() reports it as an invalid row and carries on.
+
+    :param lines: Iterable of text lines, such as an open file
+    :return: Generator of dicts keyed by the header, or ValueErrors for unparsable lines
+    """
+
+    reader = csv.DictReader(lines)
+
+    while True:
+        try:
+            row = next(reader)
+
+        except StopIteration:
+            return
+
+        except csv.Error as error:
+            row = ValueError(f"line {reader.reader.line_num} is not valid CSV: {error}")
+
+        yield row
+
+
+def read_ndjson_rows(lines):
+    """
+    Lazily parses newline-delimited JSON objects, skipping blank lines. A line that is not valid JSON is yielded as
+    a ValueError describing it, so value_dcf_rows() reports it as an invalid row and carries on.
+
+    :param lines: Iterable of text lines, such as an open file
+    :return: Generator of decoded values, or ValueErrors for undecodable lines
+    """
+
+    for line_number, line in enumerate(lines, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+
+            except ValueError as error:
+                yield ValueError(f"line {line_number} is not valid JSON: {error}")
+
+
+def peek_columns(lines, input_format):
+    """
+    Finds the passed-through columns of the input without losing any line: the CSV header, or the keys of the
+    first NDJSON object. Every CSV output, including each shard of a parallel run, then gets the same header even
+    if its first rows cannot be read.
+
+    :param lines: Iterable of text lines
+    :param input_format: "csv" or "ndjson"
+    :return: Tuple (list of column names, or None if none were found; iterator over all lines)
+    """
+
+    lines = iter(lines)
+    peeked_lines = list(islice(lines, 1 if input_format == "csv" else HEADER_SEARCH_LINES))
+    keys = None
+
+    if input_format == "csv":
+        keys = next(csv.reader(peeked_lines), None)
+
+    else:
+        for line in peeked_lines:
+            try:
+                row = json.loads(line)
+
+            except ValueError:
+                continue
+
+            if isinstance(row, dict):
+                keys = list(row)
+                break
+
+    columns = None if keys is None else [key for key in keys if key not in DCF_COLUMNS]
+
+    return columns, chain(peeked_lines, lines)
+
+
+def chunked(rows, chunk_size):
+    """
+    Groups an iterable into lists of at most chunk_size items without reading ahead.
+
+    :param rows: Iterable of rows
+    :param chunk_size: Maximum number of rows per chunk
+    :return: Generator of lists
+    """
+
+    assert isinstance(chunk_size, int), "chunk_size must be of type int"
+    assert chunk_size > 0, "chunk_size must be greater than 0"
+
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def _value_dcf_chunk(rows):
+    """
+    Values one chunk of rows with a single DiscountedCashFlow.calculate_batch() call.
+
+    :param rows: List of dicts with the DCF_COLUMNS, in the constructor's units; other values, such as the
+        ValueErrors of the readers, are invalid rows
+    :return: List of result dicts in the same order as rows
+    """
+
+    columns = np.full((len(DCF_COLUMNS), len(rows)), np.nan)
+    errors = [[] for row in rows]
+
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[index].append(str(row) if isinstance(row, ValueError) else "row must be a JSON object")
+            continue
+
+        for column_index, column in enumerate(DCF_COLUMNS):
+            try:
+                columns[column_index, index] = float(row[column])
+
+            except KeyError:
+                errors[index].append(f"{column} is missing")
+
+            except (TypeError, ValueError):
+                errors[index].append(f"{column} must be of type int or float")
+
+    unparsed = [bool(row_errors) for row_errors in errors]
+
+    # Unparsed rows hold NaN, which fails validation, so they are never valued either
+    dcf_values, batch_errors = DiscountedCashFlow.calculate_batch(*columns, invalid=np.nan)
+
+    for message, invalid_rows in batch_errors.items():
+        for index in invalid_rows:
+            if not unparsed[index]:
+                errors[index].append(message)
+
+    results = []
+
+    for row, row_errors, dcf_value in zip(rows, errors, dcf_values.tolist()):
+        result = {key: value for key, value in row.items() if key not in DCF_COLUMNS} if isinstance(row, dict) else {}
+
+        if row_errors:
+            result["error"] = "; ".join(row_errors)
+
+        # JSON has no Infinity or NaN, so a value out of float range is an error rather than a non-finite number
+        elif not math.isfinite(dcf_value):
+            result["error"] = "dcf_value is out of range"
+
+        else:
+            result["dcf_value"] = dcf_value
+
+        results.append(result)
+
+    return results
+
+
+def value_dcf_rows(rows, chunk_size=10_000):
+    """
+    Values rows of DCF inputs in fixed-size vectorized chunks, so memory stays flat however many rows there are.
+    Columns other than DCF_COLUMNS, such as a ticker, are passed through to the results. Invalid rows, including
+    rows that are not dicts or that the readers could not parse, get an "error" instead of a "dcf_value" and do
+    not affect the other rows.
+
+    :param rows: Iterable of dicts with the DCF_COLUMNS, in the constructor's units
+    :param chunk_size: Number of rows valued per vectorized call
+    :return: Generator of result dicts in input order
+    """
+
+    for chunk in chunked(rows, chunk_size):
+        yield from _value_dcf_chunk(chunk)
+
+
+def write_ndjson(results):
+    """
+    Serializes results as newline-delimited JSON.
+
+    :param results: Iterable of result dicts
+    :return: Generator of lines
+    """
+
+    for result in results:
+        yield json.dumps(result, separators=(",", ":")) + "\n"
+
+
+def write_csv(results, columns=None):
+    """
+    Serializes results as CSV. The header is the passed-through columns followed by "dcf_value" and "error";
+    missing fields are left empty.
+
+    :param results: Iterable of result dicts
+    :param columns: Passed-through columns of the header; None for those of the first result
+    :return: Generator of lines
+    """
+
+    results = iter(results)
+    first_result = next(results, {})
+
+    if columns is None:
+        columns = [key for key in first_result if key not in ("dcf_value", "error")]
+
+    fieldnames = list(columns) + ["dcf_value", "error"]
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writeheader()
+
+    if first_result:
+        writer.writerow(first_result)
+
+    yield flush()
+
+    for result in results:
+        writer.writerow(result)
+        yield flush()
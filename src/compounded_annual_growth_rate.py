@@ -1,4 +1,15 @@
+import logging
+
+import numpy as np
+
+from src.batch_validation import calculate_valid_rows, format_batch_errors
+
+logger = logging.getLogger(__name__)
+
+
 class CompoundedAnnualGrowthRate:
+    __slots__ = ("starting_value", "ending_value", "time_in_years")
+
     def __init__(self, starting_value=0, ending_value=0, time_in_years=0):
         """
         Constructor.
@@ -19,6 +30,106 @@ class CompoundedAnnualGrowthRate:
         self.ending_value = ending_value
         self.time_in_years = time_in_years
 
+    @staticmethod
+    def validate_batch(starting_values, ending_values, time_in_years):
+        """
+        Validates arrays of CAGR inputs in one vectorized pass, applying the same rules as the constructor.
+
+        :param starting_values: Array of initial values
+        :param ending_values: Array of final values
+        :param time_in_years: Array of whole numbers of years
+        :return: Dict mapping each violated rule to the array of offending row indices; empty if all rows are valid
+        """
+
+        inputs = (starting_values, ending_values, time_in_years)
+        arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(values, dtype=float)) for values in inputs))
+        starting_values, ending_values, time_in_years = arrays
+
+        rules = {
+            "starting_value must be greater than 0": ~(starting_values > 0),
+            "ending_value must be greater than or equal to 0": ~(ending_values >= 0),
+            "time_in_years must be of type int": ~(time_in_years == np.floor(time_in_years)),
+            "time_in_years must be greater than 0": ~(time_in_years > 0),
+        }
+
+        return {message: np.flatnonzero(invalid) for message, invalid in rules.items() if invalid.any()}
+
+    @classmethod
+    def calculate_batch(cls, starting_values, ending_values, time_in_years, invalid=None):
+        """
+        Calculates the CAGR of every row of the input arrays in one vectorized pass, as a log-space difference:
+
+            CAGR = (e ^ ((LN(ENDING_VALUE) - LN(STARTING_VALUE)) / TIME_IN_YEARS) - 1) * 100
+
+        Scalars are broadcast against the arrays.
+
+        :param starting_values: Array of initial values
+        :param ending_values: Array of final values
+        :param time_in_years: Array of whole numbers of years
+        :param invalid: None to reject a batch with any invalid row; otherwise the value of invalid rows, such as NaN
+        :return: Array of CAGR values; with invalid set, a tuple (array of CAGR values, dict of errors as returned
+            by validate_batch())
+        """
+
+        errors = cls.validate_batch(starting_values, ending_values, time_in_years)
+
+        def calculate(starting_values, ending_values, time_in_years):
+            with np.errstate(divide="ignore"):
+                log_growth = np.log(np.asarray(ending_values, dtype=float)) - np.log(
+                    np.asarray(starting_values, dtype=float)
+                )
+
+            return np.expm1(log_growth / np.asarray(time_in_years, dtype=float)) * 100
+
+        if invalid is not None:
+            return (
+                calculate_valid_rows(calculate, (starting_values, ending_values, time_in_years), errors, invalid),
+                errors,
+            )
+
+        assert not errors, format_batch_errors(errors)
+
+        return calculate(starting_values, ending_values, time_in_years)
+
+    @staticmethod
+    def calculate_rolling(series, windows, periods_per_year=1):
+        """
+        Calculates the rolling CAGR of every series for every window length. The logarithm of the series is taken
+        once, and each window length is then one vectorized difference across all series and positions:
+
+            CAGR(T) = (e ^ ((LN(VALUE(T + WINDOW)) - LN(VALUE(T))) * PERIODS_PER_YEAR / WINDOW) - 1) * 100
+
+        Windows starting at a non-positive value, or ending at a negative or missing value, are NaN.
+
+        :param series: 1-D array of one series or 2-D array of series × periods, such as tickers × months
+        :param windows: Window length or iterable of window lengths, in periods
+        :param periods_per_year: Number of periods per year, such as 12 for monthly data
+        :return: Dict mapping each window length to an array of CAGR values with periods - window columns
+        """
+
+        series = np.asarray(series, dtype=float)
+        windows = [windows] if isinstance(windows, int) else list(windows)
+        number_of_periods = series.shape[-1]
+
+        assert series.ndim in (1, 2), "series must be one- or two-dimensional"
+        assert periods_per_year > 0, "periods_per_year must be greater than 0"
+
+        for window in windows:
+            assert isinstance(window, int), "windows must be of type int"
+            assert 0 < window < number_of_periods, "windows must be greater than 0 and shorter than the series"
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_series = np.log(series)
+            positive_starts = series > 0
+            rolling_cagrs = {}
+
+            for window in windows:
+                log_growth = log_series[..., window:] - log_series[..., :-window]
+                cagr = np.expm1(log_growth * (periods_per_year / window)) * 100
+                rolling_cagrs[window] = np.where(positive_starts[..., :-window], cagr, np.nan)
+
+        return rolling_cagrs
+
     def print_current_assumptions(self):
         """
         Prints all class variables.
@@ -31,21 +142,35 @@ class CompoundedAnnualGrowthRate:
         print(f"Ending Value = ${self.ending_value:,}")
         print(f"Time in Years = {self.time_in_years}")
 
-    def calculate(self):
+    def print_result(self, cagr):
         """
-        Using the current variables, calculate the CAGR.
+        Prints the CAGR value in a banner.
 
-        :return: CAGR value
+        :param cagr: CAGR value returned by calculate()
+        :return: None
         """
 
-        self.print_current_assumptions()
-
-        cagr = ((self.ending_value / self.starting_value) ** (1 / self.time_in_years) - 1) * 100
-
         print("")
         print("-" * 40)
         print(f"CAGR = {cagr:,.2f}%")
         print("-" * 40)
         print("")
 
+    def calculate(self, verbose=False):
+        """
+        Using the current variables, calculate the CAGR. Performs no I/O unless verbose is set; the result is also
+        reported to this module's logger at DEBUG level.
+
+        :param verbose: True to display the assumptions and result on CLI; False otherwise
+        :return: CAGR value
+        """
+
+        cagr = ((self.ending_value / self.starting_value) ** (1 / self.time_in_years) - 1) * 100
+
+        if verbose:
+            self.print_current_assumptions()
+            self.print_result(cagr)
+
+        logger.debug("CAGR = %.2f%%", cagr)
+
         return cagr
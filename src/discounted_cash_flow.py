@@ -1,6 +1,244 @@
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from operator import attrgetter
+from time import perf_counter
+
+import numpy as np
+
+from src.batch_validation import calculate_valid_rows, format_batch_errors
+from src.valuation_trace import ValuationTrace
+
+logger = logging.getLogger(__name__)
+
+SIMULATION_DISTRIBUTIONS = ("normal", "uniform", "triangular", "lognormal")
+SIMULATED_VARIABLES = {"revenue_growth_rate": -100, "fcf_margin": 0, "terminal_multiple": 0}
+SOLVER_RELATIVE_TOLERANCE = 1e-12
+SOLVER_MAX_ITERATIONS = 100
+TERMINAL_METHODS = ("exit_multiple", "perpetuity_growth")
+
+# Constructor rules applied by DiscountedCashFlow.update(): (accepted types, lower bound, whether the lower bound
+# itself is allowed, constructor units per stored unit)
+ASSUMPTION_RULES = {
+    "revenue": ((int, float), 0, True, 1),
+    "revenue_growth_rate": ((int, float), -100, True, 100),
+    "time_in_years": (int, 0, False, 1),
+    "fcf_margin": ((int, float), 0, True, 100),
+    "desired_annual_return": ((int, float), 0, True, 100),
+    "terminal_multiple": ((int, float), 0, True, 1),
+    "terminal_growth_rate": ((int, float), -100, True, 100),
+}
+
+# Assumptions that have no effect while their schedule is set
+SCHEDULED_ASSUMPTIONS = {"revenue_growth_rate": "revenue_growth_schedule", "fcf_margin": "fcf_margin_schedule"}
+
+
+def _closed_form_dcf(revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple):
+    """
+    Vectorized closed-form DCF value over NumPy arrays. Rates are fractions, not percentages:
+
+        DCF = FCF_MARGIN * REVENUE * (Q * (Q ^ T - 1) / (Q - 1) + TERMINAL_MULTIPLE * Q ^ T)
+
+    where Q = (1 + REVENUE_GROWTH_RATE) / (1 + DESIRED_ANNUAL_RETURN); the series is T when Q == 1.
+
+    :return: Array of DCF values broadcast over the inputs
+    """
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        initial_cash_flow = revenue * fcf_margin
+        discount_factor = 1 + desired_annual_return
+        ratio_minus_one = (revenue_growth_rate - desired_annual_return) / discount_factor
+        log_ratio = np.log1p(ratio_minus_one)
+        ratio = 1 + ratio_minus_one
+        growth_over_time = np.exp(time_in_years * log_ratio)
+
+        series = np.where(
+            ratio_minus_one == 0, time_in_years, ratio * np.expm1(time_in_years * log_ratio) / ratio_minus_one
+        )
+        dcf_value = initial_cash_flow * (series + terminal_multiple * growth_over_time)
+
+    return np.where(initial_cash_flow == 0, 0.0, dcf_value)
+
+
+def _perpetuity_growth_multiple(terminal_growth_rate, desired_annual_return):
+    """
+    Multiple of the final-year cash flow that the Gordon growth value of all later cash flows is worth, so the
+    perpetuity growth terminal value is discounted exactly like an exit multiple. Rates are fractions:
+
+        TERMINAL_VALUE(T) = CASH_FLOW(T) * (1 + TERMINAL_GROWTH_RATE) / (DESIRED_ANNUAL_RETURN - TERMINAL_GROWTH_RATE)
+
+    :return: Multiple broadcast over the inputs
+    """
+
+    return (1 + terminal_growth_rate) / (desired_annual_return - terminal_growth_rate)
+
+
+def _closed_form_dcf_and_slope(
+    revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+):
+    """
+    Closed-form DCF value and its analytic derivative with respect to Q = (1 + REVENUE_GROWTH_RATE) /
+    (1 + DESIRED_ANNUAL_RETURN). Rates are fractions, not percentages:
+
+        DCF'(Q) = FCF_MARGIN * REVENUE * ((T * Q ^ (T + 1) - (T + 1) * Q ^ T + 1) / (Q - 1) ^ 2
+                                          + TERMINAL_MULTIPLE * T * Q ^ (T - 1))
+
+    The first term tends to T * (T + 1) / 2 as Q tends to 1, where its second-order Taylor expansion is used.
+
+    :return: Tuple of arrays (DCF value, derivative of the DCF value with respect to Q)
+    """
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        initial_cash_flow = revenue * fcf_margin
+        ratio_minus_one = (revenue_growth_rate - desired_annual_return) / (1 + desired_annual_return)
+        ratio = 1 + ratio_minus_one
+        ratio_to_time = ratio**time_in_years
+
+        series_slope = np.where(
+            np.abs(ratio_minus_one * time_in_years) < 1e-4,
+            time_in_years * (time_in_years + 1) / 2
+            + ratio_minus_one * (time_in_years - 1) * time_in_years * (time_in_years + 1) / 3,
+            (time_in_years * ratio_to_time * ratio - (time_in_years + 1) * ratio_to_time + 1) / ratio_minus_one**2,
+        )
+        slope = initial_cash_flow * (series_slope + terminal_multiple * time_in_years * ratio ** (time_in_years - 1))
+
+    value = _closed_form_dcf(
+        revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+    )
+
+    return value, slope
+
+
+def _solve_monotonic(value_and_slope, target_values, initial_guesses, lower_bounds, increasing):
+    """
+    Vectorized safeguarded Newton iteration for value_and_slope(x) == target_values, where the value is positive
+    and monotonic in x. Newton steps are taken on log(value), which is close to linear in the rates because the
+    DCF value grows geometrically. Each element keeps a bracket [lower, upper] around its root: a Newton step that
+    leaves the bracket, or has no usable slope, is replaced by bisection. The upper bounds are found by doubling.
+    Elements without a root above lower_bounds, or whose root cannot be bracketed, are NaN.
+
+    :param value_and_slope: Function mapping an array x to a tuple of arrays (value, derivative)
+    :param target_values: Array of target values
+    :param initial_guesses: Array of starting points
+    :param lower_bounds: Array of lower bounds of x
+    :param increasing: True if the value increases with x; False if it decreases
+    :return: Array of roots
+    """
+
+    direction = 1 if increasing else -1
+    lower = lower_bounds.astype(float)
+    upper = np.maximum(lower + 1, initial_guesses)
+    lower_value = value_and_slope(lower)[0]
+    solvable = direction * (target_values - lower_value) >= 0
+
+    for attempt in range(64):
+        unbracketed = solvable & (direction * (value_and_slope(upper)[0] - target_values) < 0)
+
+        if not unbracketed.any():
+            break
+
+        upper = np.where(unbracketed, 2 * upper - lower, upper)
+
+    solvable &= ~unbracketed
+    x = np.clip(initial_guesses, lower, upper)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for iteration in range(SOLVER_MAX_ITERATIONS):
+            value, slope = value_and_slope(x)
+            log_residual = np.log(value) - np.log(target_values)
+            converged = ~solvable | (value == target_values) | (np.abs(log_residual) <= SOLVER_RELATIVE_TOLERANCE)
+
+            if converged.all():
+                break
+
+            below = direction * (value - target_values) < 0
+            lower = np.where(below, x, lower)
+            upper = np.where(below, upper, x)
+
+            newton_step = x - log_residual * value / slope
+            use_newton = np.isfinite(newton_step) & (newton_step > lower) & (newton_step < upper)
+            x = np.where(converged, x, np.where(use_newton, newton_step, (lower + upper) / 2))
+
+    return np.where(solvable, x, np.nan)
+
+
+def _simulate_chunk(fixed_values, distributions, seed_sequence, number_of_paths):
+    """
+    Samples one chunk of Monte Carlo paths and values them with the closed-form DCF. Runs in worker processes, so
+    it only takes picklable arguments.
+
+    :param fixed_values: Dict of the DCF variables in the constructor's units, used where no distribution is given
+    :param distributions: Dict mapping simulated variables to (name, *parameters) tuples
+    :param seed_sequence: numpy.random.SeedSequence for this chunk
+    :param number_of_paths: Number of paths in this chunk
+    :return: Array of DCF values
+    """
+
+    generator = np.random.default_rng(seed_sequence)
+    values = dict(fixed_values)
+
+    for variable, lower_bound in SIMULATED_VARIABLES.items():
+        if variable in distributions:
+            name, *parameters = distributions[variable]
+            samples = getattr(generator, name)(*parameters, size=number_of_paths)
+            values[variable] = np.maximum(samples, lower_bound)
+
+    dcf_values = _closed_form_dcf(
+        values["revenue"],
+        values["revenue_growth_rate"] / 100,
+        values["time_in_years"],
+        values["fcf_margin"] / 100,
+        values["desired_annual_return"] / 100,
+        values["terminal_multiple"],
+    )
+
+    return np.broadcast_to(dcf_values, number_of_paths)
+
+
+def _discount_factor_assumption(name):
+    """
+    Property for a slot-backed DCF assumption that the discount factors depend on. Setting it drops the factors
+    cached by DiscountedCashFlow._get_discount_factors(), so they are only recomputed when needed.
+
+    :param name: Public name of the assumption, stored in the slot "_" + name
+    :return: Property
+    """
+
+    slot_name = f"_{name}"
+
+    def set_assumption(self, value):
+        setattr(self, slot_name, value)
+        self._discount_factors = None
+
+    return property(attrgetter(slot_name), set_assumption)
+
+
 class DiscountedCashFlow:
     """Present value of all future cash flows."""
 
+    __slots__ = (
+        "revenue",
+        "_revenue_growth_rate",
+        "_time_in_years",
+        "fcf_margin",
+        "_desired_annual_return",
+        "terminal_multiple",
+        "terminal_method",
+        "terminal_growth_rate",
+        "_revenue_growth_schedule",
+        "_fcf_margin_schedule",
+        "_discount_factors",
+        "_trace",
+    )
+
+    # Revenue, FCF margin and the terminal assumptions only scale the discount factors, so they are plain slots
+    revenue_growth_rate = _discount_factor_assumption("revenue_growth_rate")
+    time_in_years = _discount_factor_assumption("time_in_years")
+    desired_annual_return = _discount_factor_assumption("desired_annual_return")
+    revenue_growth_schedule = _discount_factor_assumption("revenue_growth_schedule")
+    fcf_margin_schedule = _discount_factor_assumption("fcf_margin_schedule")
+
     def __init__(
         self,
         revenue=0,
@@ -9,6 +247,10 @@ class DiscountedCashFlow:
         fcf_margin=0,
         desired_annual_return=0,
         terminal_multiple=0,
+        revenue_growth_schedule=None,
+        fcf_margin_schedule=None,
+        terminal_method="exit_multiple",
+        terminal_growth_rate=0,
     ):
         """
         Constructor.
@@ -19,6 +261,12 @@ class DiscountedCashFlow:
         :param fcf_margin:
         :param desired_annual_return:
         :param terminal_multiple:
+        :param revenue_growth_schedule: Optional revenue growth rate for each year, overriding revenue_growth_rate
+        :param fcf_margin_schedule: Optional FCF margin for each year, overriding fcf_margin
+        :param terminal_method: "exit_multiple" to value the final-year cash flow at terminal_multiple, or
+            "perpetuity_growth" to value the cash flows after the final year as growing at terminal_growth_rate
+        :param terminal_growth_rate: Perpetual growth rate in percent after the final year, below
+            desired_annual_return; only used by the perpetuity_growth terminal method
         """
 
         assert isinstance(revenue, (int, float)), "revenue must be of type int or float"
@@ -33,21 +281,494 @@ class DiscountedCashFlow:
         assert desired_annual_return >= 0, "desired_annual_return must be greater than or equal to 0"
         assert isinstance(terminal_multiple, (int, float)), "terminal_multiple must be of type int or float"
         assert terminal_multiple >= 0, "terminal_multiple must be greater than or equal to 0"
+        assert terminal_method in TERMINAL_METHODS, "terminal_method must be exit_multiple or perpetuity_growth"
+        assert isinstance(terminal_growth_rate, (int, float)), "terminal_growth_rate must be of type int or float"
+        assert terminal_growth_rate >= -100, "terminal_growth_rate must be greater than or equal to -100"
+
+        if terminal_method == "perpetuity_growth":
+            assert (
+                terminal_growth_rate < desired_annual_return
+            ), "terminal_growth_rate must be less than desired_annual_return"
 
         self.revenue = revenue
-        self.revenue_growth_rate = revenue_growth_rate / 100
-        self.time_in_years = time_in_years
+        self._revenue_growth_rate = revenue_growth_rate / 100
+        self._time_in_years = time_in_years
         self.fcf_margin = fcf_margin / 100
-        self.desired_annual_return = desired_annual_return / 100
+        self._desired_annual_return = desired_annual_return / 100
         self.terminal_multiple = terminal_multiple
-        self._debug_mode = False
+        self.terminal_method = terminal_method
+        self.terminal_growth_rate = terminal_growth_rate / 100
+        self._revenue_growth_schedule = None
+        self._fcf_margin_schedule = None
+        self._discount_factors = None
+        self._trace = None
 
-    def _toggle_debug_mode(self):
-        self._debug_mode = not self._debug_mode
+        if revenue_growth_schedule is not None:
+            growth_schedule = np.asarray(revenue_growth_schedule, dtype=float)
 
-        if self._debug_mode:
-            print("")
-            print("***Debug Mode On***")
+            assert growth_schedule.shape == (time_in_years,), "revenue_growth_schedule must have one rate per year"
+            assert (growth_schedule >= -100).all(), "revenue_growth_schedule must be greater than or equal to -100"
+
+            self.revenue_growth_schedule = growth_schedule / 100
+
+        if fcf_margin_schedule is not None:
+            margin_schedule = np.asarray(fcf_margin_schedule, dtype=float)
+
+            assert margin_schedule.shape == (time_in_years,), "fcf_margin_schedule must have one margin per year"
+            assert (margin_schedule >= 0).all(), "fcf_margin_schedule must be greater than or equal to 0"
+
+            self.fcf_margin_schedule = margin_schedule / 100
+
+    def update(self, **assumptions):
+        """
+        Changes the given assumptions in place, validating only those, so a single object can be re-evaluated in a
+        screening loop without re-running the whole constructor. Takes the constructor's units:
+
+            dcf.update(desired_annual_return=12).calculate()
+
+        :param assumptions: Any of revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return,
+            terminal_multiple and terminal_growth_rate; revenue_growth_rate and fcf_margin only while their schedule
+            is not set
+        :return: self
+        """
+
+        # Every assumption is validated before any is changed, so a failed update leaves the object as it was
+        for name, value in assumptions.items():
+            self.validate_assumption(name, value)
+
+            if name in SCHEDULED_ASSUMPTIONS:
+                schedule = SCHEDULED_ASSUMPTIONS[name]
+
+                assert getattr(self, schedule) is None, f"{name} is overridden by {schedule}"
+
+        for name, value in assumptions.items():
+            scale = ASSUMPTION_RULES[name][3]
+            setattr(self, name, value / scale if scale != 1 else value)
+
+        return self
+
+    @staticmethod
+    def validate_assumption(name, value):
+        """
+        Validates one assumption in the constructor's units with the constructor's rules.
+
+        :param name: Any of revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return,
+            terminal_multiple and terminal_growth_rate
+        :param value: Value of the assumption
+        :return: None
+        """
+
+        assert name in ASSUMPTION_RULES, f"{name} is not a DCF assumption"
+
+        types, lower_bound, lower_bound_allowed, _ = ASSUMPTION_RULES[name]
+
+        assert isinstance(value, types), f"{name} must be of type {'int' if types is int else 'int or float'}"
+
+        if lower_bound_allowed:
+            assert value >= lower_bound, f"{name} must be greater than or equal to {lower_bound}"
+
+        else:
+            assert value > lower_bound, f"{name} must be greater than {lower_bound}"
+
+    @property
+    def _has_schedules(self):
+        return self.revenue_growth_schedule is not None or self.fcf_margin_schedule is not None
+
+    @contextmanager
+    def trace(self, clock=perf_counter):
+        """
+        Context manager recording every calculate() call in its block into a ValuationTrace: the assumptions,
+        each year's revenue, cash flow, present value and wall-clock time, the terminal value and the total time.
+        While tracing, calculate() uses the reference loop over get_present_value() so that every year is
+        recorded. Outside a trace the only cost is one attribute check per call.
+
+            with dcf_object.trace() as trace:
+                dcf_object.calculate()
+
+            trace_json = trace.to_json()
+
+        :param clock: Function returning the current time in seconds
+        :return: Context manager yielding the ValuationTrace
+        """
+
+        previous_trace, self._trace = self._trace, ValuationTrace(clock=clock)
+
+        try:
+            yield self._trace
+
+        finally:
+            self._trace = previous_trace
+
+    @staticmethod
+    def validate_batch(
+        revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+    ):
+        """
+        Validates arrays of DCF inputs in one vectorized pass, applying the same rules as the constructor.
+
+        :param revenue: Array of revenues
+        :param revenue_growth_rate: Array of revenue growth rates in percent
+        :param time_in_years: Array of whole numbers of years
+        :param fcf_margin: Array of FCF margins in percent
+        :param desired_annual_return: Array of desired annual returns in percent
+        :param terminal_multiple: Array of terminal multiples
+        :return: Dict mapping each violated rule to the array of offending row indices; empty if all rows are valid
+        """
+
+        inputs = (revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple)
+        arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(values, dtype=float)) for values in inputs))
+        revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple = arrays
+
+        rules = {
+            "revenue must be greater than or equal to 0": ~(revenue >= 0),
+            "revenue_growth_rate must be greater than or equal to -100": ~(revenue_growth_rate >= -100),
+            "time_in_years must be of type int": ~(time_in_years == np.floor(time_in_years)),
+            "time_in_years must be greater than 0": ~(time_in_years > 0),
+            "fcf_margin must be greater than or equal to 0": ~(fcf_margin >= 0),
+            "desired_annual_return must be greater than or equal to 0": ~(desired_annual_return >= 0),
+            "terminal_multiple must be greater than or equal to 0": ~(terminal_multiple >= 0),
+        }
+
+        return {message: np.flatnonzero(invalid) for message, invalid in rules.items() if invalid.any()}
+
+    @classmethod
+    def calculate_batch(
+        cls,
+        revenue,
+        revenue_growth_rate,
+        time_in_years,
+        fcf_margin,
+        desired_annual_return,
+        terminal_multiple,
+        invalid=None,
+    ):
+        """
+        Calculates the DCF value of every row of the input arrays in one vectorized pass. Takes the same units as
+        the constructor and agrees with calculate() to within a relative tolerance of 1e-9. Scalars are
+        broadcast against the arrays.
+
+        :param revenue: Array of revenues
+        :param revenue_growth_rate: Array of revenue growth rates in percent
+        :param time_in_years: Array of whole numbers of years
+        :param fcf_margin: Array of FCF margins in percent
+        :param desired_annual_return: Array of desired annual returns in percent
+        :param terminal_multiple: Array of terminal multiples
+        :param invalid: None to reject a batch with any invalid row; otherwise the value of invalid rows, such as NaN
+        :return: Array of DCF values; with invalid set, a tuple (array of DCF values, dict of errors as returned by
+            validate_batch())
+        """
+
+        inputs = (revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple)
+        errors = cls.validate_batch(*inputs)
+
+        def calculate(
+            revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+        ):
+            return _closed_form_dcf(
+                np.asarray(revenue, dtype=float),
+                np.asarray(revenue_growth_rate, dtype=float) / 100,
+                np.asarray(time_in_years, dtype=float),
+                np.asarray(fcf_margin, dtype=float) / 100,
+                np.asarray(desired_annual_return, dtype=float) / 100,
+                np.asarray(terminal_multiple, dtype=float),
+            )
+
+        if invalid is not None:
+            return calculate_valid_rows(calculate, inputs, errors, invalid), errors
+
+        assert not errors, format_batch_errors(errors)
+
+        return calculate(*inputs)
+
+    @classmethod
+    def solve_implied_growth_batch(
+        cls, target_values, revenue, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+    ):
+        """
+        Solves, for every row, the revenue growth rate at which the closed-form DCF value equals the target value,
+        such as a market capitalization. Uses the vectorized safeguarded Newton iteration on the analytic
+        derivative, which typically converges within a handful of iterations.
+
+        :param target_values: Array of target DCF values
+        :param revenue: Array of revenues
+        :param time_in_years: Array of whole numbers of years
+        :param fcf_margin: Array of FCF margins in percent
+        :param desired_annual_return: Array of desired annual returns in percent
+        :param terminal_multiple: Array of terminal multiples
+        :return: Array of revenue growth rates in percent; NaN where no growth rate reaches the target value
+        """
+
+        target_values = np.asarray(target_values, dtype=float)
+        errors = cls.validate_batch(revenue, 0, time_in_years, fcf_margin, desired_annual_return, terminal_multiple)
+
+        assert not errors, format_batch_errors(errors)
+        assert (target_values >= 0).all(), "target_values must be greater than or equal to 0"
+
+        (
+            revenue,
+            time_in_years,
+            fcf_margin,
+            desired_annual_return,
+            terminal_multiple,
+            target_values,
+        ) = np.broadcast_arrays(
+            np.asarray(revenue, dtype=float),
+            np.asarray(time_in_years, dtype=float),
+            np.asarray(fcf_margin, dtype=float) / 100,
+            np.asarray(desired_annual_return, dtype=float) / 100,
+            np.asarray(terminal_multiple, dtype=float),
+            target_values,
+        )
+
+        def value_and_slope(growth_rates):
+            value, slope = _closed_form_dcf_and_slope(
+                revenue, growth_rates, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+            )
+            return value, slope / (1 + desired_annual_return)
+
+        growth_rates = _solve_monotonic(
+            value_and_slope,
+            target_values,
+            initial_guesses=desired_annual_return,
+            lower_bounds=np.full(target_values.shape, -1.0),
+            increasing=True,
+        )
+
+        return growth_rates * 100
+
+    @classmethod
+    def solve_implied_return_batch(
+        cls, target_values, revenue, revenue_growth_rate, time_in_years, fcf_margin, terminal_multiple
+    ):
+        """
+        Solves, for every row, the desired annual return at which the closed-form DCF value equals the target
+        value, such as a market capitalization. Uses the vectorized safeguarded Newton iteration on the analytic
+        derivative, which typically converges within a handful of iterations.
+
+        :param target_values: Array of target DCF values
+        :param revenue: Array of revenues
+        :param revenue_growth_rate: Array of revenue growth rates in percent
+        :param time_in_years: Array of whole numbers of years
+        :param fcf_margin: Array of FCF margins in percent
+        :param terminal_multiple: Array of terminal multiples
+        :return: Array of desired annual returns in percent; NaN where no return of at least 0% reaches the target
+        """
+
+        target_values = np.asarray(target_values, dtype=float)
+        errors = cls.validate_batch(revenue, revenue_growth_rate, time_in_years, fcf_margin, 0, terminal_multiple)
+
+        assert not errors, format_batch_errors(errors)
+        assert (target_values > 0).all(), "target_values must be greater than 0"
+
+        revenue, revenue_growth_rate, time_in_years, fcf_margin, terminal_multiple, target_values = np.broadcast_arrays(
+            np.asarray(revenue, dtype=float),
+            np.asarray(revenue_growth_rate, dtype=float) / 100,
+            np.asarray(time_in_years, dtype=float),
+            np.asarray(fcf_margin, dtype=float) / 100,
+            np.asarray(terminal_multiple, dtype=float),
+            target_values,
+        )
+
+        def value_and_slope(desired_annual_returns):
+            value, slope = _closed_form_dcf_and_slope(
+                revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_returns, terminal_multiple
+            )
+            return value, -slope * (1 + revenue_growth_rate) / (1 + desired_annual_returns) ** 2
+
+        desired_annual_returns = _solve_monotonic(
+            value_and_slope,
+            target_values,
+            initial_guesses=np.maximum(revenue_growth_rate, 0),
+            lower_bounds=np.zeros(target_values.shape),
+            increasing=False,
+        )
+
+        return desired_annual_returns * 100
+
+    def solve_implied_growth(self, target_value):
+        """
+        Solves for the revenue growth rate at which the DCF value equals target_value, keeping the other
+        variables fixed. See solve_implied_growth_batch().
+
+        :param target_value: Target DCF value, such as a market capitalization
+        :return: Revenue growth rate in percent
+        """
+
+        assert not self._has_schedules, "solve_implied_growth does not support schedules"
+        assert isinstance(target_value, (int, float)), "target_value must be of type int or float"
+
+        growth_rate = self.solve_implied_growth_batch(
+            target_value,
+            self.revenue,
+            self.time_in_years,
+            self.fcf_margin * 100,
+            self.desired_annual_return * 100,
+            self._get_terminal_multiple(),
+        )[()]
+
+        assert not np.isnan(growth_rate), "target_value cannot be reached by any revenue_growth_rate"
+
+        return float(growth_rate)
+
+    def solve_implied_return(self, target_value):
+        """
+        Solves for the desired annual return at which the DCF value equals target_value, keeping the other
+        variables fixed. See solve_implied_return_batch().
+
+        :param target_value: Target DCF value, such as a market capitalization
+        :return: Desired annual return in percent
+        """
+
+        assert not self._has_schedules, "solve_implied_return does not support schedules"
+        assert self.terminal_method == "exit_multiple", "solve_implied_return only supports the exit_multiple method"
+        assert isinstance(target_value, (int, float)), "target_value must be of type int or float"
+
+        desired_annual_return = self.solve_implied_return_batch(
+            target_value,
+            self.revenue,
+            self.revenue_growth_rate * 100,
+            self.time_in_years,
+            self.fcf_margin * 100,
+            self.terminal_multiple,
+        )[()]
+
+        assert not np.isnan(desired_annual_return), "target_value cannot be reached by any desired_annual_return"
+
+        return float(desired_annual_return)
+
+    def sensitivity_grid(self, growth_rates, discount_rates):
+        """
+        Calculates the DCF value for every combination of revenue growth rate and desired annual return as one
+        broadcasted array operation, keeping the other variables fixed.
+
+        :param growth_rates: Sequence of revenue growth rates in percent
+        :param discount_rates: Sequence of desired annual returns in percent
+        :return: 2-D array of DCF values indexed by [growth rate, discount rate]
+        """
+
+        assert not self._has_schedules, "sensitivity_grid does not support schedules"
+
+        growth_rates = np.asarray(growth_rates, dtype=float)
+        discount_rates = np.asarray(discount_rates, dtype=float)
+
+        assert growth_rates.ndim == 1, "growth_rates must be one-dimensional"
+        assert discount_rates.ndim == 1, "discount_rates must be one-dimensional"
+        assert (growth_rates >= -100).all(), "growth_rates must be greater than or equal to -100"
+        assert (discount_rates >= 0).all(), "discount_rates must be greater than or equal to 0"
+
+        terminal_multiple = self.terminal_multiple
+
+        if self.terminal_method == "perpetuity_growth":
+            assert (
+                discount_rates / 100 > self.terminal_growth_rate
+            ).all(), "discount_rates must be greater than terminal_growth_rate"
+
+            terminal_multiple = _perpetuity_growth_multiple(self.terminal_growth_rate, discount_rates / 100)
+
+        return _closed_form_dcf(
+            self.revenue,
+            growth_rates[:, np.newaxis] / 100,
+            self.time_in_years,
+            self.fcf_margin,
+            discount_rates[np.newaxis, :] / 100,
+            terminal_multiple,
+        )
+
+    def simulate(
+        self, n_paths, distributions=None, seed=None, percentiles=(5, 25, 50, 75, 95), chunk_size=250_000, workers=None
+    ):
+        """
+        Monte Carlo simulation of the DCF value. revenue_growth_rate, fcf_margin and terminal_multiple are drawn
+        from the given distributions, in the constructor's units, for example:
+
+            distributions={"revenue_growth_rate": ("normal", 8, 3), "terminal_multiple": ("uniform", 10, 20)}
+
+        Supported distributions are normal(mean, std_dev), uniform(low, high), triangular(left, mode, right) and
+        lognormal(mean, sigma). Samples are clipped to the constructor's lower bounds, and variables without a
+        distribution keep their current value.
+
+        Paths are sampled and valued in chunks of chunk_size, so sampling memory stays fixed however large
+        n_paths is. The final value of every path is kept to compute exact percentiles, so memory still grows by
+        8 bytes per path, 80 MB for 10 million paths; callers taking n_paths from users should cap it, as the
+        job queue does with MAX_SIMULATION_PATHS. Every chunk gets its
+        own child of numpy.random.SeedSequence(seed), which makes the result depend on seed and chunk_size but
+        not on the number of workers.
+
+        :param n_paths: Number of paths to simulate
+        :param distributions: Dict mapping simulated variables to (name, *parameters) tuples
+        :param seed: Seed for reproducible results; None for fresh entropy
+        :param percentiles: Percentiles of the DCF value to report
+        :param chunk_size: Number of paths sampled and valued at a time
+        :param workers: Number of worker processes; None to simulate in this process
+        :return: Dict mapping each percentile to its DCF value
+        """
+
+        distributions = distributions or {}
+
+        assert not self._has_schedules, "simulate does not support schedules"
+        assert isinstance(n_paths, int), "n_paths must be of type int"
+        assert n_paths > 0, "n_paths must be greater than 0"
+        assert isinstance(chunk_size, int), "chunk_size must be of type int"
+        assert chunk_size > 0, "chunk_size must be greater than 0"
+
+        if self.terminal_method == "perpetuity_growth":
+            assert "terminal_multiple" not in distributions, "terminal_multiple is not used by perpetuity_growth"
+
+        for variable, distribution in distributions.items():
+            assert variable in SIMULATED_VARIABLES, f"{variable} cannot be simulated"
+            assert distribution[0] in SIMULATION_DISTRIBUTIONS, f"{distribution[0]} is not a supported distribution"
+
+        fixed_values = {
+            "revenue": self.revenue,
+            "revenue_growth_rate": self.revenue_growth_rate * 100,
+            "time_in_years": self.time_in_years,
+            "fcf_margin": self.fcf_margin * 100,
+            "desired_annual_return": self.desired_annual_return * 100,
+            "terminal_multiple": self._get_terminal_multiple(),
+        }
+
+        chunk_sizes = [min(chunk_size, n_paths - start) for start in range(0, n_paths, chunk_size)]
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+        arguments = (
+            [fixed_values] * len(chunk_sizes),
+            [distributions] * len(chunk_sizes),
+            seed_sequences,
+            chunk_sizes,
+        )
+
+        dcf_values = np.empty(n_paths)
+
+        with ProcessPoolExecutor(max_workers=workers) if workers else nullcontext() as executor:
+            chunks = executor.map(_simulate_chunk, *arguments) if executor else map(_simulate_chunk, *arguments)
+
+            for start, chunk in zip(range(0, n_paths, chunk_size), chunks):
+                dcf_values[start : start + len(chunk)] = chunk
+
+        return dict(zip(percentiles, np.percentile(dcf_values, percentiles).tolist()))
+
+    def _get_assumptions(self):
+        """
+        Returns the current assumptions in the constructor's units, with schedules as lists.
+
+        :return: Dict of assumptions
+        """
+
+        assumptions = {
+            "revenue": self.revenue,
+            "revenue_growth_rate": self.revenue_growth_rate * 100,
+            "time_in_years": self.time_in_years,
+            "fcf_margin": self.fcf_margin * 100,
+            "desired_annual_return": self.desired_annual_return * 100,
+            "terminal_multiple": self.terminal_multiple,
+            "terminal_method": self.terminal_method,
+            "terminal_growth_rate": self.terminal_growth_rate * 100,
+        }
+
+        for name in ("revenue_growth_schedule", "fcf_margin_schedule"):
+            if getattr(self, name) is not None:
+                assumptions[name] = (getattr(self, name) * 100).tolist()
+
+        return assumptions
 
     def print_current_assumptions(self):
         """
@@ -62,7 +783,11 @@ class DiscountedCashFlow:
         print(f"Time in Years = {self.time_in_years}")
         print(f"FCF Margin = {self.fcf_margin * 100}%")
         print(f"Desired Annual Return = {self.desired_annual_return * 100}%")
-        print(f"Terminal Multiple = {self.terminal_multiple}")
+        if self.terminal_method == "exit_multiple":
+            print(f"Terminal Multiple = {self.terminal_multiple}")
+
+        else:
+            print(f"Terminal Growth Rate = {self.terminal_growth_rate * 100}%")
 
     def get_cash_flow(self, time):
         """
@@ -70,6 +795,9 @@ class DiscountedCashFlow:
 
             CASH_FLOW(T) = FCF_MARGIN * REVENUE * (1 + REVENUE_GROWTH_RATE) ^ T
 
+        With schedules, the growth term is the product of the first T scheduled growth factors and the margin is
+        the scheduled margin for year T.
+
         :param time: The year the cash flow will be calculated for
         :return: Cash flow value
         """
@@ -77,15 +805,23 @@ class DiscountedCashFlow:
         assert isinstance(time, (int, float)), "time must be of type int or float"
         assert time >= 0, "time must be greater than or equal to 0"
 
-        revenue = self.revenue * ((1 + self.revenue_growth_rate) ** time)
+        if self._has_schedules:
+            assert isinstance(time, int) and time <= self.time_in_years, "time must be a scheduled year"
+
+        if self.revenue_growth_schedule is None:
+            revenue = self.revenue * ((1 + self.revenue_growth_rate) ** time)
 
-        if self._debug_mode:
-            print(f"Revenue at Year {time} = ${revenue:,.2f}")
+        else:
+            revenue = self.revenue * float(np.prod(1 + self.revenue_growth_schedule[:time]))
 
-        cash_flow = revenue * self.fcf_margin
+        if self.fcf_margin_schedule is None or time == 0:
+            cash_flow = revenue * self.fcf_margin
 
-        if self._debug_mode:
-            print(f"Cash Flow at Year {time} = ${cash_flow:,.2f}")
+        else:
+            cash_flow = revenue * self.fcf_margin_schedule[time - 1]
+
+        if self._trace is not None:
+            self._trace.record_year(time, revenue=revenue, cash_flow=cash_flow)
 
         return cash_flow
 
@@ -102,62 +838,224 @@ class DiscountedCashFlow:
         assert isinstance(time, (int, float)), "time must be of type int or float"
         assert time >= 0, "time must be greater than or equal to 0"
 
+        trace = self._trace
+
+        if trace is not None:
+            started_at = trace.clock()
+
         current_cash_flow = self.get_cash_flow(time)
         present_value = current_cash_flow / ((1 + self.desired_annual_return) ** time)
 
-        if self._debug_mode:
-            print(f"Present Value At Year {time} = ${present_value:,.2f}")
+        if trace is not None:
+            trace.record_year(time, present_value=present_value, seconds=trace.clock() - started_at)
 
         return present_value
 
-    def get_terminal_value(self):
+    def get_terminal_value(self, closed_form=True):
         """
-        Calculates the terminal value at time = self.time_in_years:
+        Calculates the present value of the terminal value at time = self.time_in_years. With the exit multiple
+        method:
 
             TERMINAL_VALUE = PRESENT_VALUE(self.time_in_years) * TERMINAL_MULTIPLE
 
+        With the perpetuity growth method, the Gordon growth value of the cash flows after the final year:
+
+            TERMINAL_VALUE = PRESENT_VALUE(self.time_in_years) * (1 + TERMINAL_GROWTH_RATE)
+                / (DESIRED_ANNUAL_RETURN - TERMINAL_GROWTH_RATE)
+
+        Either way PRESENT_VALUE(self.time_in_years) is the cached terminal factor, so no year is recomputed, unless
+        closed_form is False.
+
+        :param closed_form: True to take PRESENT_VALUE(self.time_in_years) from the cached discount factors; False
+            to compute it with get_present_value(), as the reference loop of calculate() does
         :return: Terminal value
         """
 
-        terminal_cash_flow = self.get_present_value(self.time_in_years)
+        if closed_form:
+            initial_cash_flow = self._get_initial_cash_flow()
+            terminal_cash_flow = 0.0 if initial_cash_flow == 0 else initial_cash_flow * self._get_discount_factors()[1]
 
-        if self._debug_mode:
-            print("")
-            print(f"Terminal Cash Flow = ${terminal_cash_flow:,.2f}")
+        else:
+            terminal_cash_flow = self.get_present_value(self.time_in_years)
 
-        terminal_value = self.terminal_multiple * terminal_cash_flow
+        terminal_value = self._get_terminal_multiple() * terminal_cash_flow
 
-        if self._debug_mode:
-            print(f"Terminal Value = ${terminal_value:,.2f}")
+        if self._trace is not None:
+            self._trace.terminal.update(terminal_cash_flow=terminal_cash_flow, terminal_value=terminal_value)
 
         return terminal_value
 
-    def calculate(self, verbose=False):
+    def _get_terminal_multiple(self):
         """
-        Using the current variables, calculate the DCF value.
+        Returns the multiple of the discounted final-year cash flow that the terminal value is worth: the terminal
+        multiple, or the perpetuity growth multiple (1 + TERMINAL_GROWTH_RATE) / (DESIRED_ANNUAL_RETURN -
+        TERMINAL_GROWTH_RATE).
 
-        :param verbose: True to display all calculations on CLI; False otherwise
-        :return: DCF value
+        :return: Terminal multiple
         """
 
-        self.print_current_assumptions()
+        if self.terminal_method == "exit_multiple":
+            return self.terminal_multiple
 
-        if verbose:
-            self._toggle_debug_mode()
+        assert (
+            self.desired_annual_return > self.terminal_growth_rate
+        ), "terminal_growth_rate must be less than desired_annual_return"
 
-        dcf_value = 0
+        return _perpetuity_growth_multiple(self.terminal_growth_rate, self.desired_annual_return)
 
-        for time in range(1, self.time_in_years + 1):
-            if self._debug_mode:
-                print("")
+    def _get_growth_rates(self):
+        """
+        Returns the revenue growth rate of every year from time = 1 to self.time_in_years.
 
-            dcf_value += self.get_present_value(time)
+        :return: Array of growth rates, indexed by year - 1
+        """
 
-        if self._debug_mode:
-            print("")
+        if self.revenue_growth_schedule is None:
+            growth_rates = np.full(self.time_in_years, self.revenue_growth_rate, dtype=float)
+
+        else:
+            growth_rates = self.revenue_growth_schedule
+
+        assert len(growth_rates) == self.time_in_years, "revenue_growth_schedule must have one rate per year"
+
+        if self.fcf_margin_schedule is not None:
+            assert (
+                len(self.fcf_margin_schedule) == self.time_in_years
+            ), "fcf_margin_schedule must have one margin per year"
 
-        terminal_value = self.get_terminal_value()
-        dcf_value += terminal_value
+        return growth_rates
+
+    def _get_present_value_factors(self, growth_rates):
+        """
+        Calculates the present value of one unit of initial revenue for every year from time = 1 to
+        self.time_in_years as a single cumulative product of the yearly ratios (1 + REVENUE_GROWTH_RATE(T)) /
+        (1 + DESIRED_ANNUAL_RETURN), so the cost is linear in the horizon. Dividing cumulative growth factors by
+        cumulative discount factors instead overflows both over long horizons, and inf / inf is NaN.
+
+        :param growth_rates: Array of growth rates returned by _get_growth_rates()
+        :return: Array of present value factors, indexed by year - 1
+        """
+
+        return np.cumprod((1 + growth_rates) / (1 + self.desired_annual_return))
+
+    def get_projection(self):
+        """
+        Projects revenue, cash flow and present value for every year from time = 1 to self.time_in_years:
+
+            REVENUE(T) = REVENUE * (1 + REVENUE_GROWTH_RATE(1)) * ... * (1 + REVENUE_GROWTH_RATE(T))
+            CASH_FLOW(T) = FCF_MARGIN(T) * REVENUE(T)
+            PRESENT_VALUE(T) = CASH_FLOW(T) / (1 + DESIRED_ANNUAL_RETURN) ^ T
+
+        :return: Dict of arrays "revenue", "cash_flow" and "present_value", indexed by year - 1
+        """
+
+        growth_rates = self._get_growth_rates()
+        fcf_margins = self.fcf_margin if self.fcf_margin_schedule is None else self.fcf_margin_schedule
+
+        # Revenue and cash flow can overflow to inf over long horizons while their present values stay finite
+        with np.errstate(over="ignore", invalid="ignore"):
+            revenue = self.revenue * np.cumprod(1 + growth_rates)
+            cash_flow = revenue * fcf_margins
+            present_value = self.revenue * fcf_margins * self._get_present_value_factors(growth_rates)
+
+        return {"revenue": revenue, "cash_flow": cash_flow, "present_value": present_value}
+
+    def _get_initial_cash_flow(self):
+        """
+        Returns the cash flow that the discount factors are scaled by: REVENUE * FCF_MARGIN, or REVENUE alone
+        when the FCF margins are scheduled and therefore already part of the discount factors.
+
+        :return: Initial cash flow
+        """
+
+        if self.fcf_margin_schedule is None:
+            return self.revenue * self.fcf_margin
+
+        return self.revenue
+
+    def _get_discount_factors(self):
+        """
+        Returns the operating and terminal discount factors per unit of initial cash flow, computing them only if
+        an assumption they depend on changed since the last call. Without schedules, with
+        Q = (1 + REVENUE_GROWTH_RATE) / (1 + DESIRED_ANNUAL_RETURN):
+
+            OPERATING_FACTOR = Q + Q ^ 2 + ... + Q ^ T = Q * (Q ^ T - 1) / (Q - 1)
+            TERMINAL_FACTOR = Q ^ T
+
+        OPERATING_FACTOR is T when Q == 1. Q ^ T - 1 and Q - 1 are evaluated with expm1/log1p so the series stays
+        accurate when Q is close to 1. With schedules, each year's factor is its present value factor, times its
+        scheduled margin if any.
+
+        Revenue, FCF margin and terminal multiple only scale these factors, so changing them reuses the cache.
+
+        :return: Tuple (OPERATING_FACTOR, TERMINAL_FACTOR)
+        """
+
+        if self._discount_factors is not None:
+            return self._discount_factors
+
+        if self._has_schedules:
+            unit_present_values = self._get_present_value_factors(self._get_growth_rates())
+
+            if self.fcf_margin_schedule is not None:
+                unit_present_values *= self.fcf_margin_schedule
+
+            self._discount_factors = (float(unit_present_values.sum()), float(unit_present_values[-1]))
+            return self._discount_factors
+
+        # Read the slots directly, this runs on every re-evaluation after a rate or time change
+        revenue_growth_rate = self._revenue_growth_rate
+        desired_annual_return = self._desired_annual_return
+        time_in_years = self._time_in_years
+        growth_factor = 1 + revenue_growth_rate
+        discount_factor = 1 + desired_annual_return
+
+        if growth_factor == 0:
+            self._discount_factors = (0.0, 0.0)
+
+        elif growth_factor == discount_factor:
+            self._discount_factors = (float(time_in_years), 1.0)
+
+        else:
+            ratio_minus_one = (revenue_growth_rate - desired_annual_return) / discount_factor
+            log_ratio_to_time = time_in_years * math.log1p(ratio_minus_one)
+            operating_factor = (1 + ratio_minus_one) * math.expm1(log_ratio_to_time) / ratio_minus_one
+            self._discount_factors = (operating_factor, math.exp(log_ratio_to_time))
+
+        return self._discount_factors
+
+    def get_discounted_cash_flow_sum(self):
+        """
+        Calculates the sum of the present values of the cash flows from time = 1 to self.time_in_years in O(1)
+        as a geometric series with ratio Q = (1 + REVENUE_GROWTH_RATE) / (1 + DESIRED_ANNUAL_RETURN):
+
+            SUM = FCF_MARGIN * REVENUE * (Q + Q ^ 2 + ... + Q ^ T)
+                = FCF_MARGIN * REVENUE * Q * (Q ^ T - 1) / (Q - 1)
+
+        When REVENUE_GROWTH_RATE == DESIRED_ANNUAL_RETURN, Q == 1 and SUM = FCF_MARGIN * REVENUE * T. With
+        schedules there is no closed form, so the present values of the projection are summed instead. The series
+        is cached by _get_discount_factors(), so only changes to the growth rate, desired annual return, time or
+        schedules recompute it.
+
+        The result agrees with summing get_present_value() year by year to within a relative tolerance of 1e-9.
+
+        :return: Sum of the present values of the cash flows
+        """
+
+        initial_cash_flow = self._get_initial_cash_flow()
+
+        if initial_cash_flow == 0:
+            return 0.0
+
+        return initial_cash_flow * self._get_discount_factors()[0]
+
+    def print_result(self, dcf_value):
+        """
+        Prints the DCF value in a banner.
+
+        :param dcf_value: DCF value returned by calculate()
+        :return: None
+        """
 
         print("")
         print("-" * 40)
@@ -165,8 +1063,80 @@ class DiscountedCashFlow:
         print("-" * 40)
         print("")
 
-        # Toggle debug mode again to turn it off
+    def print_trace(self, trace):
+        """
+        Prints the components of every year and the terminal value recorded in a trace.
+
+        :param trace: ValuationTrace filled in by trace()
+        :return: None
+        """
+
+        for year in trace.to_dict()["years"]:
+            print("")
+            print(f"Revenue at Year {year['year']} = ${year['revenue']:,.2f}")
+            print(f"Cash Flow at Year {year['year']} = ${year['cash_flow']:,.2f}")
+            print(f"Present Value At Year {year['year']} = ${year['present_value']:,.2f}")
+
+        print("")
+        print(f"Terminal Cash Flow = ${trace.terminal['terminal_cash_flow']:,.2f}")
+        print(f"Terminal Value = ${trace.terminal['terminal_value']:,.2f}")
+
+    def calculate(self, verbose=False, closed_form=True):
+        """
+        Using the current variables, calculate the DCF value. Performs no I/O unless verbose is set; the result is
+        also reported to this module's logger at DEBUG level.
+
+        :param verbose: True to trace the calculation and display it on CLI; False otherwise
+        :param closed_form: True to value the cash flows with the cached discount factors, see
+            get_discounted_cash_flow_sum(); False to use the reference loop over get_present_value(). Traced and
+            verbose calculations always use the reference loop.
+        :return: DCF value
+        """
+
         if verbose:
-            self._toggle_debug_mode()
+            with self.trace() as trace:
+                dcf_value = self.calculate(closed_form=closed_form)
+
+            self.print_current_assumptions()
+            self.print_trace(trace)
+            self.print_result(dcf_value)
+
+            return dcf_value
+
+        trace = self._trace
+
+        if closed_form and trace is None:
+            operating_factor, terminal_factor = self._discount_factors or self._get_discount_factors()
+            initial_cash_flow = (
+                self.revenue if self._fcf_margin_schedule is not None else self.revenue * self.fcf_margin
+            )
+
+            terminal_multiple = (
+                self.terminal_multiple if self.terminal_method == "exit_multiple" else self._get_terminal_multiple()
+            )
+
+            if initial_cash_flow == 0:
+                dcf_value = 0.0
+
+            else:
+                dcf_value = initial_cash_flow * (operating_factor + terminal_multiple * terminal_factor)
+
+        else:
+            if trace is not None:
+                started_at = trace.clock()
+                trace.assumptions = self._get_assumptions()
+
+            dcf_value = 0
+
+            for time in range(1, self.time_in_years + 1):
+                dcf_value += self.get_present_value(time)
+
+            dcf_value += self.get_terminal_value(closed_form=False)
+
+            if trace is not None:
+                trace.result = dcf_value
+                trace.timings["calculate"] = trace.clock() - started_at
+
+        logger.debug("DCF Value = %.2f", dcf_value)
 
         return dcf_value
@@ -0,0 +1,191 @@
+import json
+import os
+
+import numpy as np
+
+from src.discounted_cash_flow import DiscountedCashFlow
+
+METADATA_FILE_NAME = "metadata.json"
+
+
+class FundamentalsStore:
+    """
+    Columnar store of fundamentals, such as revenue, FCF margin and multiples, per ticker per period. Every column
+    is one .npy file of shape (number of periods, number of tickers), so all tickers of a period are contiguous.
+    Columns are memory-mapped read-only on first use: opening a store reads no column data, and a screen only
+    pages in the periods of the columns it touches.
+
+    Layout of a store directory:
+
+        metadata.json     column names, tickers and periods
+        <column>.npy      float64 values in the constructor's units, NaN where a value is missing
+    """
+
+    def __init__(self, path):
+        """
+        Opens a store written by FundamentalsStore.write().
+
+        :param path: Store directory
+        """
+
+        with open(os.path.join(path, METADATA_FILE_NAME)) as metadata_file:
+            metadata = json.load(metadata_file)
+
+        self.path = path
+        self.column_names = tuple(metadata["columns"])
+        self.tickers = tuple(metadata["tickers"])
+        self.periods = tuple(metadata["periods"])
+        self._columns = {}
+        self._ticker_indices = None
+        self._period_indices = {period: index for index, period in enumerate(self.periods)}
+
+    @staticmethod
+    def write(path, tickers, periods, columns):
+        """
+        Writes a store, replacing the columns of an existing store at path.
+
+        :param path: Store directory, created if it does not exist
+        :param tickers: Sequence of ticker symbols
+        :param periods: Sequence of periods, such as fiscal years
+        :param columns: Dict mapping each column name to an array of shape (len(periods), len(tickers))
+        :return: FundamentalsStore opened at path
+        """
+
+        tickers = [str(ticker) for ticker in tickers]
+        periods = [int(period) for period in periods]
+
+        assert len(set(tickers)) == len(tickers), "tickers must be unique"
+        assert len(set(periods)) == len(periods), "periods must be unique"
+
+        for name, values in columns.items():
+            assert name.isidentifier(), f"{name} is not a valid column name"
+            assert np.shape(values) == (len(periods), len(tickers)), f"{name} must have one row per period"
+
+        os.makedirs(path, exist_ok=True)
+
+        for name, values in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(values, dtype=np.float64))
+
+        with open(os.path.join(path, METADATA_FILE_NAME), "w") as metadata_file:
+            json.dump({"columns": list(columns), "tickers": tickers, "periods": periods}, metadata_file)
+
+        return FundamentalsStore(path)
+
+    def column(self, name):
+        """
+        Returns a column, memory-mapping it on first use.
+
+        :param name: Column name
+        :return: Read-only array of shape (number of periods, number of tickers)
+        """
+
+        column = self._columns.get(name)
+
+        if column is None:
+            assert name in self.column_names, f"{name} is not a column of the store"
+
+            column = self._columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+
+        return column
+
+    def get_period_index(self, period):
+        """
+        Returns the row of a period in every column.
+
+        :param period: Period, such as a fiscal year
+        :return: Row index
+        """
+
+        assert period in self._period_indices, f"{period} is not a period of the store"
+
+        return self._period_indices[period]
+
+    def get_ticker_index(self, ticker):
+        """
+        Returns the position of a ticker in every row.
+
+        :param ticker: Ticker symbol
+        :return: Column index
+        """
+
+        if self._ticker_indices is None:
+            self._ticker_indices = {symbol: index for index, symbol in enumerate(self.tickers)}
+
+        assert ticker in self._ticker_indices, f"{ticker} is not a ticker of the store"
+
+        return self._ticker_indices[ticker]
+
+    def select(self, period, columns):
+        """
+        Returns the values of every ticker in one period, as views of the memory-mapped columns.
+
+        :param period: Period, such as a fiscal year
+        :param columns: Column names
+        :return: Dict mapping each column name to a read-only array with one value per ticker
+        """
+
+        period_index = self.get_period_index(period)
+
+        return {name: self.column(name)[period_index] for name in columns}
+
+    def get_history(self, ticker, columns):
+        """
+        Returns the values of one ticker in every period, as views of the memory-mapped columns.
+
+        :param ticker: Ticker symbol
+        :param columns: Column names
+        :return: Dict mapping each column name to a read-only array with one value per period
+        """
+
+        ticker_index = self.get_ticker_index(ticker)
+
+        return {name: self.column(name)[:, ticker_index] for name in columns}
+
+    def value_dcf(
+        self,
+        period,
+        revenue="revenue",
+        revenue_growth_rate=0,
+        time_in_years=10,
+        fcf_margin="fcf_margin",
+        desired_annual_return=10,
+        terminal_multiple="terminal_multiple",
+    ):
+        """
+        Values every ticker of a period with DiscountedCashFlow.calculate_batch(). Each assumption is either the
+        name of a column or a value, or array of values, applied to every ticker; only the named columns are read.
+        Tickers with a missing or invalid input get NaN instead of a DCF value.
+
+            store.value_dcf(2023, revenue_growth_rate="revenue_growth_rate", terminal_multiple=15)
+
+        :param period: Period, such as a fiscal year
+        :param revenue: Column name or revenues
+        :param revenue_growth_rate: Column name or revenue growth rates in percent
+        :param time_in_years: Column name or whole numbers of years
+        :param fcf_margin: Column name or FCF margins in percent
+        :param desired_annual_return: Column name or desired annual returns in percent
+        :param terminal_multiple: Column name or terminal multiples
+        :return: Array with one DCF value per ticker, in the order of tickers
+        """
+
+        assumptions = (
+            revenue,
+            revenue_growth_rate,
+            time_in_years,
+            fcf_margin,
+            desired_annual_return,
+            terminal_multiple,
+        )
+        column_names = [assumption for assumption in assumptions if isinstance(assumption, str)]
+        selected = self.select(period, column_names)
+        inputs = np.broadcast_arrays(
+            *(
+                selected[assumption] if isinstance(assumption, str) else np.asarray(assumption, dtype=float)
+                for assumption in assumptions
+            ),
+            np.empty(len(self.tickers)),
+        )[:-1]
+
+        dcf_values, _ = DiscountedCashFlow.calculate_batch(*inputs, invalid=np.nan)
+
+        return dcf_values
@@ -0,0 +1,331 @@
+import math
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Event, Lock
+
+from src.bulk_valuation import value_dcf_rows
+from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
+from src.discounted_cash_flow import DiscountedCashFlow
+
+# simulate() keeps the value of every path for exact percentiles, so this caps a simulation job at 80 MB of values
+MAX_SIMULATION_PATHS = 10_000_000
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while max_pending jobs are already queued or running."""
+
+
+def _run_dcf_simulation(assumptions, n_paths, **simulation):
+    """
+    Runs DiscountedCashFlow.simulate() in this process.
+
+    :param assumptions: DiscountedCashFlow constructor parameters
+    :param n_paths: Number of paths to simulate, at most MAX_SIMULATION_PATHS
+    :param simulation: Other simulate() parameters, except workers
+    :return: Dict with the DCF value of each percentile, keyed by the percentile as a string
+    """
+
+    assert "workers" not in simulation, "workers cannot be set for a simulation job"
+    # simulate() reports an n_paths that is not an int
+    assert (
+        not isinstance(n_paths, int) or n_paths <= MAX_SIMULATION_PATHS
+    ), f"n_paths must be less than or equal to {MAX_SIMULATION_PATHS}"
+
+    values = DiscountedCashFlow(**assumptions).simulate(n_paths, **simulation)
+
+    # JSON has no Infinity or NaN, so percentiles out of float range are None
+    return {
+        "percentiles": {
+            str(percentile): value if math.isfinite(value) else None for percentile, value in values.items()
+        }
+    }
+
+
+def _run_dcf_bulk(rows, chunk_size=10_000):
+    """
+    Values rows of DCF inputs with value_dcf_rows().
+
+    :param rows: List of dicts with the DCF columns
+    :param chunk_size: Number of rows valued per vectorized call
+    :return: List of result dicts
+    """
+
+    assert isinstance(rows, list), "rows must be of type list"
+
+    return list(value_dcf_rows(rows, chunk_size=chunk_size))
+
+
+def _run_cagr_batch(starting_values, ending_values, time_in_years):
+    """
+    Calculates CAGRs with CompoundedAnnualGrowthRate.calculate_batch().
+
+    :param starting_values: List of initial values
+    :param ending_values: List of final values
+    :param time_in_years: List of whole numbers of years
+    :return: Dict with the list of CAGR values
+    """
+
+    return {"cagr": CompoundedAnnualGrowthRate.calculate_batch(starting_values, ending_values, time_in_years).tolist()}
+
+
+JOB_TYPES = {
+    "dcf_simulation": _run_dcf_simulation,
+    "dcf_bulk": _run_dcf_bulk,
+    "cagr_batch": _run_cagr_batch,
+}
+
+
+def _run_job(job_type, parameters):
+    """
+    Runs one job in a worker process. Invalid parameters are reported as an error rather than raised, so failed
+    jobs are timed like successful ones.
+
+    :param job_type: Key of JOB_TYPES
+    :param parameters: Keyword arguments of the job function
+    :return: Tuple (result, error, started_at, finished_at); result is None if error is set
+    """
+
+    started_at = time.time()
+
+    try:
+        result, error = JOB_TYPES[job_type](**parameters), None
+
+    except (AssertionError, KeyError, TypeError, ValueError) as exception:
+        result, error = None, str(exception) or type(exception).__name__
+
+    return result, error, started_at, time.time()
+
+
+class JobQueue:
+    """
+    Runs heavy valuation jobs, such as simulations and bulk valuations, in a pool of worker processes so they
+    never hold a web worker or its GIL. At most max_pending jobs are queued or running at a time; submitting more
+    raises JobQueueFull. The status, timing and result of the last max_finished finished jobs are kept for polling.
+    """
+
+    def __init__(self, max_workers=None, max_pending=64, max_finished=1024, executor_factory=ProcessPoolExecutor):
+        """
+        Constructor.
+
+        :param max_workers: Number of worker processes; None for the number of CPUs
+        :param max_pending: Maximum number of jobs queued or running at a time
+        :param max_finished: Maximum number of finished jobs kept for polling
+        :param executor_factory: Executor class called with max_workers, created on the first submit
+        """
+
+        assert max_workers is None or isinstance(max_workers, int), "max_workers must be of type int"
+        assert max_workers is None or max_workers > 0, "max_workers must be greater than 0"
+        assert isinstance(max_pending, int), "max_pending must be of type int"
+        assert max_pending > 0, "max_pending must be greater than 0"
+        assert isinstance(max_finished, int), "max_finished must be of type int"
+        assert max_finished > 0, "max_finished must be greater than 0"
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self._executor_factory = executor_factory
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._finished_events = {}
+        self._results = {}
+        self._finished_job_ids = deque()
+        self._timed_jobs = 0
+        self._total_queue_seconds = 0.0
+        self._total_run_seconds = 0.0
+        self._lock = Lock()
+
+    def submit(self, job_type, parameters):
+        """
+        Queues a job.
+
+        :param job_type: One of JOB_TYPES: "dcf_simulation", "dcf_bulk" or "cagr_batch"
+        :param parameters: Dict of keyword arguments of the job function
+        :return: Job ID
+        """
+
+        assert job_type in JOB_TYPES, f"{job_type} is not a supported job type"
+        assert isinstance(parameters, dict), "parameters must be of type dict"
+
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                self.rejected += 1
+                raise JobQueueFull(f"{self.max_pending} jobs are already pending")
+
+            if self._executor is None:
+                self._executor = self._executor_factory(max_workers=self.max_workers)
+
+            try:
+                future = self._executor.submit(_run_job, job_type, parameters)
+
+            except BrokenProcessPool:
+                # A worker died, for example killed for running out of memory, and took the pool down with it
+                self._executor.shutdown(wait=False)
+                self._executor = self._executor_factory(max_workers=self.max_workers)
+                future = self._executor.submit(_run_job, job_type, parameters)
+
+            # The job is only recorded once it has been submitted, so a failed submit leaves no job queued forever
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "type": job_type,
+                "status": "queued",
+                "error": None,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "queue_seconds": None,
+                "run_seconds": None,
+            }
+            self._futures[job_id] = future
+            self._finished_events[job_id] = Event()
+            self.submitted += 1
+
+        future.add_done_callback(lambda future: self._finish(job_id, future))
+
+        return job_id
+
+    def _finish(self, job_id, future):
+        """
+        Records the outcome and timing of a finished job and forgets the oldest finished jobs beyond max_finished.
+
+        :param job_id: Job ID
+        :param future: Finished future of the job
+        :return: None
+        """
+
+        finished_at = time.time()
+
+        try:
+            result, error, started_at, finished_at = future.result()
+
+        except Exception as exception:
+            result, error, started_at = None, str(exception) or type(exception).__name__, None
+
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(status="failed" if error else "succeeded", error=error, finished_at=finished_at)
+
+            if started_at is not None:
+                job.update(
+                    started_at=started_at,
+                    queue_seconds=started_at - job["submitted_at"],
+                    run_seconds=finished_at - started_at,
+                )
+                self._timed_jobs += 1
+                self._total_queue_seconds += job["queue_seconds"]
+                self._total_run_seconds += job["run_seconds"]
+
+            if error:
+                self.failed += 1
+
+            else:
+                self.succeeded += 1
+                self._results[job_id] = result
+
+            del self._futures[job_id]
+            self._finished_events.pop(job_id).set()
+            self._finished_job_ids.append(job_id)
+
+            while len(self._finished_job_ids) > self.max_finished:
+                expired_job_id = self._finished_job_ids.popleft()
+                del self._jobs[expired_job_id]
+                self._results.pop(expired_job_id, None)
+
+    def get(self, job_id):
+        """
+        Returns the status and timing of a job. A queued job is reported as running once a worker has taken it.
+
+        :param job_id: Job ID
+        :return: Dict of id, type, status, error, submitted_at, started_at, finished_at, queue_seconds and
+            run_seconds in seconds; None if the job is unknown or has been forgotten
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+            if job is None:
+                return None
+
+            job = dict(job)
+            future = self._futures.get(job_id)
+
+        if job["status"] == "queued" and future is not None and future.running():
+            job["status"] = "running"
+
+        return job
+
+    def get_result(self, job_id):
+        """
+        Returns the result of a succeeded job.
+
+        :param job_id: Job ID
+        :return: Result, or None if the job has not succeeded
+        """
+
+        with self._lock:
+            return self._results.get(job_id)
+
+    def wait(self, job_id, timeout=None):
+        """
+        Waits until a job has finished.
+
+        :param job_id: Job ID
+        :param timeout: Maximum number of seconds to wait; None to wait until the job finishes
+        :return: Status of the job, see get()
+        """
+
+        finished_event = self._finished_events.get(job_id)
+
+        if finished_event is not None:
+            finished_event.wait(timeout)
+
+        return self.get(job_id)
+
+    def get_stats(self):
+        """
+        Returns the queue counters and mean timings of the finished jobs.
+
+        :return: Dict of pending, max_pending, submitted, rejected, succeeded, failed, mean_queue_seconds and
+            mean_run_seconds
+        """
+
+        with self._lock:
+            timed_jobs = self._timed_jobs
+
+            return {
+                "pending": len(self._futures),
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "mean_queue_seconds": self._total_queue_seconds / timed_jobs if timed_jobs else None,
+                "mean_run_seconds": self._total_run_seconds / timed_jobs if timed_jobs else None,
+            }
+
+    def shutdown(self, wait=True):
+        """
+        Shuts the worker processes down. A later submit starts new ones.
+
+        :param wait: True to wait for the queued jobs to finish
+        :return: None
+        """
+
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Shared by every job submitted to this process
+job_queue = JobQueue()
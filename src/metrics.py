@@ -0,0 +1,168 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+# Upper bounds in seconds of the latency histogram buckets, from 50 microseconds to 10 seconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 2.5, 10)
+
+
+def _format_labels(labels):
+    """
+    Formats labels as a Prometheus label set.
+
+    :param labels: Dict of label names and values
+    :return: String such as '{route="/",phase="total"}'
+    """
+
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for name, value in labels.items()
+    )
+
+    return "{" + ",".join(escaped) + "}"
+
+
+def format_metric(name, metric_type, description, samples):
+    """
+    Formats one metric family in the Prometheus text exposition format.
+
+    :param name: Metric name
+    :param metric_type: "counter", "gauge" or "histogram"
+    :param description: Help text
+    :param samples: List of (suffix, labels dict, value) tuples; the suffix, such as "_bucket", is appended to
+        the name
+    :return: String ending with a newline
+    """
+
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {metric_type}"]
+    lines += [
+        f"{name}{suffix}{_format_labels(labels) if labels else ''} {value!r}" for suffix, labels, value in samples
+    ]
+
+    return "\n".join(lines) + "\n"
+
+
+class RequestMetrics:
+    """
+    Thread-safe latency histograms per route and phase, such as parse, construct, calculate and render, plus
+    request counters per route, method and status, rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, clock=time.perf_counter):
+        """
+        Constructor.
+
+        :param buckets: Increasing upper bounds in seconds of the histogram buckets
+        :param clock: Function returning the current time in seconds
+        """
+
+        assert list(buckets) == sorted(buckets), "buckets must be in increasing order"
+
+        self.buckets = tuple(buckets)
+        self._clock = clock
+        self._histograms = {}
+        self._requests = {}
+        self._lock = Lock()
+
+    def observe(self, route, phase, seconds):
+        """
+        Records the duration of one phase of a request.
+
+        :param route: Route rule, such as "/dcf-calculator"
+        :param phase: Phase name, such as "calculate"
+        :param seconds: Duration in seconds
+        :return: None
+        """
+
+        bucket_index = bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            histogram = self._histograms.get((route, phase))
+
+            if histogram is None:
+                histogram = self._histograms[(route, phase)] = [[0] * (len(self.buckets) + 1), 0.0]
+
+            histogram[0][bucket_index] += 1
+            histogram[1] += seconds
+
+    @contextmanager
+    def time(self, route, phase):
+        """
+        Context manager recording the duration of its block with observe(), also if the block raises.
+
+        :param route: Route rule, such as "/dcf-calculator"
+        :param phase: Phase name, such as "calculate"
+        :return: Context manager
+        """
+
+        started_at = self._clock()
+
+        try:
+            yield
+
+        finally:
+            self.observe(route, phase, self._clock() - started_at)
+
+    def count_request(self, route, method, status):
+        """
+        Counts one finished request.
+
+        :param route: Route rule, such as "/dcf-calculator"
+        :param method: HTTP method
+        :param status: HTTP status code
+        :return: None
+        """
+
+        with self._lock:
+            key = (route, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def reset(self):
+        """
+        Removes every recorded observation.
+
+        :return: None
+        """
+
+        with self._lock:
+            self._histograms.clear()
+            self._requests.clear()
+
+    def render(self):
+        """
+        Renders the histograms and counters in the Prometheus text exposition format. Histogram buckets are
+        cumulative, as Prometheus expects.
+
+        :return: String
+        """
+
+        with self._lock:
+            histograms = {key: (list(counts), total) for key, (counts, total) in sorted(self._histograms.items())}
+            requests = sorted(self._requests.items())
+
+        histogram_samples = []
+
+        for (route, phase), (counts, total) in histograms.items():
+            labels = {"route": route, "phase": phase}
+            cumulative_count = 0
+
+            for upper_bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative_count += count
+                histogram_samples.append(("_bucket", dict(labels, le=str(upper_bound)), cumulative_count))
+
+            histogram_samples.append(("_sum", labels, total))
+            histogram_samples.append(("_count", labels, cumulative_count))
+
+        request_samples = [
+            ("", {"route": route, "method": method, "status": status}, count)
+            for (route, method, status), count in requests
+        ]
+
+        return format_metric(
+            "valuation_request_phase_seconds", "histogram", "Time spent in each phase of a request.", histogram_samples
+        ) + format_metric("valuation_requests_total", "counter", "Finished requests.", request_samples)
+
+
+# Shared by every request served by this process
+request_metrics = RequestMetrics()
@@ -0,0 +1,252 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from src.bulk_valuation import DCF_COLUMNS
+from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
+from src.discounted_cash_flow import DiscountedCashFlow
+
+CAGR_COLUMNS = ("starting_value", "ending_value", "time_in_years")
+
+# Valuation classes with vectorized validate_batch() and calculate_batch(), and their input columns in order
+KERNELS = {
+    "dcf": (DiscountedCashFlow, DCF_COLUMNS),
+    "cagr": (CompoundedAnnualGrowthRate, CAGR_COLUMNS),
+}
+
+
+def _value_rows(kernel, columns, number_of_rows):
+    """
+    Values rows with the calculate_batch() of a kernel. Rows with an invalid input get NaN.
+
+    :param kernel: Key of KERNELS
+    :param columns: List of input arrays or scalars, in the order of the kernel's columns
+    :param number_of_rows: Number of rows
+    :return: Array of values
+    """
+
+    valuation_class, _ = KERNELS[kernel]
+    columns = [np.broadcast_to(np.asarray(values, dtype=float), number_of_rows) for values in columns]
+    values, _ = valuation_class.calculate_batch(*columns, invalid=np.nan)
+
+    return values
+
+
+def _value_shard(kernel, input_name, output_name, shape, scalars, start, stop):
+    """
+    Values rows start:stop of the shared input columns into the shared output array. Runs in worker processes and
+    only receives the names of the shared memory blocks, so no input or output rows are pickled.
+
+    :param kernel: Key of KERNELS
+    :param input_name: Name of the shared memory block holding the array columns, of shape (columns, rows)
+    :param output_name: Name of the shared memory block holding one output value per row
+    :param shape: Shape of the array columns
+    :param scalars: Dict mapping positions of the kernel's columns to values applied to every row
+    :param start: First row of the shard
+    :param stop: Row after the last row of the shard
+    :return: Dict with the start, stop, seconds and worker pid of the shard
+    """
+
+    started_at = time.perf_counter()
+    input_memory = SharedMemory(name=input_name)
+    output_memory = SharedMemory(name=output_name)
+
+    try:
+        shared_columns = iter(np.ndarray(shape, dtype=np.float64, buffer=input_memory.buf)[:, start:stop])
+        columns = [
+            scalars[position] if position in scalars else next(shared_columns)
+            for position in range(len(KERNELS[kernel][1]))
+        ]
+        outputs = np.ndarray(shape[1:], dtype=np.float64, buffer=output_memory.buf)
+        outputs[start:stop] = _value_rows(kernel, columns, stop - start)
+
+        # Views of the shared buffers must be released before the blocks can be closed
+        del shared_columns, columns, outputs
+
+    finally:
+        input_memory.close()
+        output_memory.close()
+
+    return {"start": start, "stop": stop, "seconds": time.perf_counter() - started_at, "pid": os.getpid()}
+
+
+def get_line_ranges(path, shards, start=0):
+    """
+    Splits a file from a byte offset into at most shards byte ranges of similar size that each start at the
+    beginning of a line, so every range can be parsed on its own.
+
+    :param path: File path
+    :param shards: Maximum number of ranges
+    :param start: Byte offset of the first range, such as the end of a CSV header
+    :return: List of (start, stop) byte offsets in file order
+    """
+
+    assert isinstance(shards, int), "shards must be of type int"
+    assert shards > 0, "shards must be greater than 0"
+
+    size = os.path.getsize(path)
+    boundaries = [start]
+
+    with open(path, "rb") as file:
+        for shard in range(1, shards):
+            # The line containing the byte before the target ends at the first line start at or after the target
+            file.seek(max(start + (size - start) * shard // shards - 1, boundaries[-1]))
+            file.readline()
+            position = file.tell()
+
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+
+    boundaries.append(max(size, start))
+
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def read_line_range(path, start, stop):
+    """
+    Lazily reads the lines of a byte range returned by get_line_ranges().
+
+    :param path: File path
+    :param start: Byte offset of the first line
+    :param stop: Byte offset after the last line
+    :return: Generator of text lines
+    """
+
+    with open(path, "rb") as file:
+        file.seek(start)
+        position = start
+
+        while position < stop:
+            line = file.readline()
+
+            if not line:
+                break
+
+            position += len(line)
+            yield line.decode("utf-8")
+
+
+class ParallelValuationRunner:
+    """
+    Values large batches with the closed-form kernels across a pool of worker processes. The input columns of a
+    batch are copied once into shared memory, and every worker values a contiguous shard of rows straight into a
+    shared output array, so rows are never pickled and the output order is the input order however the shards are
+    scheduled. The pool is kept between runs, so re-valuing a universe under several scenarios starts it once:
+
+        with ParallelValuationRunner(workers=8) as runner:
+            for scenario in scenarios:
+                values, shard_timings = runner.run("dcf", dict(columns, **scenario))
+    """
+
+    def __init__(self, workers=None, shards_per_worker=4, executor_factory=ProcessPoolExecutor):
+        """
+        Constructor.
+
+        :param workers: Number of worker processes; None to value the shards in this process
+        :param shards_per_worker: Number of shards per worker, so faster workers pick up the remaining shards
+        :param executor_factory: Function taking max_workers and returning a concurrent.futures.Executor
+        """
+
+        assert workers is None or isinstance(workers, int), "workers must be of type int"
+        assert workers is None or workers > 0, "workers must be greater than 0"
+        assert isinstance(shards_per_worker, int), "shards_per_worker must be of type int"
+        assert shards_per_worker > 0, "shards_per_worker must be greater than 0"
+
+        self.workers = workers
+        self.shards_per_worker = shards_per_worker
+        self._executor_factory = executor_factory
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def run(self, kernel, columns, shards=None):
+        """
+        Values every row of the input columns with a kernel. Rows with an invalid input get NaN.
+
+        :param kernel: "dcf" or "cagr"
+        :param columns: Dict mapping every column of the kernel, such as "revenue", to an array with one value per
+            row, or to a value applied to every row, in the constructor's units
+        :param shards: Number of shards; None for shards_per_worker per worker
+        :return: Tuple (array of values in row order, list of per-shard dicts with start, stop, seconds and pid)
+        """
+
+        assert kernel in KERNELS, f"{kernel} is not a supported kernel"
+
+        column_names = KERNELS[kernel][1]
+
+        for name in column_names:
+            assert name in columns, f"{name} is missing"
+
+        arrays = {position: np.asarray(columns[name], dtype=np.float64) for position, name in enumerate(column_names)}
+        scalars = {position: float(values) for position, values in arrays.items() if values.ndim == 0}
+        shared_arrays = [values for position, values in arrays.items() if position not in scalars]
+        number_of_rows = len(shared_arrays[0]) if shared_arrays else 1
+
+        for values in shared_arrays:
+            assert values.shape == (number_of_rows,), "columns must be one-dimensional and of the same length"
+
+        shards = shards or (self.workers or 1) * self.shards_per_worker
+        shards = max(min(shards, number_of_rows), 1)
+        boundaries = [number_of_rows * shard // shards for shard in range(shards + 1)]
+        shape = (len(shared_arrays), number_of_rows)
+
+        # Shared memory blocks cannot be empty
+        input_memory = SharedMemory(create=True, size=max(8 * len(shared_arrays) * number_of_rows, 1))
+        output_memory = SharedMemory(create=True, size=max(8 * number_of_rows, 1))
+
+        try:
+            if shared_arrays:
+                np.stack(shared_arrays, out=np.ndarray(shape, dtype=np.float64, buffer=input_memory.buf))
+
+            arguments = (
+                [kernel] * shards,
+                [input_memory.name] * shards,
+                [output_memory.name] * shards,
+                [shape] * shards,
+                [scalars] * shards,
+                boundaries[:-1],
+                boundaries[1:],
+            )
+
+            executor = self._get_executor()
+            shard_timings = list(executor.map(_value_shard, *arguments) if executor else map(_value_shard, *arguments))
+            values = np.ndarray(number_of_rows, dtype=np.float64, buffer=output_memory.buf).copy()
+
+        finally:
+            input_memory.close()
+            input_memory.unlink()
+            output_memory.close()
+            output_memory.unlink()
+
+        return values, shard_timings
+
+    def _get_executor(self):
+        """
+        Returns the worker pool, starting it on first use.
+
+        :return: concurrent.futures.Executor; None if workers is None
+        """
+
+        if self.workers is not None and self._executor is None:
+            self._executor = self._executor_factory(max_workers=self.workers)
+
+        return self._executor
+
+    def shutdown(self):
+        """
+        Stops the worker pool. A later run() starts a new one.
+
+        :return: None
+        """
+
+        executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown()
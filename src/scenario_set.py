@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+
+from src.discounted_cash_flow import ASSUMPTION_RULES, DiscountedCashFlow, _perpetuity_growth_multiple
+
+
+class ScenarioSet:
+    """
+    Named sets of DCF assumptions, such as bull, base and bear cases, each overriding some assumptions of a base
+    DiscountedCashFlow and optionally weighted by a probability. evaluate() values every scenario in one vectorized
+    call instead of constructing and calculating one DiscountedCashFlow per scenario:
+
+        scenarios = ScenarioSet({
+            "bull": {"revenue_growth_rate": 15, "terminal_multiple": 25, "probability": 25},
+            "base": {"probability": 50},
+            "bear": {"revenue_growth_rate": 2, "fcf_margin": 8, "terminal_multiple": 10, "probability": 25},
+        })
+        result = scenarios.evaluate(DiscountedCashFlow(1_000_000, 8, 10, 10, 10, 15))
+    """
+
+    __slots__ = ("assumption_sets", "probabilities")
+
+    def __init__(self, scenarios):
+        """
+        Constructor.
+
+        :param scenarios: Dict mapping each scenario name to a dict of the assumptions it overrides, in the
+            constructor's units, plus an optional "probability" in percent. Either every scenario has a
+            probability and they add up to 100, or none has and the scenarios are weighted equally.
+        """
+
+        assert isinstance(scenarios, dict), "scenarios must be of type dict"
+        assert len(scenarios) > 0, "scenarios must not be empty"
+
+        self.assumption_sets = {}
+        self.probabilities = {}
+
+        for name, scenario in scenarios.items():
+            assert isinstance(scenario, dict), f"scenario {name} must be of type dict"
+
+            assumptions = {key: value for key, value in scenario.items() if key != "probability"}
+
+            for assumption, value in assumptions.items():
+                DiscountedCashFlow.validate_assumption(assumption, value)
+
+            self.assumption_sets[name] = assumptions
+
+            if "probability" in scenario:
+                probability = scenario["probability"]
+
+                assert isinstance(probability, (int, float)), "probability must be of type int or float"
+                assert probability >= 0, "probability must be greater than or equal to 0"
+
+                self.probabilities[name] = probability
+
+        if self.probabilities:
+            assert len(self.probabilities) == len(scenarios), "either every scenario or none must have a probability"
+            assert math.isclose(sum(self.probabilities.values()), 100), "probabilities must add up to 100"
+
+        else:
+            self.probabilities = {name: 100 / len(scenarios) for name in scenarios}
+
+    def evaluate(self, discounted_cash_flow):
+        """
+        Values every scenario against a base DCF with one DiscountedCashFlow.calculate_batch() call. Assumptions
+        a scenario does not override keep the base's current values, and every scenario uses the base's terminal
+        method.
+
+        :param discounted_cash_flow: Base DiscountedCashFlow without schedules
+        :return: Dict with the DCF value of each scenario by name, and the probability-weighted DCF value
+        """
+
+        assert (
+            discounted_cash_flow.revenue_growth_schedule is None and discounted_cash_flow.fcf_margin_schedule is None
+        ), "scenarios do not support schedules"
+
+        columns = {
+            assumption: np.array(
+                [
+                    assumptions.get(assumption, getattr(discounted_cash_flow, assumption) * scale)
+                    for assumptions in self.assumption_sets.values()
+                ],
+                dtype=float,
+            )
+            for assumption, (_, _, _, scale) in ASSUMPTION_RULES.items()
+        }
+        terminal_growth_rates = columns.pop("terminal_growth_rate") / 100
+
+        if discounted_cash_flow.terminal_method == "perpetuity_growth":
+            desired_annual_returns = columns["desired_annual_return"] / 100
+
+            assert (
+                terminal_growth_rates < desired_annual_returns
+            ).all(), "terminal_growth_rate must be less than desired_annual_return"
+
+            columns["terminal_multiple"] = _perpetuity_growth_multiple(terminal_growth_rates, desired_annual_returns)
+
+        dcf_values = DiscountedCashFlow.calculate_batch(**columns)
+        weights = np.array([self.probabilities[name] for name in self.assumption_sets]) / 100
+
+        return {
+            "values": dict(zip(self.assumption_sets, dcf_values.tolist())),
+            "weighted_value": float(weights @ dcf_values),
+        }
@@ -0,0 +1,163 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class ValuationCache:
+    """Bounded LRU cache of valuation results keyed by normalized inputs, with an optional time-to-live."""
+
+    def __init__(self, max_size=1024, ttl=None, clock=time.monotonic):
+        """
+        Constructor.
+
+        :param max_size: Maximum number of results kept before the least recently used one is evicted
+        :param ttl: Seconds a result stays valid; None to keep results until they are evicted
+        :param clock: Function returning the current time in seconds
+        """
+
+        assert isinstance(max_size, int), "max_size must be of type int"
+        assert max_size > 0, "max_size must be greater than 0"
+        assert ttl is None or ttl > 0, "ttl must be greater than 0"
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(name, **parameters):
+        """
+        Builds a hashable key from a valuation name and its parameters. Parameters are sorted by name and
+        sequences are converted to tuples, so the same inputs always map to the same key regardless of keyword
+        order. Types are part of the key so that, for example, time_in_years=10.0 never hits a result computed
+        for time_in_years=10.
+
+        :param name: Name of the valuation, such as the class name
+        :param parameters: Valuation parameters
+        :return: Cache key
+        """
+
+        normalized_parameters = []
+
+        for parameter, value in sorted(parameters.items()):
+            if isinstance(value, (list, tuple)) or getattr(value, "ndim", 0) > 0:
+                value = tuple(float(item) for item in value)
+
+            normalized_parameters.append((parameter, type(value).__name__, value))
+
+        return (name,) + tuple(normalized_parameters)
+
+    def get(self, key, default=None):
+        """
+        Looks up a cached result and marks it as most recently used.
+
+        :param key: Key built with make_key()
+        :param default: Value returned on a miss
+        :return: Cached result, or default if there is none or it has expired
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[0]
+
+    def put(self, key, value):
+        """
+        Stores a result, evicting the least recently used result if the cache is full.
+
+        :param key: Key built with make_key()
+        :param value: Result to store
+        :return: None
+        """
+
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached result for key, calling compute() and caching its result on a miss. Exceptions raised
+        by compute() are not cached.
+
+        :param key: Key built with make_key()
+        :param compute: Function without arguments returning the result
+        :return: Result
+        """
+
+        missing = object()
+        value = self.get(key, missing)
+
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+
+        return value
+
+    def calculate(self, valuation_class, **parameters):
+        """
+        Returns valuation_class(**parameters).calculate(), only constructing the object on a cache miss.
+
+        :param valuation_class: DiscountedCashFlow, CompoundedAnnualGrowthRate or another class with calculate()
+        :param parameters: Constructor parameters
+        :return: Calculated value
+        """
+
+        key = self.make_key(valuation_class.__name__, **parameters)
+
+        return self.get_or_compute(key, lambda: valuation_class(**parameters).calculate())
+
+    def clear(self):
+        """
+        Removes every cached result. The counters are kept.
+
+        :return: None
+        """
+
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+        """
+        Returns the cache counters.
+
+        :return: Dict of hits, misses, evictions, expirations, size and max_size
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+        }
+
+
+# Shared by every DiscountedCashFlow and CompoundedAnnualGrowthRate calculation served by this process
+valuation_cache = ValuationCache()
@@ -0,0 +1,60 @@
+import json
+import time
+
+
+class ValuationTrace:
+    """
+    In-memory record of one traced valuation: its assumptions, the components of every year, the terminal value,
+    the result and wall-clock timings in seconds. Filled in by DiscountedCashFlow.trace().
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        """
+        Constructor.
+
+        :param clock: Function returning the current time in seconds
+        """
+
+        self.clock = clock
+        self.assumptions = {}
+        self.years = {}
+        self.terminal = {}
+        self.timings = {}
+        self.result = None
+
+    def record_year(self, year, **components):
+        """
+        Records components of a year, such as its revenue or present value, merging them with the ones already
+        recorded for that year.
+
+        :param year: Year of the components
+        :param components: Component names and values
+        :return: None
+        """
+
+        self.years.setdefault(year, {"year": year}).update(components)
+
+    def to_dict(self):
+        """
+        Returns the trace as plain Python types.
+
+        :return: Dict of assumptions, years as a list ordered by year, terminal, timings and result
+        """
+
+        return {
+            "assumptions": dict(self.assumptions),
+            "years": [dict(self.years[year]) for year in sorted(self.years)],
+            "terminal": dict(self.terminal),
+            "timings": dict(self.timings),
+            "result": self.result,
+        }
+
+    def to_json(self, **json_options):
+        """
+        Serializes the trace for offline analysis.
+
+        :param json_options: Keyword arguments of json.dumps(), such as indent
+        :return: JSON string
+        """
+
+        return json.dumps(self.to_dict(), **json_options)
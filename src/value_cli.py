@@ -0,0 +1,270 @@
+"""
+Streaming command-line valuation of CSV or NDJSON files:
+
+    python -m src.value_cli dcf input.csv
+    python -m src.value_cli dcf input.ndjson --output values.ndjson --chunk-size 50000
+    cat input.csv | python -m src.value_cli dcf - > values.csv
+    python -m src.value_cli dcf universe.csv --output values.csv --workers 8
+
+Rows are read lazily, valued in fixed-size vectorized chunks and written as soon as their chunk is valued, so
+memory stays constant however large the input is. Each input row needs the DCF columns in the constructor's
+units; other columns, such as a ticker, are passed through. Invalid rows get an "error" instead of a "dcf_value".
+
+With --workers, the input file is split at line boundaries into shards that worker processes read, value and
+write to temporary files on their own; the shards are then concatenated in input order. CSV fields must not
+contain line breaks in this mode.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from src.bulk_valuation import peek_columns, read_csv_rows, read_ndjson_rows, value_dcf_rows, write_csv, write_ndjson
+from src.parallel_valuation import get_line_ranges, read_line_range
+
+READERS = {"csv": read_csv_rows, "ndjson": read_ndjson_rows}
+WRITERS = {"csv": write_csv, "ndjson": write_ndjson}
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+def get_format(path, requested_format):
+    """
+    Returns the requested file format, or infers it from the file extension.
+
+    :param path: File path, or "-" for a standard stream
+    :param requested_format: "csv", "ndjson" or None to infer it
+    :return: "csv" or "ndjson"
+    """
+
+    if requested_format is not None:
+        return requested_format
+
+    return "ndjson" if path.lower().endswith(NDJSON_EXTENSIONS) else "csv"
+
+
+def open_text(path, mode, standard_stream):
+    """
+    Opens a text file for the csv module, or returns a standard stream for "-".
+
+    :param path: File path, or "-"
+    :param mode: "r" or "w"
+    :param standard_stream: sys.stdin or sys.stdout
+    :return: Text file object
+    """
+
+    if path == "-":
+        return standard_stream
+
+    return open(path, mode, newline="", encoding="utf-8")
+
+
+def get_writer(output_format, columns):
+    """
+    Returns the serializer of an output format.
+
+    :param output_format: "csv" or "ndjson"
+    :param columns: Passed-through columns of the CSV header, see peek_columns()
+    :return: Function taking results and returning a generator of lines
+    """
+
+    if output_format == "csv":
+        return lambda results: write_csv(results, columns=columns)
+
+    return WRITERS[output_format]
+
+
+def count_results(results, counts):
+    """
+    Passes results through, counting them and the ones with an error.
+
+    :param results: Iterable of result dicts
+    :param counts: Dict with "rows" and "errors" counts, updated in place
+    :return: Generator of result dicts
+    """
+
+    for result in results:
+        counts["rows"] += 1
+        counts["errors"] += "error" in result
+        yield result
+
+
+def _value_shard(input_path, input_format, header, start, stop, output_path, output_format, columns, chunk_size):
+    """
+    Values the rows of one byte range of the input file into a temporary output file. Runs in worker processes.
+
+    :param input_path: Input file path
+    :param input_format: "csv" or "ndjson"
+    :param header: CSV header line prepended to the range; None for NDJSON
+    :param start: Byte offset of the first line of the range
+    :param stop: Byte offset after the last line of the range
+    :param output_path: Output file path of the shard
+    :param output_format: "csv" or "ndjson"
+    :param columns: Passed-through columns of the CSV header, see peek_columns()
+    :param chunk_size: Number of rows valued per vectorized call
+    :return: Dict with the rows, errors and seconds of the shard
+    """
+
+    started_at = time.perf_counter()
+    counts = {"rows": 0, "errors": 0}
+    lines = read_line_range(input_path, start, stop)
+
+    with open(output_path, "w", newline="", encoding="utf-8") as output_file:
+        rows = READERS[input_format](chain([header], lines) if header else lines)
+        results = count_results(value_dcf_rows(rows, chunk_size=chunk_size), counts)
+        output_file.writelines(get_writer(output_format, columns)(results))
+
+    return dict(counts, seconds=time.perf_counter() - started_at)
+
+
+def value_in_parallel(arguments, input_format, output_format, output_file):
+    """
+    Values the input file in shards across worker processes and writes the results in input order.
+
+    :param arguments: argparse.Namespace from parse_arguments()
+    :param input_format: "csv" or "ndjson"
+    :param output_format: "csv" or "ndjson"
+    :param output_file: Text file object receiving the results
+    :return: List of per-shard dicts with the rows, errors and seconds of each shard
+    """
+
+    header = None
+
+    if input_format == "csv":
+        with open(arguments.input, "rb") as input_file:
+            header = input_file.readline().decode("utf-8")
+
+    with open_text(arguments.input, "r", None) as input_file:
+        columns, _ = peek_columns(input_file, input_format)
+
+    line_ranges = get_line_ranges(
+        arguments.input, arguments.workers * 4, start=len(header.encode("utf-8")) if header else 0
+    )
+
+    with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(max_workers=arguments.workers) as executor:
+        output_paths = [os.path.join(directory, f"shard-{shard}") for shard in range(len(line_ranges))]
+        shard_results = list(
+            executor.map(
+                _value_shard,
+                [arguments.input] * len(line_ranges),
+                [input_format] * len(line_ranges),
+                [header] * len(line_ranges),
+                *zip(*line_ranges),
+                output_paths,
+                [output_format] * len(line_ranges),
+                [columns] * len(line_ranges),
+                [arguments.chunk_size] * len(line_ranges),
+            )
+        )
+
+        # Every CSV shard starts with the same header line, which is only written once
+        header_written = False
+
+        for output_path, shard_result in zip(output_paths, shard_results):
+            if shard_result["rows"] or (output_path == output_paths[-1] and not header_written):
+                with open(output_path, newline="", encoding="utf-8") as shard_file:
+                    if output_format == "csv" and header_written:
+                        shard_file.readline()
+
+                    shutil.copyfileobj(shard_file, output_file)
+                    header_written = True
+
+    return shard_results
+
+
+def parse_arguments(argv):
+    """
+    Parses the command-line arguments.
+
+    :param argv: Arguments without the program name
+    :return: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.value_cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="valuation", required=True)
+
+    dcf_parser = subparsers.add_parser("dcf", help="value every row with DiscountedCashFlow")
+    dcf_parser.add_argument("input", help="CSV or NDJSON file, or - for standard input")
+    dcf_parser.add_argument("--output", "-o", default="-", help="output file, or - for standard output (default)")
+    dcf_parser.add_argument("--input-format", choices=sorted(READERS), help="default: from the input extension")
+    dcf_parser.add_argument("--output-format", choices=sorted(WRITERS), help="default: the input format")
+    dcf_parser.add_argument("--chunk-size", type=int, default=10_000, help="rows valued per vectorized call")
+    dcf_parser.add_argument("--workers", type=int, help="value shards of the input file in this many processes")
+    dcf_parser.add_argument("--quiet", "-q", action="store_true", help="do not print a summary to standard error")
+
+    arguments = parser.parse_args(argv)
+
+    if arguments.chunk_size <= 0:
+        parser.error("--chunk-size must be greater than 0")
+
+    if arguments.workers is not None and arguments.workers <= 0:
+        parser.error("--workers must be greater than 0")
+
+    if arguments.workers is not None and arguments.input == "-":
+        parser.error("--workers needs an input file")
+
+    return arguments
+
+
+def main(argv=None):
+    """
+    Runs the command line.
+
+    :param argv: Arguments without the program name; None for sys.argv[1:]
+    :return: Exit status: 0 if every row was valued, 1 if some rows had errors
+    """
+
+    arguments = parse_arguments(argv)
+    input_format = get_format(arguments.input, arguments.input_format)
+    output_format = arguments.output_format or (
+        input_format if arguments.output == "-" else get_format(arguments.output, None)
+    )
+    counts = {"rows": 0, "errors": 0}
+    shard_results = []
+
+    started_at = time.perf_counter()
+    input_file = open_text(arguments.input, "r", sys.stdin)
+    output_file = open_text(arguments.output, "w", sys.stdout)
+
+    try:
+        if arguments.workers:
+            shard_results = value_in_parallel(arguments, input_format, output_format, output_file)
+            counts = {key: sum(shard_result[key] for shard_result in shard_results) for key in counts}
+
+        else:
+            columns, lines = peek_columns(input_file, input_format)
+            rows = READERS[input_format](lines)
+            results = count_results(value_dcf_rows(rows, chunk_size=arguments.chunk_size), counts)
+            output_file.writelines(get_writer(output_format, columns)(results))
+
+    finally:
+        if input_file is not sys.stdin:
+            input_file.close()
+
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    if not arguments.quiet:
+        for shard, shard_result in enumerate(shard_results, start=1):
+            print(
+                f"Shard {shard}/{len(shard_results)}: {shard_result['rows']:,} rows in {shard_result['seconds']:.2f}s",
+                file=sys.stderr,
+            )
+
+        elapsed = time.perf_counter() - started_at
+        print(
+            f"Valued {counts['rows']:,} rows ({counts['errors']:,} with errors) in {elapsed:.2f}s",
+            file=sys.stderr,
+        )
+
+    return 1 if counts["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+/*
+ * In-browser DCF and CAGR calculators. The formulas and validation rules mirror DiscountedCashFlow and
+ * CompoundedAnnualGrowthRate in src/, and are checked against them with tests/vectors/valuation_vectors.json,
+ * so results update as the inputs change without a round trip. The forms still POST to the server when
+ * JavaScript is unavailable.
+ */
+
+"use strict";
+
+/**
+ * Validates DCF inputs with the same rules and messages as the DiscountedCashFlow constructor.
+ *
+ * @param {Object} inputs revenue, revenueGrowthRate, timeInYears, fcfMargin, desiredAnnualReturn and
+ *     terminalMultiple, with rates in percent
+ * @return {?string} Message of the first violated rule; null if the inputs are valid
+ */
+function validateDcfInputs(inputs) {
+    const rules = [
+        [Number.isFinite(inputs.revenue), "revenue must be of type int or float"],
+        [inputs.revenue >= 0, "revenue must be greater than or equal to 0"],
+        [Number.isFinite(inputs.revenueGrowthRate), "revenue_growth_rate must be of type int or float"],
+        [inputs.revenueGrowthRate >= -100, "revenue_growth_rate must be greater than or equal to -100"],
+        [Number.isInteger(inputs.timeInYears), "time_in_years must be of type int"],
+        [inputs.timeInYears > 0, "time_in_years must be greater than 0"],
+        [Number.isFinite(inputs.fcfMargin), "fcf_margin must be of type int or float"],
+        [inputs.fcfMargin >= 0, "fcf_margin must be greater than or equal to 0"],
+        [Number.isFinite(inputs.desiredAnnualReturn), "desired_annual_return must be of type int or float"],
+        [inputs.desiredAnnualReturn >= 0, "desired_annual_return must be greater than or equal to 0"],
+        [Number.isFinite(inputs.terminalMultiple), "terminal_multiple must be of type int or float"],
+        [inputs.terminalMultiple >= 0, "terminal_multiple must be greater than or equal to 0"],
+    ];
+    const violated = rules.find(([valid]) => !valid);
+
+    return violated ? violated[1] : null;
+}
+
+/**
+ * Calculates the DCF value with the closed-form geometric series of DiscountedCashFlow.calculate(). With
+ * Q = (1 + REVENUE_GROWTH_RATE) / (1 + DESIRED_ANNUAL_RETURN):
+ *
+ *     DCF = REVENUE * FCF_MARGIN * (Q * (Q ^ T - 1) / (Q - 1) + TERMINAL_MULTIPLE * Q ^ T)
+ *
+ * @param {Object} inputs See validateDcfInputs()
+ * @return {number} DCF value
+ */
+function calculateDcf(inputs) {
+    const error = validateDcfInputs(inputs);
+
+    if (error) {
+        throw new RangeError(error);
+    }
+
+    const revenueGrowthRate = inputs.revenueGrowthRate / 100;
+    const desiredAnnualReturn = inputs.desiredAnnualReturn / 100;
+    const initialCashFlow = inputs.revenue * (inputs.fcfMargin / 100);
+    const growthFactor = 1 + revenueGrowthRate;
+    const discountFactor = 1 + desiredAnnualReturn;
+    let operatingFactor;
+    let terminalFactor;
+
+    if (initialCashFlow === 0) {
+        return 0;
+    }
+
+    if (growthFactor === 0) {
+        operatingFactor = 0;
+        terminalFactor = 0;
+    } else if (growthFactor === discountFactor) {
+        operatingFactor = inputs.timeInYears;
+        terminalFactor = 1;
+    } else {
+        const ratioMinusOne = (revenueGrowthRate - desiredAnnualReturn) / discountFactor;
+        const logRatioToTime = inputs.timeInYears * Math.log1p(ratioMinusOne);
+        operatingFactor = ((1 + ratioMinusOne) * Math.expm1(logRatioToTime)) / ratioMinusOne;
+        terminalFactor = Math.exp(logRatioToTime);
+    }
+
+    return initialCashFlow * (operatingFactor + inputs.terminalMultiple * terminalFactor);
+}
+
+/**
+ * Validates CAGR inputs with the same rules and messages as the CompoundedAnnualGrowthRate constructor.
+ *
+ * @param {Object} inputs startingValue, endingValue and timeInYears
+ * @return {?string} Message of the first violated rule; null if the inputs are valid
+ */
+function validateCagrInputs(inputs) {
+    const rules = [
+        [Number.isFinite(inputs.startingValue), "starting_value must be of type int or float"],
+        [inputs.startingValue > 0, "starting_value must be greater than 0"],
+        [Number.isFinite(inputs.endingValue), "ending_value must be of type int or float"],
+        [inputs.endingValue >= 0, "ending_value must be greater than or equal to 0"],
+        [Number.isInteger(inputs.timeInYears), "time_in_years must be of type int"],
+        [inputs.timeInYears > 0, "time_in_years must be greater than 0"],
+    ];
+    const violated = rules.find(([valid]) => !valid);
+
+    return violated ? violated[1] : null;
+}
+
+/**
+ * Calculates the CAGR in percent like CompoundedAnnualGrowthRate.calculate():
+ *
+ *     CAGR = ((ENDING_VALUE / STARTING_VALUE) ^ (1 / TIME_IN_YEARS) - 1) * 100
+ *
+ * @param {Object} inputs See validateCagrInputs()
+ * @return {number} CAGR value
+ */
+function calculateCagr(inputs) {
+    const error = validateCagrInputs(inputs);
+
+    if (error) {
+        throw new RangeError(error);
+    }
+
+    return (Math.pow(inputs.endingValue / inputs.startingValue, 1 / inputs.timeInYears) - 1) * 100;
+}
+
+/**
+ * Formats a number like Python's "{:,.2f}".format().
+ *
+ * @param {number} value Number
+ * @return {string} Formatted number
+ */
+function formatNumber(value) {
+    return value.toLocaleString("en-US", { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+}
+
+/**
+ * Parses a form field like the Flask views: commas are ignored and empty fields are NaN.
+ *
+ * @param {HTMLFormElement} form Form
+ * @param {string} name Field name
+ * @return {number} Parsed number
+ */
+function readNumber(form, name) {
+    const value = form.elements[name].value.replace(/,/g, "").trim();
+
+    return value === "" ? NaN : Number(value);
+}
+
+/**
+ * Recalculates the value of the calculator form on the page and shows it, or the first invalid input. Nothing
+ * changes until every required field has a value.
+ *
+ * @param {HTMLFormElement} form Calculator form
+ * @param {HTMLElement} output Element showing the result
+ * @return {void}
+ */
+function updateOutput(form, output) {
+    if (Array.from(form.elements).some((element) => element.required && element.value.trim() === "")) {
+        return;
+    }
+
+    try {
+        if (form.elements["revenue"]) {
+            const dcfValue = calculateDcf({
+                revenue: readNumber(form, "revenue"),
+                revenueGrowthRate: readNumber(form, "revenue-growth-rate"),
+                timeInYears: readNumber(form, "time"),
+                fcfMargin: readNumber(form, "fcf-margin"),
+                desiredAnnualReturn: readNumber(form, "return"),
+                terminalMultiple: readNumber(form, "pfcf-ratio"),
+            });
+            output.textContent = `DCF Value: $${formatNumber(dcfValue)}`;
+        } else {
+            const cagr = calculateCagr({
+                startingValue: readNumber(form, "starting-value"),
+                endingValue: readNumber(form, "ending-value"),
+                timeInYears: readNumber(form, "time"),
+            });
+            output.textContent = `CAGR: ${formatNumber(cagr)}%`;
+        }
+    } catch (error) {
+        if (!(error instanceof RangeError)) {
+            throw error;
+        }
+
+        output.textContent = error.message;
+    }
+}
+
+if (typeof document !== "undefined") {
+    document.addEventListener("DOMContentLoaded", () => {
+        const form = document.getElementById("form");
+        const output = document.getElementById("output2");
+
+        if (form && output) {
+            const initialOutput = output.textContent;
+
+            form.addEventListener("input", () => updateOutput(form, output));
+            form.addEventListener("reset", () => {
+                output.textContent = initialOutput;
+            });
+        }
+    });
+}
+
+if (typeof module !== "undefined") {
+    module.exports = { calculateCagr, calculateDcf, formatNumber, validateCagrInputs, validateDcfInputs };
+}
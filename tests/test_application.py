@@ -1,5 +1,633 @@
+import csv
+import io
+import json
+import time
+
 import pytest
 
+from application import application
+from src.discounted_cash_flow import DiscountedCashFlow
+from src.metrics import request_metrics
+from src.valuation_cache import valuation_cache
+
+
+@pytest.fixture
+def client():
+    application.config["TESTING"] = True
+
+    with application.test_client() as client:
+        yield client
+
 
 def test_app():
     pass
+
+
+class TestDiscountedCashFlowSensitivity:
+    parameters = {
+        "revenue": "1,000,000",
+        "fcf-margin": "10",
+        "pfcf-ratio": "10",
+        "time": "10",
+        "revenue-growth-rates": "-5,0,5",
+        "returns": "5,10",
+    }
+
+    def test_sensitivity_returns_json_grid(self, client):
+        """Tests /dcf-calculator/sensitivity returns the full grid of DCF values as JSON."""
+
+        response = client.get("/dcf-calculator/sensitivity", query_string=self.parameters)
+
+        assert response.status_code == 200
+        assert response.json["revenue_growth_rates"] == [-5, 0, 5]
+        assert response.json["desired_annual_returns"] == [5, 10]
+
+        expected_grid = DiscountedCashFlow(
+            revenue=1_000_000, time_in_years=10, fcf_margin=10, terminal_multiple=10
+        ).sensitivity_grid([-5, 0, 5], [5, 10])
+
+        for row, expected_row in zip(response.json["values"], expected_grid.tolist()):
+            assert row == pytest.approx(expected_row)
+
+        assert round(response.json["values"][2][1], 2) == 1_409_189.67
+
+    def test_sensitivity_streams_csv(self, client):
+        """Tests /dcf-calculator/sensitivity streams one CSV line per growth rate when format=csv."""
+
+        response = client.post("/dcf-calculator/sensitivity", data={**self.parameters, "format": "csv"})
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/csv"
+
+        lines = response.get_data(as_text=True).splitlines()
+
+        assert lines[0] == "revenue_growth_rate,5.0,10.0"
+        assert len(lines) == 4
+        assert lines[3].startswith("5.0,")
+
+    def test_sensitivity_with_values_out_of_range(self, client):
+        """Tests /dcf-calculator/sensitivity writes DCF values out of float range as null in JSON and empty in CSV."""
+
+        parameters = {**self.parameters, "revenue": "1e300", "time": "100", "revenue-growth-rates": "0,1000"}
+
+        response = client.get("/dcf-calculator/sensitivity", query_string={**parameters, "returns": "0"})
+
+        assert response.status_code == 200
+        assert response.json["values"] == [[pytest.approx(1.1e301)], [None]]
+
+        response = client.get(
+            "/dcf-calculator/sensitivity", query_string={**parameters, "returns": "0", "format": "csv"}
+        )
+
+        assert response.get_data(as_text=True).splitlines()[2] == "1000.0,"
+
+    def test_sensitivity_with_invalid_parameters(self, client):
+        """Tests /dcf-calculator/sensitivity responds 400 to missing or invalid parameters."""
+
+        response = client.get("/dcf-calculator/sensitivity", query_string={**self.parameters, "returns": "-1"})
+
+        assert response.status_code == 400
+        assert response.json["error"] == "discount_rates must be greater than or equal to 0"
+
+        response = client.get("/dcf-calculator/sensitivity", query_string={"revenue": "10"})
+
+        assert response.status_code == 400
+
+    def test_sensitivity_grid_size_is_capped(self, client):
+        """Tests /dcf-calculator/sensitivity responds 400 to more than 500 rates on either side of the grid."""
+
+        rates = ",".join(str(rate) for rate in range(501))
+
+        response = client.get("/dcf-calculator/sensitivity", query_string={**self.parameters, "returns": rates})
+
+        assert response.status_code == 400
+        assert response.json["error"] == "returns must have at most 500 rates"
+
+        response = client.get(
+            "/dcf-calculator/sensitivity", query_string={**self.parameters, "revenue-growth-rates": rates}
+        )
+
+        assert response.status_code == 400
+        assert response.json["error"] == "revenue-growth-rates must have at most 500 rates"
+
+        response = client.post(
+            "/dcf-calculator/sensitivity", data={**self.parameters, "returns": rates.removesuffix(",500")}
+        )
+
+        assert response.status_code == 200
+        assert len(response.json["values"][0]) == 500
+
+
+class TestCalculatorForms:
+    def test_dcf_calculator_reuses_cached_result(self, client):
+        """Tests POST /dcf-calculator renders the DCF value and serves repeat submissions from the cache."""
+
+        form = {
+            "revenue": "1,000,000",
+            "revenue-growth-rate": "5",
+            "fcf-margin": "10",
+            "pfcf-ratio": "10",
+            "return": "10",
+            "time": "10",
+        }
+        hits = valuation_cache.get_stats()["hits"]
+
+        for submission in range(2):
+            response = client.post("/dcf-calculator", data=form)
+
+            assert response.status_code == 200
+            assert "DCF Value: $1,409,189.67" in response.get_data(as_text=True)
+
+        assert valuation_cache.get_stats()["hits"] >= hits + 1
+
+    def test_cagr_calculator(self, client):
+        """Tests POST /cagr-calculator renders the CAGR value."""
+
+        response = client.post("/cagr-calculator", data={"starting-value": "100", "ending-value": "200", "time": "5"})
+
+        assert response.status_code == 200
+        assert "CAGR: 14.87%" in response.get_data(as_text=True)
+
+
+class TestJsonApi:
+    dcf_parameters = {
+        "revenue": 1_000_000,
+        "revenue_growth_rate": 5,
+        "time_in_years": 10,
+        "fcf_margin": 10,
+        "desired_annual_return": 10,
+        "terminal_multiple": 10,
+    }
+
+    def test_dcf_api_with_perpetuity_growth(self, client):
+        """Tests GET /api/v1/dcf accepts the perpetuity growth terminal method in the query string."""
+
+        parameters = dict(self.dcf_parameters, terminal_method="perpetuity_growth", terminal_growth_rate=3)
+
+        response = client.get("/api/v1/dcf", query_string=dict(parameters, breakdown="false"))
+
+        assert response.status_code == 200
+        assert response.json["dcf_value"] == pytest.approx(DiscountedCashFlow(**parameters).calculate())
+
+    def test_dcf_api_returns_value_and_breakdown(self, client):
+        """Tests POST /api/v1/dcf returns the raw DCF value, terminal value and per-year breakdown."""
+
+        response = client.post("/api/v1/dcf", json=self.dcf_parameters)
+
+        assert response.status_code == 200
+        assert round(response.json["dcf_value"], 2) == 1_409_189.67
+        assert response.json["terminal_value"] == pytest.approx(10 * response.json["years"]["present_value"][-1])
+        assert len(response.json["years"]["revenue"]) == 10
+        assert response.json["years"]["revenue"][0] == pytest.approx(1_050_000)
+        assert response.json["years"]["cash_flow"][0] == pytest.approx(105_000)
+
+        response = client.post("/api/v1/dcf?breakdown=false", json=self.dcf_parameters)
+
+        assert "years" not in response.json
+
+    def test_dcf_api_with_invalid_parameters(self, client):
+        """Tests POST /api/v1/dcf responds 400 with the validation error."""
+
+        response = client.post("/api/v1/dcf", json={**self.dcf_parameters, "revenue": -1})
+
+        assert response.status_code == 400
+        assert response.json["error"] == "revenue must be greater than or equal to 0"
+
+        response = client.post("/api/v1/dcf", json={**self.dcf_parameters, "ticker": "ABC"})
+
+        assert response.status_code == 400
+
+        response = client.post("/api/v1/dcf", data="revenue=10")
+
+        assert response.status_code == 400
+        assert response.json["error"] == "request body must be a JSON object"
+
+    def test_dcf_api_over_long_horizons(self, client):
+        """Tests POST /api/v1/dcf breaks long horizons down with finite present values and rejects longer ones."""
+
+        parameters = {**self.dcf_parameters, "revenue_growth_rate": 200, "desired_annual_return": 200}
+
+        response = client.post("/api/v1/dcf", json={**parameters, "time_in_years": 1000})
+
+        assert response.status_code == 200
+        assert b": " not in response.data
+        assert response.json["years"]["present_value"] == pytest.approx([100_000] * 1000)
+        assert response.json["years"]["revenue"][-1] is None
+
+        response = client.post("/api/v1/dcf", json={**parameters, "time_in_years": 1001})
+
+        assert response.status_code == 400
+        assert response.json["error"] == (
+            "time_in_years must be less than or equal to 1000 with a breakdown; pass breakdown=false"
+        )
+
+        response = client.get(
+            "/api/v1/dcf", query_string={**parameters, "time_in_years": 100_000, "breakdown": "false"}
+        )
+
+        assert response.status_code == 200
+        assert response.json["dcf_value"] == pytest.approx(100_000 * 100_010)
+
+    def test_apis_with_values_out_of_range(self, client):
+        """Tests the JSON APIs respond 400 instead of 500 when a value is out of float range."""
+
+        parameters = {**self.dcf_parameters, "revenue_growth_rate": 100, "time_in_years": 1100}
+        parameters["desired_annual_return"] = 0
+
+        response = client.post("/api/v1/dcf", json=parameters)
+
+        assert response.status_code == 400
+        assert response.json["error"] == "dcf_value is out of range"
+
+        response = client.post("/api/v1/dcf/scenarios", json={"base": parameters, "scenarios": [{"name": "base"}]})
+
+        assert response.status_code == 400
+        assert response.json["error"] == "dcf_value is out of range"
+
+        response = client.post(
+            "/api/v1/cagr", json={"starting_value": 1e-300, "ending_value": 1e300, "time_in_years": 1}
+        )
+
+        assert response.status_code == 400
+        assert response.json["error"] == "cagr is out of range"
+
+    def test_cagr_api_returns_value_and_breakdown(self, client):
+        """Tests POST /api/v1/cagr returns the raw CAGR and the value at the end of each year."""
+
+        response = client.post("/api/v1/cagr", json={"starting_value": 100, "ending_value": 200, "time_in_years": 5})
+
+        assert response.status_code == 200
+        assert round(response.json["cagr"], 2) == 14.87
+        assert len(response.json["years"]["value"]) == 5
+        assert response.json["years"]["value"][-1] == pytest.approx(200)
+
+    def test_cagr_api_with_invalid_parameters(self, client):
+        """Tests POST /api/v1/cagr responds 400 with the validation error."""
+
+        response = client.post("/api/v1/cagr", json={"starting_value": 0, "ending_value": 200, "time_in_years": 5})
+
+        assert response.status_code == 400
+        assert response.json["error"] == "starting_value must be greater than 0"
+
+
+class TestBulkApi:
+    csv_body = (
+        "ticker,revenue,revenue_growth_rate,time_in_years,fcf_margin,desired_annual_return,terminal_multiple\n"
+        "ABC,1000000,5,10,10,10,10\n"
+        "XYZ,-1,5,10,10,10,10\n"
+    )
+
+    def test_bulk_api_with_json_array(self, client):
+        """Tests POST /api/v1/dcf/bulk values a JSON array and streams NDJSON back."""
+
+        rows = [dict(TestJsonApi.dcf_parameters, ticker=ticker) for ticker in ("ABC", "XYZ")]
+
+        response = client.post("/api/v1/dcf/bulk", json=rows)
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert [result["ticker"] for result in results] == ["ABC", "XYZ"]
+        assert [round(result["dcf_value"], 2) for result in results] == [1_409_189.67, 1_409_189.67]
+
+    def test_bulk_api_with_ndjson(self, client):
+        """Tests POST /api/v1/dcf/bulk values an NDJSON body in chunks."""
+
+        body = "".join(json.dumps(dict(TestJsonApi.dcf_parameters, ticker=index)) + "\n" for index in range(5))
+
+        response = client.post("/api/v1/dcf/bulk?chunk_size=2", data=body, content_type="application/x-ndjson")
+
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert [result["ticker"] for result in results] == [0, 1, 2, 3, 4]
+
+    def test_bulk_api_with_csv(self, client):
+        """Tests POST /api/v1/dcf/bulk values a CSV body and a CSV upload and streams CSV back."""
+
+        expected_lines = [
+            "ticker,dcf_value,error",
+            "ABC,1409189.6682039495,",
+            "XYZ,,revenue must be greater than or equal to 0",
+        ]
+
+        response = client.post("/api/v1/dcf/bulk", data=self.csv_body, content_type="text/csv")
+
+        assert response.mimetype == "text/csv"
+        assert response.get_data(as_text=True).splitlines() == expected_lines
+
+        response = client.post(
+            "/api/v1/dcf/bulk",
+            data={"file": (io.BytesIO(self.csv_body.encode()), "universe.csv")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.get_data(as_text=True).splitlines() == expected_lines
+
+    def test_bulk_api_reports_unreadable_rows(self, client):
+        """Tests POST /api/v1/dcf/bulk reports rows that are not objects or not JSON without truncating the body."""
+
+        response = client.post("/api/v1/dcf/bulk", json=[1, TestJsonApi.dcf_parameters])
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert response.status_code == 200
+        assert results[0] == {"error": "row must be a JSON object"}
+        assert round(results[1]["dcf_value"], 2) == 1_409_189.67
+
+        body = "not json\n" + json.dumps(TestJsonApi.dcf_parameters) + "\n"
+        response = client.post("/api/v1/dcf/bulk", data=body, content_type="application/x-ndjson")
+        results = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        assert results[0]["error"].startswith("line 1 is not valid JSON: ")
+        assert round(results[1]["dcf_value"], 2) == 1_409_189.67
+
+    def test_bulk_api_keeps_csv_header_when_first_row_is_unreadable(self, client):
+        """Tests POST /api/v1/dcf/bulk takes the CSV header from the input, not from the first result."""
+
+        header, row, _ = self.csv_body.splitlines()
+        limit = csv.field_size_limit(100)
+
+        try:
+            body = f"{header}\n{'x' * 200}\n{row}\n"
+            response = client.post("/api/v1/dcf/bulk", data=body, content_type="text/csv")
+            lines = response.get_data(as_text=True).splitlines()
+
+        finally:
+            csv.field_size_limit(limit)
+
+        assert lines == [
+            "ticker,dcf_value,error",
+            ",,line 2 is not valid CSV: field larger than field limit (100)",
+            "ABC,1409189.6682039495,",
+        ]
+
+    def test_bulk_api_with_invalid_body(self, client):
+        """Tests POST /api/v1/dcf/bulk responds 400 to bodies it cannot read."""
+
+        response = client.post("/api/v1/dcf/bulk", json={"revenue": 10})
+
+        assert response.status_code == 400
+
+        response = client.post("/api/v1/dcf/bulk?chunk_size=0", json=[])
+
+        assert response.status_code == 400
+
+
+class TestScenariosApi:
+    def test_scenarios_api(self, client):
+        """Tests POST /api/v1/dcf/scenarios values every scenario in order with the probability-weighted value."""
+
+        response = client.post(
+            "/api/v1/dcf/scenarios",
+            json={
+                "base": TestJsonApi.dcf_parameters,
+                "scenarios": [
+                    {"name": "bull", "revenue_growth_rate": 15, "probability": 25},
+                    {"name": "base", "probability": 50},
+                    {"name": "bear", "revenue_growth_rate": 0, "terminal_multiple": 5, "probability": 25},
+                ],
+            },
+        )
+
+        assert response.status_code == 200
+
+        scenarios = response.get_json()["scenarios"]
+        expected_values = [
+            DiscountedCashFlow(**dict(TestJsonApi.dcf_parameters, **overrides)).calculate()
+            for overrides in ({"revenue_growth_rate": 15}, {}, {"revenue_growth_rate": 0, "terminal_multiple": 5})
+        ]
+
+        assert [scenario["name"] for scenario in scenarios] == ["bull", "base", "bear"]
+        assert [scenario["probability"] for scenario in scenarios] == [25, 50, 25]
+        assert [scenario["dcf_value"] for scenario in scenarios] == pytest.approx(expected_values)
+        assert response.get_json()["weighted_value"] == pytest.approx(
+            0.25 * expected_values[0] + 0.5 * expected_values[1] + 0.25 * expected_values[2]
+        )
+
+    def test_scenarios_api_with_invalid_scenario(self, client):
+        """Tests POST /api/v1/dcf/scenarios responds 400 to an invalid scenario."""
+
+        response = client.post(
+            "/api/v1/dcf/scenarios",
+            json={"base": TestJsonApi.dcf_parameters, "scenarios": [{"name": "bear", "fcf_margin": -1}]},
+        )
+
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "fcf_margin must be greater than or equal to 0"
+
+
+def poll_job(client, location, timeout=10):
+    """
+    Polls a job until it has finished, waiting for the Retry-After of every unfinished status.
+
+    :param client: Flask test client
+    :param location: URL of the job
+    :param timeout: Maximum number of seconds to poll
+    :return: Response with the finished job
+    """
+
+    deadline = time.monotonic() + timeout
+
+    while True:
+        response = client.get(location)
+
+        if response.json["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            return response
+
+        assert response.headers["Retry-After"] == "1"
+
+        time.sleep(0.01)
+
+
+class TestJobsApi:
+    assumptions = {
+        "revenue": 1_000_000,
+        "revenue_growth_rate": 5,
+        "time_in_years": 10,
+        "fcf_margin": 10,
+        "desired_annual_return": 10,
+        "terminal_multiple": 10,
+    }
+
+    def test_simulation_job(self, client):
+        """Tests a simulation job is accepted, polled until it succeeds and its result fetched."""
+
+        job = {"type": "dcf_simulation", "parameters": {"assumptions": self.assumptions, "n_paths": 1000, "seed": 1}}
+
+        response = client.post("/api/v1/jobs", json=job)
+
+        assert response.status_code == 202
+        assert response.headers["Location"] == f"/api/v1/jobs/{response.json['id']}"
+
+        response = poll_job(client, response.headers["Location"])
+
+        assert response.json["status"] == "succeeded"
+        assert response.json["run_seconds"] >= 0
+        assert response.json["queue_seconds"] is not None
+
+        response = client.get(f"/api/v1/jobs/{response.json['id']}/result")
+        expected_result = DiscountedCashFlow(**self.assumptions).simulate(1000, seed=1)
+
+        assert response.status_code == 200
+        assert response.json["percentiles"] == {str(percentile): value for percentile, value in expected_result.items()}
+
+    def test_bulk_job_streams_ndjson(self, client):
+        """Tests the result of a bulk job is streamed as NDJSON."""
+
+        rows = [dict(self.assumptions, ticker="ABC"), dict(self.assumptions, ticker="XYZ", revenue=-1)]
+
+        response = client.post("/api/v1/jobs", json={"type": "dcf_bulk", "parameters": {"rows": rows}})
+        poll_job(client, response.headers["Location"])
+        response = client.get(f"{response.headers['Location']}/result")
+
+        assert response.mimetype == "application/x-ndjson"
+        assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == [
+            {"ticker": "ABC", "dcf_value": pytest.approx(1_409_189.67)},
+            {"ticker": "XYZ", "error": "revenue must be greater than or equal to 0"},
+        ]
+
+    def test_failed_job(self, client):
+        """Tests a job with invalid parameters fails and its result responds 400."""
+
+        job = {"type": "cagr_batch", "parameters": {"starting_values": [0], "ending_values": [1], "time_in_years": [1]}}
+
+        response = client.post("/api/v1/jobs", json=job)
+        response = poll_job(client, response.headers["Location"])
+
+        assert response.json["status"] == "failed"
+        assert "starting_value must be greater than 0" in response.json["error"]
+        assert client.get(f"/api/v1/jobs/{response.json['id']}/result").status_code == 400
+
+    def test_invalid_and_unknown_jobs(self, client):
+        """Tests invalid job submissions respond 400 and unknown jobs 404."""
+
+        assert client.post("/api/v1/jobs", json=[]).status_code == 400
+        assert client.post("/api/v1/jobs", json={"type": "unknown"}).status_code == 400
+        assert client.get("/api/v1/jobs/unknown").status_code == 404
+        assert client.get("/api/v1/jobs/unknown/result").status_code == 404
+        assert client.get("/api/v1/jobs").json["max_pending"] > 0
+
+
+class TestMetricsEndpoint:
+    def test_metrics_break_requests_down_by_phase(self, client):
+        """Tests /metrics exposes the phases of a DCF form request in Prometheus text format."""
+
+        valuation_cache.clear()
+        request_metrics.reset()
+
+        client.post(
+            "/dcf-calculator",
+            data={
+                "revenue": "1,000,000",
+                "revenue-growth-rate": "5",
+                "fcf-margin": "10",
+                "pfcf-ratio": "10",
+                "return": "10",
+                "time": "10",
+            },
+        )
+
+        response = client.get("/metrics")
+        lines = response.get_data(as_text=True).splitlines()
+
+        assert response.mimetype == "text/plain"
+
+        for phase in ("parse", "construct", "calculate", "render", "total"):
+            assert f'valuation_request_phase_seconds_count{{route="/dcf-calculator",phase="{phase}"}} 1' in lines
+
+        assert 'valuation_requests_total{route="/dcf-calculator",method="POST",status="200"} 1' in lines
+        assert "valuation_cache_misses_total" in " ".join(lines)
+        assert "valuation_jobs_pending 0" in lines
+
+    def test_unmatched_routes_share_one_label(self, client):
+        """Tests requests for unknown paths are counted under a single route label."""
+
+        request_metrics.reset()
+
+        assert client.get("/unknown").status_code == 404
+        assert 'valuation_requests_total{route="unmatched",method="GET",status="404"} 1' in client.get(
+            "/metrics"
+        ).get_data(as_text=True)
+
+
+class TestConditionalRequests:
+    parameters = {
+        "revenue": 1_000_000,
+        "revenue_growth_rate": 5,
+        "time_in_years": 10,
+        "fcf_margin": 10,
+        "desired_annual_return": 10,
+        "terminal_multiple": 10,
+    }
+
+    @pytest.mark.parametrize("path", ["/", "/dcf-calculator", "/cagr-calculator"])
+    def test_static_pages_support_etags(self, client, path):
+        """Tests calculator pages are served with a strong ETag and answer matching requests with 304."""
+
+        response = client.get(path)
+        etag, is_weak = response.get_etag()
+
+        assert response.status_code == 200
+        assert etag and not is_weak
+        assert response.cache_control.public
+        assert response.cache_control.max_age > 0
+
+        response = client.get(path, headers={"If-None-Match": f'"{etag}"'})
+
+        assert response.status_code == 304
+        assert response.get_data() == b""
+
+    def test_get_api_matches_post_api(self, client):
+        """Tests GET /api/v1/dcf with query parameters returns the same result as POST with a JSON body."""
+
+        get_response = client.get("/api/v1/dcf", query_string=self.parameters)
+        post_response = client.post("/api/v1/dcf", json=self.parameters)
+
+        assert get_response.status_code == 200
+        assert get_response.json == post_response.json
+        assert (
+            get_response.get_etag()
+            != client.get("/api/v1/dcf", query_string=dict(self.parameters, breakdown="false")).get_etag()
+        )
+
+        response = client.get(
+            "/api/v1/cagr", query_string={"starting_value": 100, "ending_value": 200, "time_in_years": 5}
+        )
+
+        assert response.json["cagr"] == pytest.approx(14.87, abs=0.01)
+
+    def test_get_api_answers_matching_etag_without_computing(self, client, monkeypatch):
+        """Tests GET /api/v1/dcf answers a matching If-None-Match with 304 without constructing a DCF object."""
+
+        etag, _ = client.get("/api/v1/dcf", query_string=self.parameters).get_etag()
+
+        def fail(**parameters):
+            raise AssertionError("the DCF value must not be computed")
+
+        valuation_cache.clear()
+        monkeypatch.setattr("application.DiscountedCashFlow", fail)
+
+        response = client.get("/api/v1/dcf", query_string=self.parameters, headers={"If-None-Match": f'"{etag}"'})
+
+        assert response.status_code == 304
+        assert response.get_etag() == (etag, False)
+
+    def test_api_etag_changes_with_result_version(self, client, monkeypatch):
+        """Tests an ETag from before an API_RESULT_VERSION bump gets the new body instead of 304."""
+
+        etag, _ = client.get("/api/v1/dcf", query_string=self.parameters).get_etag()
+
+        monkeypatch.setattr("application.API_RESULT_VERSION", -1)
+
+        response = client.get("/api/v1/dcf", query_string=self.parameters, headers={"If-None-Match": f'"{etag}"'})
+
+        assert response.status_code == 200
+        assert response.get_etag()[0] != etag
+
+    def test_get_api_with_invalid_query(self, client):
+        """Tests GET /api/v1/dcf responds 400 to unknown or malformed query parameters."""
+
+        assert client.get("/api/v1/dcf", query_string={"ticker": "ABC"}).status_code == 400
+        assert client.get("/api/v1/dcf", query_string={"time_in_years": "ten"}).status_code == 400
+        assert client.get("/api/v1/dcf", query_string={"revenue": "-1", "time_in_years": "10"}).status_code == 400
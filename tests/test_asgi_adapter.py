@@ -0,0 +1,306 @@
+import asyncio
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from application import application
+from src import job_queue as job_queue_module
+from src.asgi_adapter import WsgiToAsgi
+from src.discounted_cash_flow import DiscountedCashFlow
+from src.job_queue import JobQueue
+
+
+async def request(asgi_application, method, path, body_chunks=(b"",), headers=(), query_string=b""):
+    """
+    Sends one HTTP request to an ASGI application.
+
+    :param asgi_application: ASGI application
+    :param method: HTTP method
+    :param path: Request path
+    :param body_chunks: Request body, split into one ASGI message per chunk
+    :param headers: List of (name, value) byte tuples
+    :param query_string: Query string bytes
+    :return: Tuple (status, headers dict, body bytes, list of body messages)
+    """
+
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": index < len(body_chunks) - 1}
+        for index, chunk in enumerate(body_chunks)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": query_string,
+        "headers": list(headers),
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+
+    await asgi_application(scope, receive, send)
+
+    body_messages = [message for message in sent if message["type"] == "http.response.body"]
+
+    return (
+        sent[0]["status"],
+        {name.decode(): value.decode() for name, value in sent[0]["headers"]},
+        b"".join(message["body"] for message in body_messages),
+        body_messages,
+    )
+
+
+@pytest.fixture()
+def asgi_application():
+    asgi_application = WsgiToAsgi(application, max_workers=4, max_heavy_workers=2)
+    yield asgi_application
+    asgi_application.shutdown()
+
+
+class TestWsgiToAsgi:
+    def test_page(self, asgi_application):
+        """Tests a page is served through the ASGI adapter."""
+
+        status, headers, body, _ = asyncio.run(request(asgi_application, "GET", "/"))
+
+        assert status == 200
+        assert headers["content-type"].startswith("text/html")
+        assert b"<html" in body.lower()
+
+    def test_dcf_api(self, asgi_application):
+        """Tests a JSON body split over several ASGI messages reaches the Flask view."""
+
+        parameters = {
+            "revenue": 1_000_000,
+            "revenue_growth_rate": 5,
+            "time_in_years": 10,
+            "fcf_margin": 10,
+            "desired_annual_return": 10,
+            "terminal_multiple": 10,
+        }
+        body = json.dumps(parameters).encode()
+
+        status, _, response_body, _ = asyncio.run(
+            request(
+                asgi_application,
+                "POST",
+                "/api/v1/dcf",
+                body_chunks=(body[:20], body[20:]),
+                headers=[(b"content-type", b"application/json")],
+                query_string=b"breakdown=false",
+            )
+        )
+
+        assert status == 200
+        assert json.loads(response_body) == {
+            "dcf_value": pytest.approx(DiscountedCashFlow(**parameters).calculate()),
+            "terminal_value": pytest.approx(DiscountedCashFlow(**parameters).get_terminal_value()),
+        }
+
+    def test_bulk_api_streams_in_buffered_chunks(self):
+        """Tests a streamed bulk response is sent in buffered chunks from the heavy executor."""
+
+        asgi_application = WsgiToAsgi(application, buffer_size=100)
+        rows = "".join(f"T{index},1000000,5,10,10,10,10\n" for index in range(50))
+        body = (
+            "ticker,revenue,revenue_growth_rate,time_in_years,fcf_margin,desired_annual_return,terminal_multiple\n"
+            + rows
+        )
+
+        try:
+            status, headers, response_body, body_messages = asyncio.run(
+                request(
+                    asgi_application,
+                    "POST",
+                    "/api/v1/dcf/bulk",
+                    body_chunks=(body.encode(),),
+                    headers=[(b"content-type", b"text/csv")],
+                )
+            )
+
+        finally:
+            asgi_application.shutdown()
+
+        assert status == 200
+        assert headers["content-type"].startswith("text/csv")
+        assert len(io.StringIO(response_body.decode()).readlines()) == 51
+        assert len(body_messages) > 1
+        assert [message["more_body"] for message in body_messages] == [True] * (len(body_messages) - 1) + [False]
+
+    def test_heavy_routes_use_heavy_executor(self):
+        """Tests heavy routes and light routes run on their own executors."""
+
+        thread_names = {}
+
+        def wsgi_application(environ, start_response):
+            thread_names[environ["PATH_INFO"]] = threading.current_thread().name
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"ok"]
+
+        asgi_application = WsgiToAsgi(wsgi_application)
+
+        try:
+            asyncio.run(request(asgi_application, "POST", "/api/v1/dcf/bulk"))
+            asyncio.run(request(asgi_application, "POST", "/api/v1/dcf"))
+
+        finally:
+            asgi_application.shutdown()
+
+        assert thread_names["/api/v1/dcf/bulk"].startswith("asgi-heavy")
+        assert thread_names["/api/v1/dcf"].startswith("asgi-light")
+
+    def test_job_polls_do_not_starve_light_routes(self, monkeypatch):
+        """Tests polls of a running job return at once, so they never hold the threads the calculators need."""
+
+        release = threading.Event()
+        job_queue = JobQueue(executor_factory=ThreadPoolExecutor)
+        monkeypatch.setitem(job_queue_module.JOB_TYPES, "blocked", lambda: release.wait(10) and {})
+        monkeypatch.setattr("application.job_queue", job_queue)
+        job_id = job_queue.submit("blocked", {})
+        asgi_application = WsgiToAsgi(application, max_workers=4)
+
+        async def poll_and_load_page():
+            polls = [
+                asyncio.create_task(request(asgi_application, "GET", f"/api/v1/jobs/{job_id}", query_string=b"wait=5"))
+                for _ in range(8)
+            ]
+            await asyncio.sleep(0.05)
+            started_at = time.perf_counter()
+            page = await request(asgi_application, "GET", "/dcf-calculator")
+            page_seconds = time.perf_counter() - started_at
+
+            return await asyncio.gather(*polls), page, page_seconds
+
+        try:
+            started_at = time.perf_counter()
+            poll_responses, page, page_seconds = asyncio.run(poll_and_load_page())
+            elapsed = time.perf_counter() - started_at
+
+        finally:
+            release.set()
+            job_queue.shutdown()
+            asgi_application.shutdown()
+
+        assert page[0] == 200
+        assert page_seconds < 1
+        assert elapsed < 1
+        assert [json.loads(response[2])["status"] for response in poll_responses] == ["running"] * 8
+        assert all(response[1]["retry-after"] == "1" for response in poll_responses)
+
+    def test_concurrency_is_bounded(self):
+        """Tests concurrent requests are all served, at most max_workers at a time."""
+
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def wsgi_application(environ, start_response):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+
+            time.sleep(0.01)
+
+            with lock:
+                running[0] -= 1
+
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"ok"]
+
+        asgi_application = WsgiToAsgi(wsgi_application, max_workers=3)
+
+        async def request_concurrently():
+            return await asyncio.gather(*[request(asgi_application, "GET", "/") for _ in range(30)])
+
+        try:
+            responses = asyncio.run(request_concurrently())
+
+        finally:
+            asgi_application.shutdown()
+
+        assert [response[2] for response in responses] == [b"ok"] * 30
+        assert 1 < running[1] <= 3
+
+    def test_response_is_closed(self):
+        """Tests the WSGI response is closed when the adapter has sent it."""
+
+        closed = []
+
+        class ClosingResponse:
+            def __iter__(self):
+                yield b"a"
+                yield b"b"
+
+            def close(self):
+                closed.append(True)
+
+        def wsgi_application(environ, start_response):
+            start_response("201 Created", [("Content-Type", "text/plain"), ("X-Test", "1")])
+            return ClosingResponse()
+
+        asgi_application = WsgiToAsgi(wsgi_application)
+
+        try:
+            status, headers, body, _ = asyncio.run(request(asgi_application, "GET", "/"))
+
+        finally:
+            asgi_application.shutdown()
+
+        assert (status, headers["x-test"], body) == (201, "1", b"ab")
+        assert closed == [True]
+
+    def test_build_environ(self):
+        """Tests ASGI scopes are translated to WSGI environs."""
+
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/dcf",
+            "query_string": b"breakdown=false",
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", b"2"),
+                (b"accept", b"text/csv"),
+                (b"accept", b"application/json"),
+            ],
+        }
+
+        environ = WsgiToAsgi.build_environ(scope, io.BytesIO(b"{}"))
+
+        assert environ["REQUEST_METHOD"] == "POST"
+        assert environ["PATH_INFO"] == "/api/v1/dcf"
+        assert environ["QUERY_STRING"] == "breakdown=false"
+        assert environ["CONTENT_TYPE"] == "application/json"
+        assert environ["CONTENT_LENGTH"] == "2"
+        assert environ["HTTP_ACCEPT"] == "text/csv,application/json"
+        assert (environ["SERVER_NAME"], environ["SERVER_PORT"]) == ("localhost", "80")
+
+    def test_lifespan(self):
+        """Tests lifespan startup and shutdown are acknowledged."""
+
+        asgi_application = WsgiToAsgi(application)
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(asgi_application({"type": "lifespan"}, receive, send))
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from src.batch_validation import calculate_valid_rows, format_batch_errors
+
+
+class TestBatchValidation:
+    def test_format_batch_errors(self):
+        """Tests format_batch_errors() names the offending rows of every violated rule."""
+
+        errors = {"revenue must be greater than or equal to 0": np.array([0, 2]), "time_in_years": np.array([1])}
+
+        assert format_batch_errors(errors) == (
+            "revenue must be greater than or equal to 0 (rows [0, 2]); time_in_years (rows [1])"
+        )
+        assert format_batch_errors({}) == ""
+
+    def test_calculate_valid_rows_only_calculates_valid_rows(self):
+        """Tests calculate_valid_rows() passes only the valid rows to the calculation and fills the others."""
+
+        calculated_rows = []
+
+        def calculate(values, scale):
+            calculated_rows.append(values.tolist())
+            return values * scale
+
+        values = calculate_valid_rows(calculate, ([1, 2, 3, 4], 10), {"invalid": np.array([1, 3])}, np.nan)
+
+        assert calculated_rows == [[1, 3]]
+        assert values.tolist() == pytest.approx([10, np.nan, 30, np.nan], nan_ok=True)
+        assert calculate_valid_rows(calculate, ([1], 10), {"invalid": np.array([0])}, -1).tolist() == [-1]
+        assert calculated_rows == [[1, 3]]
@@ -0,0 +1,120 @@
+import csv
+import json
+
+import pytest
+
+from src.bulk_valuation import chunked, read_csv_rows, read_ndjson_rows, value_dcf_rows, write_csv, write_ndjson
+
+
+class TestBulkValuation:
+    row = {
+        "ticker": "ABC",
+        "revenue": "1000000",
+        "revenue_growth_rate": "5",
+        "time_in_years": "10",
+        "fcf_margin": "10",
+        "desired_annual_return": "10",
+        "terminal_multiple": "10",
+    }
+
+    def test_chunked_groups_rows(self):
+        """Tests chunked() groups rows into lists of at most chunk_size rows."""
+
+        assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(chunked([], 2)) == []
+
+        with pytest.raises(AssertionError, match="chunk_size must be greater than 0"):
+            list(chunked(range(5), 0))
+
+    def test_read_csv_rows_and_read_ndjson_rows(self):
+        """Tests read_csv_rows() and read_ndjson_rows() parse one dict per row."""
+
+        assert list(read_csv_rows(["ticker,revenue\n", "ABC,10\n"])) == [{"ticker": "ABC", "revenue": "10"}]
+        assert list(read_ndjson_rows(['{"ticker": "ABC"}\n', "\n", '{"ticker": "XYZ"}\n'])) == [
+            {"ticker": "ABC"},
+            {"ticker": "XYZ"},
+        ]
+
+    def test_value_dcf_rows_across_chunks(self):
+        """Tests value_dcf_rows() values every row in input order across chunk boundaries."""
+
+        rows = [{**self.row, "ticker": str(index), "revenue": str(index * 1_000_000)} for index in range(5)]
+
+        results = list(value_dcf_rows(rows, chunk_size=2))
+
+        assert [result["ticker"] for result in results] == ["0", "1", "2", "3", "4"]
+        assert [round(result["dcf_value"], 2) for result in results] == [
+            0,
+            1_409_189.67,
+            2_818_379.34,
+            4_227_569.0,
+            5_636_758.67,
+        ]
+
+    def test_value_dcf_rows_reports_invalid_rows(self):
+        """Tests value_dcf_rows() reports errors on invalid rows without affecting the valid ones."""
+
+        rows = [
+            {**self.row, "revenue": "-1", "revenue_growth_rate": "-101"},
+            self.row,
+            {key: value for key, value in self.row.items() if key != "fcf_margin"},
+            {**self.row, "time_in_years": "ten"},
+        ]
+
+        results = list(value_dcf_rows(rows))
+
+        assert results[0]["error"] == (
+            "revenue must be greater than or equal to 0; revenue_growth_rate must be greater than or equal to -100"
+        )
+        assert round(results[1]["dcf_value"], 2) == 1_409_189.67
+        assert results[2]["error"] == "fcf_margin is missing"
+        assert results[3]["error"] == "time_in_years must be of type int or float"
+
+    def test_values_out_of_range_are_reported(self):
+        """Tests a row whose DCF value is out of float range gets an error, so write_ndjson() never writes Infinity."""
+
+        rows = [{**self.row, "revenue_growth_rate": "100", "time_in_years": "1100", "desired_annual_return": "0"}]
+
+        results = list(value_dcf_rows(rows))
+
+        assert results == [{"ticker": "ABC", "error": "dcf_value is out of range"}]
+        assert "Infinity" not in "".join(write_ndjson(results))
+
+    def test_unreadable_rows_are_reported(self):
+        """Tests undecodable lines and rows that are not dicts get an error without stopping the stream."""
+
+        ndjson_lines = [json.dumps(self.row) + "\n", "not json\n", "[1, 2]\n", json.dumps(self.row) + "\n"]
+
+        results = list(value_dcf_rows(read_ndjson_rows(ndjson_lines)))
+
+        assert [round(results[index]["dcf_value"], 2) for index in (0, 3)] == [1_409_189.67, 1_409_189.67]
+        assert results[1]["error"].startswith("line 2 is not valid JSON: ")
+        assert results[2] == {"error": "row must be a JSON object"}
+
+    def test_unparsable_csv_lines_are_reported(self):
+        """Tests a CSV line the csv module rejects gets an error without stopping the stream."""
+
+        csv_lines = [",".join(self.row) + "\n", ",".join(self.row.values()) + "\n", "x" * 200 + "\n"]
+        csv_lines.append(csv_lines[1])
+
+        limit = csv.field_size_limit(100)
+
+        try:
+            results = list(value_dcf_rows(read_csv_rows(csv_lines)))
+
+        finally:
+            csv.field_size_limit(limit)
+
+        assert [round(results[index]["dcf_value"], 2) for index in (0, 2)] == [1_409_189.67, 1_409_189.67]
+        assert results[1]["error"] == "line 3 is not valid CSV: field larger than field limit (100)"
+
+    def test_write_csv_and_write_ndjson(self):
+        """Tests write_csv() and write_ndjson() serialize one line per result."""
+
+        results = [{"ticker": "ABC", "dcf_value": 1.5}, {"ticker": "XYZ", "error": "invalid"}]
+
+        assert "".join(write_csv(results)).splitlines() == ["ticker,dcf_value,error", "ABC,1.5,", "XYZ,,invalid"]
+        assert "".join(write_ndjson(results)).splitlines() == [
+            '{"ticker":"ABC","dcf_value":1.5}',
+            '{"ticker":"XYZ","error":"invalid"}',
+        ]
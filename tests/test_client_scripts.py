@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
+from src.discounted_cash_flow import DiscountedCashFlow
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_PATH = os.path.join(REPOSITORY_ROOT, "static", "js", "scripts.js")
+VECTORS_PATH = os.path.join(REPOSITORY_ROOT, "tests", "vectors", "valuation_vectors.json")
+
+# Evaluates every test vector with static/js/scripts.js and prints the results as JSON
+NODE_RUNNER = """
+const scripts = require(process.argv[1]);
+const vectors = require(process.argv[2]);
+const camelCase = (inputs) =>
+    Object.fromEntries(Object.entries(inputs).map(([name, value]) => [
+        name.replace(/_([a-z])/g, (match, letter) => letter.toUpperCase()), value,
+    ]));
+const evaluate = (calculate, inputs) => {
+    try {
+        return { value: calculate(camelCase(inputs)) };
+    } catch (error) {
+        return { error: error.message };
+    }
+};
+const results = {};
+
+for (const [name, calculate] of [["dcf", scripts.calculateDcf], ["cagr", scripts.calculateCagr]]) {
+    results[name] = vectors[name].map((vector) => evaluate(calculate, vector.inputs));
+    results[`${name}_errors`] = vectors[`${name}_errors`].map((vector) => evaluate(calculate, vector.inputs));
+}
+
+results.formatted = scripts.formatNumber(1409189.6682039495);
+console.log(JSON.stringify(results));
+"""
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    with open(VECTORS_PATH) as vectors_file:
+        return json.load(vectors_file)
+
+
+class TestClientScripts:
+    def test_vectors_match_python(self, vectors):
+        """Tests the shared test vectors agree with DiscountedCashFlow and CompoundedAnnualGrowthRate."""
+
+        tolerance = vectors["relative_tolerance"]
+
+        for vector in vectors["dcf"]:
+            assert DiscountedCashFlow(**vector["inputs"]).calculate() == pytest.approx(vector["dcf_value"], tolerance)
+
+        for vector in vectors["cagr"]:
+            assert CompoundedAnnualGrowthRate(**vector["inputs"]).calculate() == pytest.approx(
+                vector["cagr"], tolerance
+            )
+
+        for valuation_class, name in [(DiscountedCashFlow, "dcf_errors"), (CompoundedAnnualGrowthRate, "cagr_errors")]:
+            for vector in vectors[name]:
+                with pytest.raises(AssertionError, match=vector["error"]):
+                    valuation_class(**vector["inputs"])
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+    def test_javascript_matches_vectors(self, vectors):
+        """Tests static/js/scripts.js reproduces the shared test vectors and validation messages."""
+
+        output = subprocess.run(
+            ["node", "-e", NODE_RUNNER, SCRIPTS_PATH, VECTORS_PATH], capture_output=True, check=True, text=True
+        ).stdout
+        results = json.loads(output)
+        tolerance = vectors["relative_tolerance"]
+
+        assert [result["value"] for result in results["dcf"]] == [
+            pytest.approx(vector["dcf_value"], tolerance) for vector in vectors["dcf"]
+        ]
+        assert [result["value"] for result in results["cagr"]] == [
+            pytest.approx(vector["cagr"], tolerance) for vector in vectors["cagr"]
+        ]
+        assert [result["error"] for result in results["dcf_errors"]] == [
+            vector["error"] for vector in vectors["dcf_errors"]
+        ]
+        assert [result["error"] for result in results["cagr_errors"]] == [
+            vector["error"] for vector in vectors["cagr_errors"]
+        ]
+        assert results["formatted"] == "{:,.2f}".format(1409189.6682039495)
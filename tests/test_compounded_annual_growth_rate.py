@@ -1,5 +1,6 @@
 from random import randint
 
+import numpy as np
 import pytest
 
 from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
@@ -125,3 +126,74 @@ class TestCompoundedAnnualGrowthRate:
                 cagr_value = round(cagr_object.calculate(), 2)
 
                 assert cagr_value == -100
+
+    def test_calculate_does_not_print_unless_verbose(self, capsys):
+        """Tests CompoundedAnnualGrowthRate.calculate() only writes to stdout when verbose is set."""
+
+        cagr_object = CompoundedAnnualGrowthRate(starting_value=100, ending_value=200, time_in_years=5)
+
+        cagr_object.calculate()
+        assert capsys.readouterr().out == ""
+
+        cagr_object.calculate(verbose=True)
+        assert "CAGR = 14.87%" in capsys.readouterr().out
+
+    def test_calculate_batch_matches_calculate(self):
+        """Tests CompoundedAnnualGrowthRate.calculate_batch() returns calculate() for each row."""
+
+        number_of_rows = 100
+        starting_values = [randint(1, 10000) for row in range(number_of_rows)]
+        ending_values = [randint(0, 10000) for row in range(number_of_rows)]
+        time_in_years = [randint(1, 100) for row in range(number_of_rows)]
+
+        cagr_values = CompoundedAnnualGrowthRate.calculate_batch(starting_values, ending_values, time_in_years)
+
+        for starting_value, ending_value, years, cagr_value in zip(
+            starting_values, ending_values, time_in_years, cagr_values
+        ):
+            cagr_object = CompoundedAnnualGrowthRate(
+                starting_value=starting_value, ending_value=ending_value, time_in_years=years
+            )
+
+            assert cagr_value == pytest.approx(cagr_object.calculate(), rel=1e-9, abs=1e-9)
+
+    def test_calculate_batch_reports_offending_rows(self):
+        """Tests CompoundedAnnualGrowthRate.calculate_batch() reports every invalid row."""
+
+        with pytest.raises(AssertionError, match=r"starting_value must be greater than 0 \(rows \[1, 2\]\)"):
+            CompoundedAnnualGrowthRate.calculate_batch([100, 0, -1], 200, 5)
+
+        errors = CompoundedAnnualGrowthRate.validate_batch(100, [200, -1, 200], [5, 5, 2.5])
+
+        assert errors["ending_value must be greater than or equal to 0"].tolist() == [1]
+        assert errors["time_in_years must be of type int"].tolist() == [2]
+
+        cagr_values, errors = CompoundedAnnualGrowthRate.calculate_batch([100, 0, 100], 200, 5, invalid=-1)
+
+        assert cagr_values.tolist() == pytest.approx([14.87, -1, 14.87], abs=0.01)
+        assert errors["starting_value must be greater than 0"].tolist() == [1]
+
+    def test_calculate_rolling(self):
+        """Tests CompoundedAnnualGrowthRate.calculate_rolling() returns the CAGR of every window of every series."""
+
+        series = np.array([[100, 200, 400, 800], [100, 100, 0, 100], [0, 100, 121, 100]])
+
+        rolling_cagrs = CompoundedAnnualGrowthRate.calculate_rolling(series, windows=[1, 2])
+
+        np.testing.assert_allclose(rolling_cagrs[1][0], [100, 100, 100])
+        np.testing.assert_allclose(rolling_cagrs[1][1][:2], [0, -100])
+        assert np.isnan(rolling_cagrs[1][1][2])
+        np.testing.assert_allclose(rolling_cagrs[1][2][1], 21)
+        np.testing.assert_allclose(rolling_cagrs[2][2][1], 0, atol=1e-12)
+        assert np.isnan(rolling_cagrs[1][2][0])
+        assert np.isnan(rolling_cagrs[2][2][0])
+        assert rolling_cagrs[2].shape == (3, 2)
+
+        monthly_cagrs = CompoundedAnnualGrowthRate.calculate_rolling(
+            np.geomspace(100, 200, 121), windows=120, periods_per_year=12
+        )
+
+        np.testing.assert_allclose(monthly_cagrs[120], [((200 / 100) ** (1 / 10) - 1) * 100])
+
+        with pytest.raises(AssertionError, match="windows must be greater than 0 and shorter than the series"):
+            CompoundedAnnualGrowthRate.calculate_rolling(series, windows=4)
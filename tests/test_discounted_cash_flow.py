@@ -1,5 +1,7 @@
+import warnings
 from random import randint
 
+import numpy as np
 import pytest
 
 from src.discounted_cash_flow import DiscountedCashFlow
@@ -1129,3 +1131,724 @@ class TestDiscountedCashFlow:
             current_dcf_value = dcf_object.calculate()
             assert current_dcf_value > previous_dcf_value
             previous_dcf_value = current_dcf_value
+
+    def test_get_discounted_cash_flow_sum_matches_reference_loop(self):
+        """Tests DCF.get_discounted_cash_flow_sum() agrees with summing DCF.get_present_value() for each year."""
+
+        number_of_iterations = 100
+
+        for iteration in range(number_of_iterations):
+            dcf_object = DiscountedCashFlow(
+                revenue=randint(0, 1_000_000),
+                revenue_growth_rate=randint(-100, 100),
+                time_in_years=randint(1, 100),
+                fcf_margin=randint(0, 100),
+                desired_annual_return=randint(0, 100),
+                terminal_multiple=randint(0, 100),
+            )
+
+            discounted_cash_flow_sum = dcf_object.get_discounted_cash_flow_sum()
+            reference_sum = sum(dcf_object.get_present_value(time) for time in range(1, dcf_object.time_in_years + 1))
+            assert discounted_cash_flow_sum == pytest.approx(reference_sum, rel=1e-9)
+
+    def test_get_discounted_cash_flow_sum_when_growth_rate_equals_desired_annual_return(self):
+        """Tests DCF.get_discounted_cash_flow_sum() is (revenue * fcf_margin * time) when growth == return."""
+
+        revenue = randint(1, 1_000_000)
+        growth_rate_and_return = randint(0, 100)
+        time_in_years = randint(1, 100)
+        fcf_margin = randint(1, 100)
+
+        dcf_object = DiscountedCashFlow(
+            revenue=revenue,
+            revenue_growth_rate=growth_rate_and_return,
+            time_in_years=time_in_years,
+            fcf_margin=fcf_margin,
+            desired_annual_return=growth_rate_and_return,
+            terminal_multiple=randint(0, 100),
+        )
+
+        discounted_cash_flow_sum = dcf_object.get_discounted_cash_flow_sum()
+        assert discounted_cash_flow_sum == pytest.approx(revenue * (fcf_margin / 100) * time_in_years, rel=1e-9)
+
+    def test_calculate_closed_form_matches_reference_loop(self):
+        """Tests DCF.calculate() agrees with DCF.calculate(closed_form=False) within the documented tolerance."""
+
+        number_of_iterations = 100
+
+        for iteration in range(number_of_iterations):
+            dcf_object = DiscountedCashFlow(
+                revenue=randint(0, 1_000_000),
+                revenue_growth_rate=randint(-100, 100),
+                time_in_years=randint(1, 1000),
+                fcf_margin=randint(0, 100),
+                desired_annual_return=randint(0, 100),
+                terminal_multiple=randint(0, 100),
+            )
+
+            assert dcf_object.calculate() == pytest.approx(dcf_object.calculate(closed_form=False), rel=1e-9)
+
+    def test_reference_loop_does_not_use_discount_factors(self, monkeypatch):
+        """Tests DCF.calculate(closed_form=False) values the terminal term without the cached discount factors."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        monkeypatch.setattr(DiscountedCashFlow, "_get_discount_factors", lambda self: pytest.fail("factors were used"))
+
+        assert round(dcf_object.calculate(closed_form=False), 2) == 1_409_189.67
+        assert dcf_object.get_terminal_value(closed_form=False) == pytest.approx(10 * dcf_object.get_present_value(10))
+
+    def test_calculate_batch_matches_calculate(self):
+        """Tests DCF.calculate_batch() returns the same values as DCF.calculate() for each row."""
+
+        number_of_rows = 100
+        rows = [
+            {
+                "revenue": randint(0, 1_000_000),
+                "revenue_growth_rate": randint(-100, 100),
+                "time_in_years": randint(1, 100),
+                "fcf_margin": randint(0, 100),
+                "desired_annual_return": randint(0, 100),
+                "terminal_multiple": randint(0, 100),
+            }
+            for row in range(number_of_rows)
+        ]
+
+        dcf_values = DiscountedCashFlow.calculate_batch(
+            **{name: np.array([row[name] for row in rows]) for name in rows[0]}
+        )
+
+        assert dcf_values.shape == (number_of_rows,)
+
+        for row, dcf_value in zip(rows, dcf_values):
+            assert dcf_value == pytest.approx(DiscountedCashFlow(**row).calculate(), rel=1e-9)
+
+    def test_calculate_batch_broadcasts_scalars(self):
+        """Tests DCF.calculate_batch() broadcasts scalar inputs against array inputs."""
+
+        dcf_values = DiscountedCashFlow.calculate_batch(
+            revenue=1_000_000,
+            revenue_growth_rate=[-5, 0, 5],
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        assert np.round(dcf_values, 2).tolist() == [717_974.30, 1_000_000, 1_409_189.67]
+
+    def test_calculate_batch_fills_invalid_rows(self):
+        """Tests DCF.calculate_batch() with invalid set values the valid rows and returns the errors of the others."""
+
+        dcf_values, errors = DiscountedCashFlow.calculate_batch(
+            revenue=[1_000_000, -1, 1_000_000],
+            revenue_growth_rate=5,
+            time_in_years=[10, 10, 2.5],
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+            invalid=np.nan,
+        )
+
+        assert round(dcf_values[0], 2) == 1_409_189.67
+        assert np.isnan(dcf_values[1:]).all()
+        assert {message: rows.tolist() for message, rows in errors.items()} == {
+            "revenue must be greater than or equal to 0": [1],
+            "time_in_years must be of type int": [2],
+        }
+
+    def test_validate_batch_reports_offending_rows(self):
+        """Tests DCF.validate_batch() reports every invalid row for every rule."""
+
+        errors = DiscountedCashFlow.validate_batch(
+            revenue=[10, -1, -2, 10],
+            revenue_growth_rate=[10, 10, -101, 10],
+            time_in_years=[10, 0, 10, 2.5],
+            fcf_margin=[10, 10, 10, -1],
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        assert errors["revenue must be greater than or equal to 0"].tolist() == [1, 2]
+        assert errors["revenue_growth_rate must be greater than or equal to -100"].tolist() == [2]
+        assert errors["time_in_years must be greater than 0"].tolist() == [1]
+        assert errors["time_in_years must be of type int"].tolist() == [3]
+        assert errors["fcf_margin must be greater than or equal to 0"].tolist() == [3]
+        assert len(errors) == 5
+
+        with pytest.raises(AssertionError, match=r"revenue must be greater than or equal to 0 \(rows \[1, 2\]\)"):
+            DiscountedCashFlow.calculate_batch(
+                revenue=[10, -1, -2, 10],
+                revenue_growth_rate=10,
+                time_in_years=10,
+                fcf_margin=10,
+                desired_annual_return=10,
+                terminal_multiple=10,
+            )
+
+    def test_calculate_does_not_print_unless_verbose(self, capsys):
+        """Tests DCF.calculate() only writes to stdout when verbose is set."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        dcf_object.calculate()
+        assert capsys.readouterr().out == ""
+
+        dcf_object.calculate(verbose=True)
+        output = capsys.readouterr().out
+        assert "Revenue at Year 10" in output
+        assert "DCF Value = $1,409,189.67" in output
+
+    def test_sensitivity_grid_matches_calculate(self):
+        """Tests DCF.sensitivity_grid() returns DCF.calculate() for every growth rate and discount rate pair."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=randint(1, 1_000_000),
+            revenue_growth_rate=0,
+            time_in_years=randint(1, 100),
+            fcf_margin=randint(1, 100),
+            desired_annual_return=0,
+            terminal_multiple=randint(0, 100),
+        )
+
+        growth_rates = [-100, -5, 0, 5, 10, 25]
+        discount_rates = [0, 5, 10, 15]
+
+        grid = dcf_object.sensitivity_grid(growth_rates, discount_rates)
+
+        assert grid.shape == (len(growth_rates), len(discount_rates))
+
+        for row, growth_rate in enumerate(growth_rates):
+            for column, discount_rate in enumerate(discount_rates):
+                dcf_object.revenue_growth_rate = growth_rate / 100
+                dcf_object.desired_annual_return = discount_rate / 100
+                assert grid[row, column] == pytest.approx(dcf_object.calculate(), rel=1e-9)
+
+    def test_sensitivity_grid_with_invalid_rates(self):
+        """Tests DCF.sensitivity_grid() with invalid rates raises the correct errors."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=10,
+            revenue_growth_rate=10,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        with pytest.raises(AssertionError, match="growth_rates must be greater than or equal to -100"):
+            dcf_object.sensitivity_grid([0, -101], [10])
+
+        with pytest.raises(AssertionError, match="discount_rates must be greater than or equal to 0"):
+            dcf_object.sensitivity_grid([10], [10, -1])
+
+    def test_simulate_without_distributions_returns_calculate(self):
+        """Tests DCF.simulate() returns DCF.calculate() at every percentile when nothing is simulated."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        percentile_values = dcf_object.simulate(1_000, seed=0)
+
+        assert list(percentile_values) == [5, 25, 50, 75, 95]
+
+        for dcf_value in percentile_values.values():
+            assert round(dcf_value, 2) == 1_409_189.67
+
+    def test_simulate_is_reproducible_and_independent_of_workers(self):
+        """Tests DCF.simulate() returns the same percentiles for the same seed regardless of worker count."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+        distributions = {
+            "revenue_growth_rate": ("normal", 5, 3),
+            "fcf_margin": ("uniform", 8, 12),
+            "terminal_multiple": ("triangular", 8, 10, 14),
+        }
+
+        percentile_values = dcf_object.simulate(10_001, distributions, seed=42, chunk_size=1_000)
+
+        assert dcf_object.simulate(10_001, distributions, seed=42, chunk_size=1_000) == percentile_values
+        assert dcf_object.simulate(10_001, distributions, seed=42, chunk_size=1_000, workers=2) == percentile_values
+        assert percentile_values[5] < percentile_values[50] < percentile_values[95]
+
+    def test_simulate_with_invalid_params(self):
+        """Tests DCF.simulate() with invalid parameters raises the correct errors."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=10,
+            revenue_growth_rate=10,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        with pytest.raises(AssertionError, match="n_paths must be greater than 0"):
+            dcf_object.simulate(0)
+
+        with pytest.raises(AssertionError, match="desired_annual_return cannot be simulated"):
+            dcf_object.simulate(10, {"desired_annual_return": ("normal", 10, 1)})
+
+        with pytest.raises(AssertionError, match="poisson is not a supported distribution"):
+            dcf_object.simulate(10, {"terminal_multiple": ("poisson", 10)})
+
+    def test_get_projection_matches_get_present_value(self):
+        """Tests DCF.get_projection() returns DCF.get_cash_flow() and DCF.get_present_value() for every year."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=randint(1, 1_000_000),
+            revenue_growth_rate=randint(-100, 100),
+            time_in_years=randint(1, 100),
+            fcf_margin=randint(0, 100),
+            desired_annual_return=randint(0, 100),
+            terminal_multiple=randint(0, 100),
+        )
+
+        projection = dcf_object.get_projection()
+
+        for time in range(1, dcf_object.time_in_years + 1):
+            assert projection["cash_flow"][time - 1] == pytest.approx(dcf_object.get_cash_flow(time), rel=1e-9)
+            assert projection["present_value"][time - 1] == pytest.approx(dcf_object.get_present_value(time), rel=1e-9)
+
+    def test_calculate_with_constant_schedules_matches_calculate(self):
+        """Tests DCF.calculate() with constant schedules returns the same value as without schedules."""
+
+        time_in_years = randint(1, 100)
+        parameters = {
+            "revenue": randint(1, 1_000_000),
+            "revenue_growth_rate": randint(-100, 100),
+            "time_in_years": time_in_years,
+            "fcf_margin": randint(0, 100),
+            "desired_annual_return": randint(0, 100),
+            "terminal_multiple": randint(0, 100),
+        }
+
+        dcf_object = DiscountedCashFlow(
+            **parameters,
+            revenue_growth_schedule=[parameters["revenue_growth_rate"]] * time_in_years,
+            fcf_margin_schedule=[parameters["fcf_margin"]] * time_in_years,
+        )
+
+        assert dcf_object.calculate() == pytest.approx(DiscountedCashFlow(**parameters).calculate(), rel=1e-9)
+
+    def test_calculate_with_multi_stage_schedules(self):
+        """Tests DCF.calculate() with schedules matches the reference loop and a hand-computed projection."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            time_in_years=4,
+            desired_annual_return=10,
+            terminal_multiple=10,
+            revenue_growth_schedule=[20, 20, 10, 5],
+            fcf_margin_schedule=[5, 10, 15, 15],
+        )
+
+        revenues = [1_200_000, 1_440_000, 1_584_000, 1_663_200]
+        cash_flows = [60_000, 144_000, 237_600, 249_480]
+        present_values = [cash_flow / 1.1**time for time, cash_flow in enumerate(cash_flows, start=1)]
+
+        projection = dcf_object.get_projection()
+
+        assert projection["revenue"].tolist() == pytest.approx(revenues)
+        assert projection["cash_flow"].tolist() == pytest.approx(cash_flows)
+        assert dcf_object.calculate() == pytest.approx(sum(present_values) + 10 * present_values[-1])
+        assert dcf_object.calculate(closed_form=False) == pytest.approx(dcf_object.calculate(), rel=1e-9)
+
+    def test_schedules_and_projection_over_long_horizons(self):
+        """Tests present values stay finite when cumulative growth and discounting both overflow on their own."""
+
+        parameters = {
+            "revenue": 1_000_000,
+            "revenue_growth_rate": 10,
+            "time_in_years": 8000,
+            "fcf_margin": 10,
+            "desired_annual_return": 10,
+            "terminal_multiple": 10,
+        }
+
+        dcf_object = DiscountedCashFlow(**parameters, revenue_growth_schedule=[10] * 8000)
+
+        assert dcf_object.calculate() == pytest.approx(DiscountedCashFlow(**parameters).calculate(), rel=1e-9)
+
+        dcf_object = DiscountedCashFlow(**dict(parameters, revenue_growth_rate=5, time_in_years=20000))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+
+            projection = dcf_object.get_projection()
+
+        assert np.isfinite(projection["present_value"]).all()
+        assert projection["present_value"].sum() == pytest.approx(dcf_object.get_discounted_cash_flow_sum())
+        assert projection["revenue"][-1] == np.inf
+
+    def test_dcf_object_does_not_initialize_with_invalid_schedules(self):
+        """Tests the DCF object validates whole schedules."""
+
+        with pytest.raises(AssertionError, match="revenue_growth_schedule must have one rate per year"):
+            DiscountedCashFlow(time_in_years=3, revenue_growth_schedule=[10, 10])
+
+        with pytest.raises(AssertionError, match="revenue_growth_schedule must be greater than or equal to -100"):
+            DiscountedCashFlow(time_in_years=3, revenue_growth_schedule=[10, -101, 10])
+
+        with pytest.raises(AssertionError, match="fcf_margin_schedule must have one margin per year"):
+            DiscountedCashFlow(time_in_years=3, fcf_margin_schedule=[[10, 10, 10]])
+
+        with pytest.raises(AssertionError, match="fcf_margin_schedule must be greater than or equal to 0"):
+            DiscountedCashFlow(time_in_years=3, fcf_margin_schedule=[10, 10, -1])
+
+    def test_solve_implied_growth_and_return_recover_inputs(self):
+        """Tests DCF.solve_implied_growth() and DCF.solve_implied_return() invert DCF.calculate()."""
+
+        number_of_iterations = 100
+
+        for iteration in range(number_of_iterations):
+            revenue_growth_rate = randint(-50, 50)
+            desired_annual_return = randint(1, 50)
+
+            dcf_object = DiscountedCashFlow(
+                revenue=randint(1, 1_000_000),
+                revenue_growth_rate=revenue_growth_rate,
+                time_in_years=randint(1, 100),
+                fcf_margin=randint(1, 100),
+                desired_annual_return=desired_annual_return,
+                terminal_multiple=randint(0, 100),
+            )
+
+            dcf_value = dcf_object.calculate()
+
+            assert dcf_object.solve_implied_growth(dcf_value) == pytest.approx(revenue_growth_rate, abs=1e-6)
+            assert dcf_object.solve_implied_return(dcf_value) == pytest.approx(desired_annual_return, abs=1e-6)
+
+    def test_solve_implied_growth_and_return_with_unreachable_targets(self):
+        """Tests DCF.solve_implied_growth() and DCF.solve_implied_return() raise when no rate reaches the target."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+
+        assert dcf_object.solve_implied_growth(0) == -100
+
+        with pytest.raises(AssertionError, match="target_value cannot be reached by any desired_annual_return"):
+            dcf_object.solve_implied_return(1_000_000_000)
+
+        with pytest.raises(AssertionError, match="target_values must be greater than or equal to 0"):
+            dcf_object.solve_implied_growth(-1)
+
+        dcf_object.fcf_margin = 0
+
+        with pytest.raises(AssertionError, match="target_value cannot be reached by any revenue_growth_rate"):
+            dcf_object.solve_implied_growth(1_000_000)
+
+    def test_solve_implied_growth_and_return_batch(self):
+        """Tests the batched solvers invert DCF.calculate_batch() for every row and return NaN when unreachable."""
+
+        generator = np.random.default_rng()
+        number_of_rows = 1_000
+
+        revenue = generator.uniform(1, 1_000_000, number_of_rows)
+        revenue_growth_rate = generator.uniform(-50, 80, number_of_rows)
+        time_in_years = generator.integers(1, 100, number_of_rows)
+        fcf_margin = generator.uniform(1, 50, number_of_rows)
+        desired_annual_return = generator.uniform(1, 30, number_of_rows)
+        terminal_multiple = generator.uniform(0, 50, number_of_rows)
+
+        dcf_values = DiscountedCashFlow.calculate_batch(
+            revenue, revenue_growth_rate, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+        )
+
+        growth_rates = DiscountedCashFlow.solve_implied_growth_batch(
+            dcf_values, revenue, time_in_years, fcf_margin, desired_annual_return, terminal_multiple
+        )
+        desired_annual_returns = DiscountedCashFlow.solve_implied_return_batch(
+            dcf_values, revenue, revenue_growth_rate, time_in_years, fcf_margin, terminal_multiple
+        )
+
+        np.testing.assert_allclose(growth_rates, revenue_growth_rate, atol=1e-6)
+        np.testing.assert_allclose(desired_annual_returns, desired_annual_return, atol=1e-6)
+
+        unreachable = DiscountedCashFlow.solve_implied_return_batch([1e6, 1e12], 1e6, 5, 10, 10, 10)
+
+        assert DiscountedCashFlow.calculate_batch(1e6, 5, 10, 10, unreachable[0], 10) == pytest.approx(1e6)
+        assert np.isnan(unreachable[1])
+
+    def test_update_changes_assumptions_in_place(self):
+        """Tests DCF.update() validates and stores only the given assumptions in the constructor's units."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=20,
+            terminal_multiple=10,
+        )
+
+        assert dcf_object.update(desired_annual_return=10) is dcf_object
+        assert dcf_object.desired_annual_return == 0.1
+        assert round(dcf_object.calculate(), 2) == 1_409_189.67
+
+        dcf_object.update(revenue=0, time_in_years=20)
+
+        assert dcf_object.revenue == 0
+        assert dcf_object.time_in_years == 20
+
+        with pytest.raises(AssertionError, match="desired_annual_return must be greater than or equal to 0"):
+            dcf_object.update(desired_annual_return=-1)
+
+        with pytest.raises(AssertionError, match="time_in_years must be of type int"):
+            dcf_object.update(time_in_years=10.5)
+
+        with pytest.raises(AssertionError, match="time_in_years must be greater than 0"):
+            dcf_object.update(time_in_years=0)
+
+        with pytest.raises(AssertionError, match="fcf_margin must be of type int or float"):
+            dcf_object.update(fcf_margin="10")
+
+        with pytest.raises(AssertionError, match="ticker is not a DCF assumption"):
+            dcf_object.update(ticker="ABC")
+
+    def test_failed_update_changes_nothing(self):
+        """Tests DCF.update() leaves every assumption unchanged when any of them is invalid."""
+
+        dcf_object = DiscountedCashFlow(revenue=1_000_000, time_in_years=3, revenue_growth_schedule=[10, 5, 0])
+        dcf_value = dcf_object.calculate()
+
+        with pytest.raises(AssertionError, match="fcf_margin must be greater than or equal to 0"):
+            dcf_object.update(revenue=5, fcf_margin=-1)
+
+        with pytest.raises(AssertionError, match="revenue_growth_rate is overridden by revenue_growth_schedule"):
+            dcf_object.update(desired_annual_return=50, revenue_growth_rate=5)
+
+        assert dcf_object.revenue == 1_000_000
+        assert dcf_object.desired_annual_return == 0
+        assert dcf_object.calculate() == dcf_value
+
+    def test_update_rejects_assumptions_overridden_by_schedules(self):
+        """Tests DCF.update() rejects revenue_growth_rate and fcf_margin while their schedule is set."""
+
+        dcf_object = DiscountedCashFlow(time_in_years=3, revenue_growth_schedule=[10, 5, 0])
+        dcf_value = dcf_object.calculate()
+
+        with pytest.raises(AssertionError, match="revenue_growth_rate is overridden by revenue_growth_schedule"):
+            dcf_object.update(revenue_growth_rate=50)
+
+        assert dcf_object.revenue_growth_rate == 0
+        assert dcf_object.calculate() == dcf_value
+        assert dcf_object.update(fcf_margin=20).fcf_margin == 0.2
+
+        dcf_object = DiscountedCashFlow(time_in_years=3, fcf_margin_schedule=[10, 20, 30])
+
+        with pytest.raises(AssertionError, match="fcf_margin is overridden by fcf_margin_schedule"):
+            dcf_object.update(fcf_margin=50)
+
+        assert dcf_object.update(revenue_growth_rate=5).revenue_growth_rate == 0.05
+
+    def test_dcf_object_has_no_instance_dict(self):
+        """Tests the DCF object stores its assumptions in slots."""
+
+        dcf_object = DiscountedCashFlow(time_in_years=10)
+
+        assert not hasattr(dcf_object, "__dict__")
+
+        with pytest.raises(AttributeError):
+            dcf_object.ticker = "ABC"
+
+    def test_incremental_re_evaluation_matches_fresh_object(self):
+        """Tests re-evaluating after changing one assumption matches a freshly constructed DCF object."""
+
+        assumptions = {
+            "revenue": 1_000_000,
+            "revenue_growth_rate": 5,
+            "time_in_years": 10,
+            "fcf_margin": 10,
+            "desired_annual_return": 10,
+            "terminal_multiple": 10,
+        }
+        dcf_object = DiscountedCashFlow(**assumptions)
+        dcf_object.calculate()
+
+        for assumption, value in [
+            ("revenue", 2_000_000),
+            ("fcf_margin", 15),
+            ("terminal_multiple", 12),
+            ("revenue_growth_rate", 8),
+            ("desired_annual_return", 12),
+            ("time_in_years", 7),
+            ("revenue_growth_rate", 12),
+        ]:
+            dcf_object.update(**{assumption: value})
+            assumptions[assumption] = value
+
+            assert dcf_object.calculate() == pytest.approx(DiscountedCashFlow(**assumptions).calculate())
+            assert dcf_object.calculate() == pytest.approx(dcf_object.calculate(closed_form=False))
+
+    def test_discount_factor_cache_invalidation(self):
+        """Tests only assumptions the discount factors depend on clear the cached factors."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+        dcf_object.calculate()
+        discount_factors = dcf_object._discount_factors
+
+        dcf_object.revenue = 2_000_000
+        dcf_object.fcf_margin = 0.2
+        dcf_object.terminal_multiple = 20
+
+        assert dcf_object._discount_factors is discount_factors
+        assert dcf_object.calculate() == pytest.approx(dcf_object.calculate(closed_form=False))
+
+        for assumption, value in [
+            ("revenue_growth_rate", 0.1),
+            ("desired_annual_return", 0.2),
+            ("time_in_years", 5),
+            ("revenue_growth_schedule", np.full(5, 0.1)),
+            ("fcf_margin_schedule", np.full(5, 0.2)),
+        ]:
+            dcf_object.calculate()
+            setattr(dcf_object, assumption, value)
+
+            assert dcf_object._discount_factors is None
+
+    def test_trace_records_components_and_timings(self):
+        """Tests DCF.trace() records every year, the terminal value and timings without changing the result."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_multiple=10,
+        )
+        ticks = iter(range(1000))
+
+        with dcf_object.trace(clock=lambda: next(ticks)) as trace:
+            dcf_value = dcf_object.calculate()
+
+        trace_dict = trace.to_dict()
+
+        assert dcf_value == pytest.approx(dcf_object.calculate())
+        assert trace.result == dcf_value
+        assert trace_dict["assumptions"]["revenue_growth_rate"] == pytest.approx(5)
+        assert [year["year"] for year in trace_dict["years"]] == list(range(1, 11))
+        assert trace_dict["years"][0]["revenue"] == pytest.approx(1_050_000)
+        assert trace_dict["years"][0]["cash_flow"] == pytest.approx(105_000)
+        assert trace_dict["years"][0]["present_value"] == pytest.approx(105_000 / 1.1)
+        assert all(year["seconds"] == 1 for year in trace_dict["years"])
+        assert trace_dict["terminal"]["terminal_value"] == pytest.approx(dcf_object.get_terminal_value())
+        # Two ticks for each of the 10 years and for the terminal year recomputed by get_terminal_value(), plus one
+        assert trace_dict["timings"]["calculate"] == 23
+
+    def test_trace_is_disabled_outside_its_block(self):
+        """Tests DCF.calculate() records nothing after the trace block has exited."""
+
+        dcf_object = DiscountedCashFlow(revenue=1_000_000, time_in_years=10, fcf_margin=10, desired_annual_return=10)
+
+        with dcf_object.trace() as trace:
+            pass
+
+        dcf_object.calculate(closed_form=False)
+
+        assert trace.to_dict()["years"] == []
+        assert trace.result is None
+
+    def test_perpetuity_growth_terminal_value(self):
+        """Tests the perpetuity growth terminal value is the Gordon growth value of the final-year cash flow."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000,
+            revenue_growth_rate=5,
+            time_in_years=10,
+            fcf_margin=10,
+            desired_annual_return=10,
+            terminal_method="perpetuity_growth",
+            terminal_growth_rate=3,
+        )
+        final_cash_flow = 100_000 * 1.05**10
+        expected_terminal_value = final_cash_flow * 1.03 / (0.10 - 0.03) / 1.1**10
+
+        assert dcf_object.get_terminal_value() == pytest.approx(expected_terminal_value)
+        assert dcf_object.calculate() == pytest.approx(
+            dcf_object.get_discounted_cash_flow_sum() + expected_terminal_value
+        )
+        assert dcf_object.calculate() == pytest.approx(dcf_object.calculate(closed_form=False))
+        assert dcf_object.sensitivity_grid([5], [10])[0, 0] == pytest.approx(dcf_object.calculate())
+        assert dcf_object.solve_implied_growth(dcf_object.calculate()) == pytest.approx(5)
+
+    def test_perpetuity_growth_reuses_discount_factors(self):
+        """Tests changing the terminal assumptions keeps the cached discount factors."""
+
+        dcf_object = DiscountedCashFlow(
+            revenue=1_000_000, revenue_growth_rate=5, time_in_years=10, fcf_margin=10, desired_annual_return=10
+        )
+        dcf_object.calculate()
+        discount_factors = dcf_object._discount_factors
+
+        dcf_object.terminal_method = "perpetuity_growth"
+        dcf_object.update(terminal_growth_rate=2)
+
+        assert dcf_object._discount_factors is discount_factors
+        assert dcf_object.calculate() == pytest.approx(
+            DiscountedCashFlow(
+                1_000_000, 5, 10, 10, 10, terminal_method="perpetuity_growth", terminal_growth_rate=2
+            ).calculate()
+        )
+
+        dcf_object.update(desired_annual_return=2)
+
+        with pytest.raises(AssertionError, match="terminal_growth_rate must be less than desired_annual_return"):
+            dcf_object.calculate()
+
+    def test_invalid_terminal_method(self):
+        """Tests invalid terminal assumptions are rejected."""
+
+        with pytest.raises(AssertionError, match="terminal_method must be exit_multiple or perpetuity_growth"):
+            DiscountedCashFlow(time_in_years=10, terminal_method="gordon")
+
+        with pytest.raises(AssertionError, match="terminal_growth_rate must be less than desired_annual_return"):
+            DiscountedCashFlow(
+                time_in_years=10, desired_annual_return=3, terminal_method="perpetuity_growth", terminal_growth_rate=3
+            )
+
+        with pytest.raises(AssertionError, match="solve_implied_return only supports the exit_multiple method"):
+            DiscountedCashFlow(
+                1_000_000, 5, 10, 10, 10, terminal_method="perpetuity_growth", terminal_growth_rate=3
+            ).solve_implied_return(1_000_000)
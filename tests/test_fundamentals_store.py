@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from src.discounted_cash_flow import DiscountedCashFlow
+from src.fundamentals_store import FundamentalsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FundamentalsStore.write(
+        tmp_path / "fundamentals",
+        tickers=["ABC", "XYZ", "QQQ"],
+        periods=[2022, 2023],
+        columns={
+            "revenue": [[1_000_000, 2_000_000, 3_000_000], [1_100_000, np.nan, 3_300_000]],
+            "fcf_margin": [[10, 20, 30], [11, 21, -1]],
+            "terminal_multiple": [[10, 15, 20], [12, 16, 22]],
+            "revenue_growth_rate": [[5, 6, 7], [8, 9, 10]],
+        },
+    )
+
+
+class TestFundamentalsStore:
+    def test_columns_are_memory_mapped_on_first_use(self, store):
+        """Tests a reopened store only memory-maps the columns it is asked for, read-only."""
+
+        reopened_store = FundamentalsStore(store.path)
+        values = reopened_store.select(2023, ["revenue"])["revenue"]
+
+        assert list(reopened_store._columns) == ["revenue"]
+        assert isinstance(reopened_store.column("revenue"), np.memmap)
+        assert np.shares_memory(values, reopened_store.column("revenue"))
+        assert not values.flags.writeable
+        assert values.tolist()[::2] == [1_100_000, 3_300_000]
+
+    def test_get_history(self, store):
+        """Tests FundamentalsStore.get_history() returns one ticker's values in every period."""
+
+        assert store.get_history("QQQ", ["fcf_margin"])["fcf_margin"].tolist() == [30, -1]
+        assert store.tickers == ("ABC", "XYZ", "QQQ")
+        assert store.periods == (2022, 2023)
+
+    def test_value_dcf_matches_calculate_batch(self, store):
+        """Tests FundamentalsStore.value_dcf() values every ticker of a period like DCF.calculate_batch()."""
+
+        dcf_values = store.value_dcf(2022, revenue_growth_rate="revenue_growth_rate", desired_annual_return=10)
+        expected_values = DiscountedCashFlow.calculate_batch(
+            [1_000_000, 2_000_000, 3_000_000], [5, 6, 7], 10, [10, 20, 30], 10, [10, 15, 20]
+        )
+
+        np.testing.assert_allclose(dcf_values, expected_values)
+        assert dcf_values[0] == pytest.approx(
+            DiscountedCashFlow(
+                revenue=1_000_000,
+                revenue_growth_rate=5,
+                time_in_years=10,
+                fcf_margin=10,
+                desired_annual_return=10,
+                terminal_multiple=10,
+            ).calculate()
+        )
+
+    def test_value_dcf_skips_missing_and_invalid_rows(self, store):
+        """Tests tickers with a missing or invalid input are valued as NaN without affecting the others."""
+
+        dcf_values = store.value_dcf(2023, terminal_multiple=15)
+
+        assert np.isnan(dcf_values[1])
+        assert np.isnan(dcf_values[2])
+        assert dcf_values[0] == pytest.approx(float(DiscountedCashFlow.calculate_batch(1_100_000, 0, 10, 11, 10, 15)))
+
+    def test_invalid_lookups_and_writes(self, store, tmp_path):
+        """Tests unknown columns, periods and tickers and malformed columns raise the correct errors."""
+
+        with pytest.raises(AssertionError, match="ebitda is not a column of the store"):
+            store.column("ebitda")
+
+        with pytest.raises(AssertionError, match="2030 is not a period of the store"):
+            store.select(2030, ["revenue"])
+
+        with pytest.raises(AssertionError, match="AAA is not a ticker of the store"):
+            store.get_history("AAA", ["revenue"])
+
+        with pytest.raises(AssertionError, match="revenue must have one row per period"):
+            FundamentalsStore.write(tmp_path / "invalid", ["ABC"], [2022, 2023], {"revenue": [[1]]})
+
+        with pytest.raises(AssertionError, match="tickers must be unique"):
+            FundamentalsStore.write(tmp_path / "invalid", ["ABC", "ABC"], [2022], {})
@@ -0,0 +1,148 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
+from src.job_queue import JOB_TYPES, MAX_SIMULATION_PATHS, JobQueue, JobQueueFull
+
+
+class TestJobQueue:
+    def test_job_runs_in_worker_process(self):
+        """Tests a job runs in the process pool and records its timing."""
+
+        job_queue = JobQueue(max_workers=1)
+        parameters = {"starting_values": [100, 100], "ending_values": [200, 50], "time_in_years": [10, 5]}
+
+        try:
+            job_id = job_queue.submit("cagr_batch", parameters)
+            job = job_queue.wait(job_id, timeout=10)
+
+        finally:
+            job_queue.shutdown()
+
+        assert job["status"] == "succeeded"
+        assert job["error"] is None
+        assert job["submitted_at"] <= job["started_at"] <= job["finished_at"]
+        assert job["queue_seconds"] >= 0
+        assert job["run_seconds"] >= 0
+        assert job_queue.get_result(job_id)["cagr"] == pytest.approx(
+            CompoundedAnnualGrowthRate.calculate_batch(**parameters).tolist()
+        )
+        assert job_queue.get_stats()["succeeded"] == 1
+
+    def test_failed_job(self):
+        """Tests invalid job parameters fail the job instead of raising."""
+
+        job_queue = JobQueue(executor_factory=ThreadPoolExecutor)
+
+        try:
+            job = job_queue.wait(
+                job_queue.submit("dcf_simulation", {"assumptions": {"time_in_years": 10}, "n_paths": 0}), timeout=10
+            )
+
+        finally:
+            job_queue.shutdown()
+
+        assert job["status"] == "failed"
+        assert job["error"] == "n_paths must be greater than 0"
+        assert job_queue.get_result(job["id"]) is None
+        assert job_queue.get_stats()["failed"] == 1
+
+    def test_simulation_paths_are_capped(self):
+        """Tests a simulation job with more than MAX_SIMULATION_PATHS paths fails before allocating any path."""
+
+        job_queue = JobQueue(executor_factory=ThreadPoolExecutor)
+        parameters = {"assumptions": {"time_in_years": 10}, "n_paths": MAX_SIMULATION_PATHS + 1}
+
+        try:
+            job = job_queue.wait(job_queue.submit("dcf_simulation", parameters), timeout=10)
+
+        finally:
+            job_queue.shutdown()
+
+        assert job["status"] == "failed"
+        assert job["error"] == f"n_paths must be less than or equal to {MAX_SIMULATION_PATHS}"
+
+    def test_dead_worker_is_replaced(self, monkeypatch):
+        """Tests a worker process dying fails its job, and the next submit replaces the broken pool."""
+
+        monkeypatch.setitem(JOB_TYPES, "crash", lambda: os._exit(1))
+
+        job_queue = JobQueue(max_workers=1)
+        parameters = {"starting_values": 1, "ending_values": 2, "time_in_years": 1}
+
+        try:
+            crashed_job = job_queue.wait(job_queue.submit("crash", {}), timeout=10)
+            job = job_queue.wait(job_queue.submit("cagr_batch", parameters), timeout=10)
+
+        finally:
+            job_queue.shutdown()
+
+        assert crashed_job["status"] == "failed"
+        assert job["status"] == "succeeded"
+        assert job_queue.get_stats()["submitted"] == 2
+
+    def test_backpressure(self):
+        """Tests jobs are rejected with JobQueueFull while max_pending jobs are pending."""
+
+        release = threading.Event()
+
+        class BlockedExecutor(ThreadPoolExecutor):
+            def submit(self, function, *arguments):
+                return super().submit(lambda: release.wait() and function(*arguments))
+
+        job_queue = JobQueue(max_pending=2, executor_factory=BlockedExecutor)
+        parameters = {"starting_values": 1, "ending_values": 2, "time_in_years": 1}
+
+        try:
+            job_ids = [job_queue.submit("cagr_batch", parameters) for _ in range(2)]
+
+            with pytest.raises(JobQueueFull, match="2 jobs are already pending"):
+                job_queue.submit("cagr_batch", parameters)
+
+            assert job_queue.get_stats()["rejected"] == 1
+
+            release.set()
+
+            assert [job_queue.wait(job_id, timeout=10)["status"] for job_id in job_ids] == ["succeeded"] * 2
+
+            job_queue.submit("cagr_batch", parameters)
+
+        finally:
+            release.set()
+            job_queue.shutdown()
+
+        assert job_queue.get_stats()["submitted"] == 3
+
+    def test_finished_jobs_are_forgotten(self):
+        """Tests only the last max_finished finished jobs are kept."""
+
+        job_queue = JobQueue(max_finished=2, executor_factory=ThreadPoolExecutor)
+        parameters = {"starting_values": 1, "ending_values": 2, "time_in_years": 1}
+
+        try:
+            job_ids = [job_queue.submit("cagr_batch", parameters) for _ in range(3)]
+
+            for job_id in job_ids:
+                job_queue.wait(job_id, timeout=10)
+
+        finally:
+            job_queue.shutdown()
+
+        assert job_queue.get(job_ids[0]) is None
+        assert [job_queue.get(job_id)["status"] for job_id in job_ids[1:]] == ["succeeded"] * 2
+
+    def test_invalid_job(self):
+        """Tests unsupported job types and parameters are rejected on submit."""
+
+        job_queue = JobQueue(executor_factory=ThreadPoolExecutor)
+
+        with pytest.raises(AssertionError, match="unknown is not a supported job type"):
+            job_queue.submit("unknown", {})
+
+        with pytest.raises(AssertionError, match="parameters must be of type dict"):
+            job_queue.submit("dcf_bulk", [])
+
+        assert job_queue.get("unknown") is None
@@ -0,0 +1,62 @@
+import pytest
+
+from src.metrics import RequestMetrics, format_metric
+
+
+class TestRequestMetrics:
+    def test_histogram_buckets_are_cumulative(self):
+        """Tests observations are rendered as cumulative Prometheus histogram buckets."""
+
+        request_metrics = RequestMetrics(buckets=(0.1, 1))
+
+        for seconds in (0.05, 0.1, 0.5, 2):
+            request_metrics.observe("/dcf-calculator", "calculate", seconds)
+
+        lines = request_metrics.render().splitlines()
+        labels = 'route="/dcf-calculator",phase="calculate"'
+
+        assert "# TYPE valuation_request_phase_seconds histogram" in lines
+        assert f'valuation_request_phase_seconds_bucket{{{labels},le="0.1"}} 2' in lines
+        assert f'valuation_request_phase_seconds_bucket{{{labels},le="1"}} 3' in lines
+        assert f'valuation_request_phase_seconds_bucket{{{labels},le="+Inf"}} 4' in lines
+        assert f"valuation_request_phase_seconds_sum{{{labels}}} 2.65" in lines
+        assert f"valuation_request_phase_seconds_count{{{labels}}} 4" in lines
+
+    def test_time_records_block_duration(self):
+        """Tests time() records the duration of its block, also if the block raises."""
+
+        times = iter([1.0, 1.5, 2.0, 4.0])
+        request_metrics = RequestMetrics(buckets=(1, 10), clock=lambda: next(times))
+
+        with request_metrics.time("/", "render"):
+            pass
+
+        with pytest.raises(ValueError):
+            with request_metrics.time("/", "render"):
+                raise ValueError
+
+        assert 'valuation_request_phase_seconds_sum{route="/",phase="render"} 2.5' in request_metrics.render()
+
+    def test_request_counter(self):
+        """Tests finished requests are counted per route, method and status."""
+
+        request_metrics = RequestMetrics()
+        request_metrics.count_request("/api/v1/dcf", "POST", 200)
+        request_metrics.count_request("/api/v1/dcf", "POST", 200)
+        request_metrics.count_request("/api/v1/dcf", "POST", 400)
+
+        lines = request_metrics.render().splitlines()
+
+        assert 'valuation_requests_total{route="/api/v1/dcf",method="POST",status="200"} 2' in lines
+        assert 'valuation_requests_total{route="/api/v1/dcf",method="POST",status="400"} 1' in lines
+
+        request_metrics.reset()
+
+        assert "valuation_requests_total{" not in request_metrics.render()
+
+    def test_format_metric(self):
+        """Tests metric families are formatted with escaped label values."""
+
+        assert format_metric("size", "gauge", "Cached values.", [("", {}, 3), ("", {"name": 'a"b'}, 4)]) == (
+            "# HELP size Cached values.\n" "# TYPE size gauge\n" "size 3\n" 'size{name="a\\"b"} 4\n'
+        )
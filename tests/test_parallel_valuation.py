@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
+from src.discounted_cash_flow import DiscountedCashFlow
+from src.parallel_valuation import ParallelValuationRunner, get_line_ranges, read_line_range
+
+
+@pytest.fixture
+def dcf_columns():
+    generator = np.random.default_rng(0)
+    number_of_rows = 1_001
+
+    return {
+        "revenue": generator.uniform(0, 1_000_000, number_of_rows),
+        "revenue_growth_rate": generator.uniform(-5, 20, number_of_rows),
+        "time_in_years": generator.integers(1, 15, number_of_rows),
+        "fcf_margin": generator.uniform(0, 30, number_of_rows),
+        "desired_annual_return": 10,
+        "terminal_multiple": generator.uniform(5, 25, number_of_rows),
+    }
+
+
+class TestParallelValuationRunner:
+    def test_in_process_matches_calculate_batch(self, dcf_columns):
+        """Tests the shards valued in this process add up to calculate_batch() in row order."""
+
+        with ParallelValuationRunner(shards_per_worker=3) as runner:
+            values, shard_timings = runner.run("dcf", dcf_columns)
+
+        assert np.array_equal(values, DiscountedCashFlow.calculate_batch(**dcf_columns))
+        assert [(timing["start"], timing["stop"]) for timing in shard_timings] == [(0, 333), (333, 667), (667, 1001)]
+        assert all(timing["seconds"] >= 0 for timing in shard_timings)
+
+    def test_worker_processes_keep_row_order(self, dcf_columns):
+        """Tests worker processes value the shared columns in row order and the pool is reused between runs."""
+
+        with ParallelValuationRunner(workers=2) as runner:
+            values, shard_timings = runner.run("dcf", dcf_columns)
+            executor = runner._executor
+            scenario_values, _ = runner.run("dcf", dict(dcf_columns, desired_annual_return=12))
+
+            assert runner._executor is executor
+
+        assert runner._executor is None
+        assert len(shard_timings) == 8
+        assert np.array_equal(values, DiscountedCashFlow.calculate_batch(**dcf_columns))
+        assert np.array_equal(
+            scenario_values, DiscountedCashFlow.calculate_batch(**dict(dcf_columns, desired_annual_return=12))
+        )
+
+    def test_invalid_rows_are_nan(self):
+        """Tests rows with an invalid input get NaN without affecting the other rows."""
+
+        with ParallelValuationRunner() as runner:
+            values, _ = runner.run(
+                "cagr", {"starting_value": [100, 0, 100], "ending_value": [200, 200, 50], "time_in_years": 10}
+            )
+
+        assert np.isnan(values[1])
+        assert values[[0, 2]] == pytest.approx(CompoundedAnnualGrowthRate.calculate_batch([100, 100], [200, 50], 10))
+
+    def test_missing_column(self, dcf_columns):
+        """Tests every column of the kernel is required."""
+
+        del dcf_columns["revenue"]
+
+        with pytest.raises(AssertionError, match="revenue is missing"):
+            ParallelValuationRunner().run("dcf", dcf_columns)
+
+
+class TestLineRanges:
+    def test_ranges_start_at_lines(self, tmp_path):
+        """Tests the ranges start at line starts after the header and together read every line once, in order."""
+
+        path = tmp_path / "input.csv"
+        lines = ["header\n"] + [f"{index},{'x' * index}\n" for index in range(50)]
+        path.write_text("".join(lines))
+
+        line_ranges = get_line_ranges(path, 4, start=len(lines[0]))
+
+        assert len(line_ranges) == 4
+        assert line_ranges[0][0] == len(lines[0])
+        assert line_ranges[-1][1] == path.stat().st_size
+        assert [line for start, stop in line_ranges for line in read_line_range(path, start, stop)] == lines[1:]
+
+    def test_more_shards_than_lines(self, tmp_path):
+        """Tests a file with fewer lines than shards gets one range per line."""
+
+        path = tmp_path / "input.ndjson"
+        path.write_text("{}\n{}\n")
+
+        assert get_line_ranges(path, 8) == [(0, 3), (3, 6)]
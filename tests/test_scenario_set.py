@@ -0,0 +1,90 @@
+import pytest
+
+from src.discounted_cash_flow import DiscountedCashFlow
+from src.scenario_set import ScenarioSet
+
+
+@pytest.fixture
+def discounted_cash_flow():
+    return DiscountedCashFlow(
+        revenue=1_000_000,
+        revenue_growth_rate=8,
+        time_in_years=10,
+        fcf_margin=10,
+        desired_annual_return=10,
+        terminal_multiple=15,
+    )
+
+
+class TestScenarioSet:
+    def test_evaluate(self, discounted_cash_flow):
+        """Tests every scenario matches a DiscountedCashFlow with its overrides, weighted by its probability."""
+
+        scenario_set = ScenarioSet(
+            {
+                "bull": {"revenue_growth_rate": 15, "terminal_multiple": 25, "probability": 20},
+                "base": {"probability": 50},
+                "bear": {"revenue_growth_rate": 2, "fcf_margin": 8, "time_in_years": 5, "probability": 30},
+            }
+        )
+
+        result = scenario_set.evaluate(discounted_cash_flow)
+        expected_values = {
+            name: DiscountedCashFlow(**dict(discounted_cash_flow._get_assumptions(), **overrides)).calculate()
+            for name, overrides in scenario_set.assumption_sets.items()
+        }
+
+        assert result["values"] == pytest.approx(expected_values, rel=1e-9)
+        assert result["weighted_value"] == pytest.approx(
+            0.2 * expected_values["bull"] + 0.5 * expected_values["base"] + 0.3 * expected_values["bear"]
+        )
+
+    def test_equal_weights_without_probabilities(self, discounted_cash_flow):
+        """Tests scenarios without probabilities are weighted equally."""
+
+        scenario_set = ScenarioSet({"low": {"terminal_multiple": 10}, "high": {"terminal_multiple": 20}})
+
+        result = scenario_set.evaluate(discounted_cash_flow)
+
+        assert scenario_set.probabilities == {"low": 50, "high": 50}
+        assert result["weighted_value"] == pytest.approx(discounted_cash_flow.calculate())
+
+    def test_perpetuity_growth_base(self):
+        """Tests scenarios use the perpetuity growth terminal method of the base, with their own growth rates."""
+
+        discounted_cash_flow = DiscountedCashFlow(
+            1_000_000, 8, 10, 10, 10, terminal_method="perpetuity_growth", terminal_growth_rate=2
+        )
+        scenario_set = ScenarioSet({"base": {}, "high": {"terminal_growth_rate": 4, "desired_annual_return": 12}})
+
+        result = scenario_set.evaluate(discounted_cash_flow)
+
+        assert result["values"]["base"] == pytest.approx(discounted_cash_flow.calculate())
+        assert result["values"]["high"] == pytest.approx(
+            discounted_cash_flow.update(terminal_growth_rate=4, desired_annual_return=12).calculate()
+        )
+
+    @pytest.mark.parametrize(
+        "scenarios, message",
+        [
+            ({}, "scenarios must not be empty"),
+            ({"bear": {"discount": 5}}, "discount is not a DCF assumption"),
+            ({"bear": {"time_in_years": 2.5}}, "time_in_years must be of type int"),
+            ({"bull": {"probability": 40}, "bear": {}}, "either every scenario or none must have a probability"),
+            ({"bull": {"probability": 40}, "bear": {"probability": 40}}, "probabilities must add up to 100"),
+            ({"bull": {"probability": -10}}, "probability must be greater than or equal to 0"),
+        ],
+    )
+    def test_invalid_scenarios(self, scenarios, message):
+        """Tests invalid scenarios are rejected with the constructor's messages."""
+
+        with pytest.raises(AssertionError, match=message):
+            ScenarioSet(scenarios)
+
+    def test_schedules_are_not_supported(self):
+        """Tests a base DCF with schedules is rejected."""
+
+        discounted_cash_flow = DiscountedCashFlow(1_000_000, 8, 2, 10, 10, 15, revenue_growth_schedule=[5, 6])
+
+        with pytest.raises(AssertionError, match="scenarios do not support schedules"):
+            ScenarioSet({"base": {}}).evaluate(discounted_cash_flow)
@@ -0,0 +1,103 @@
+import pytest
+
+from src.compounded_annual_growth_rate import CompoundedAnnualGrowthRate
+from src.discounted_cash_flow import DiscountedCashFlow
+from src.valuation_cache import ValuationCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+class TestValuationCache:
+    def test_make_key_is_independent_of_parameter_order(self):
+        """Tests ValuationCache.make_key() normalizes parameter order and sequences."""
+
+        key = ValuationCache.make_key("DCF", revenue=10.0, time_in_years=5, schedule=[1, 2])
+
+        assert key == ValuationCache.make_key("DCF", schedule=(1.0, 2.0), time_in_years=5, revenue=10.0)
+        assert key != ValuationCache.make_key("CAGR", revenue=10.0, time_in_years=5, schedule=[1, 2])
+        assert key != ValuationCache.make_key("DCF", revenue=10.0, time_in_years=5.0, schedule=[1, 2])
+
+    def test_get_counts_hits_and_misses(self):
+        """Tests ValuationCache.get() returns cached values and counts hits and misses."""
+
+        cache = ValuationCache()
+
+        assert cache.get("key") is None
+
+        cache.put("key", 1)
+
+        assert cache.get("key") == 1
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_put_evicts_least_recently_used(self):
+        """Tests ValuationCache.put() evicts the least recently used value once max_size is exceeded."""
+
+        cache = ValuationCache(max_size=2)
+
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_get_expires_values_after_ttl(self):
+        """Tests ValuationCache.get() misses once a value is older than ttl."""
+
+        clock = FakeClock()
+        cache = ValuationCache(ttl=10, clock=clock)
+
+        cache.put("key", 1)
+        clock.time = 9
+
+        assert cache.get("key") == 1
+
+        clock.time = 10
+
+        assert cache.get("key") is None
+        assert cache.get_stats()["expirations"] == 1
+        assert len(cache) == 0
+
+    def test_calculate_only_constructs_on_miss(self):
+        """Tests ValuationCache.calculate() returns calculate() and reuses it for identical parameters."""
+
+        cache = ValuationCache()
+        parameters = {
+            "revenue": 1_000_000,
+            "revenue_growth_rate": 5,
+            "time_in_years": 10,
+            "fcf_margin": 10,
+            "desired_annual_return": 10,
+            "terminal_multiple": 10,
+        }
+
+        assert round(cache.calculate(DiscountedCashFlow, **parameters), 2) == 1_409_189.67
+        assert round(cache.calculate(DiscountedCashFlow, **parameters), 2) == 1_409_189.67
+        assert (
+            round(cache.calculate(CompoundedAnnualGrowthRate, starting_value=100, ending_value=200, time_in_years=5), 2)
+            == 14.87
+        )
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 2
+
+    def test_calculate_does_not_cache_errors(self):
+        """Tests ValuationCache.calculate() raises constructor errors every time without caching them."""
+
+        cache = ValuationCache()
+
+        for attempt in range(2):
+            with pytest.raises(AssertionError, match="starting_value must be greater than 0"):
+                cache.calculate(CompoundedAnnualGrowthRate, starting_value=0, ending_value=100, time_in_years=10)
+
+        assert len(cache) == 0
@@ -0,0 +1,33 @@
+import json
+
+from src.valuation_trace import ValuationTrace
+
+
+class TestValuationTrace:
+    def test_record_year_merges_components(self):
+        """Tests components recorded for the same year are merged and years are exported in order."""
+
+        trace = ValuationTrace()
+        trace.record_year(2, revenue=20)
+        trace.record_year(1, revenue=10)
+        trace.record_year(2, present_value=15)
+
+        assert trace.to_dict()["years"] == [{"year": 1, "revenue": 10}, {"year": 2, "revenue": 20, "present_value": 15}]
+
+    def test_to_json(self):
+        """Tests ValuationTrace.to_json() round-trips through json.loads()."""
+
+        trace = ValuationTrace()
+        trace.assumptions = {"revenue": 10}
+        trace.record_year(1, revenue=10)
+        trace.terminal["terminal_value"] = 5
+        trace.timings["calculate"] = 0.5
+        trace.result = 15
+
+        assert json.loads(trace.to_json(indent=4)) == {
+            "assumptions": {"revenue": 10},
+            "years": [{"year": 1, "revenue": 10}],
+            "terminal": {"terminal_value": 5},
+            "timings": {"calculate": 0.5},
+            "result": 15,
+        }
@@ -0,0 +1,141 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.value_cli import main
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_INPUT = (
+    "ticker,revenue,revenue_growth_rate,time_in_years,fcf_margin,desired_annual_return,terminal_multiple\n"
+    "ABC,1000000,5,10,10,10,10\n"
+    "XYZ,-1,5,10,10,10,10\n"
+)
+
+
+class TestValueCli:
+    def test_dcf_csv_to_csv(self, tmp_path, capsys):
+        """Tests valuing a CSV file writes a CSV file with a DCF value or error per row and a summary."""
+
+        input_path = tmp_path / "input.csv"
+        output_path = tmp_path / "output.csv"
+        input_path.write_text(CSV_INPUT)
+
+        exit_status = main(["dcf", str(input_path), "--output", str(output_path), "--chunk-size", "1"])
+
+        assert exit_status == 1
+        assert output_path.read_text().splitlines() == [
+            "ticker,dcf_value,error",
+            "ABC,1409189.6682039495,",
+            "XYZ,,revenue must be greater than or equal to 0",
+        ]
+        assert "Valued 2 rows (1 with errors)" in capsys.readouterr().err
+
+    def test_dcf_ndjson_to_stdout(self, tmp_path, capsys):
+        """Tests an NDJSON input is detected from its extension and written to standard output as NDJSON."""
+
+        input_path = tmp_path / "input.ndjson"
+        row = {
+            "ticker": "ABC",
+            "revenue": 1_000_000,
+            "revenue_growth_rate": 5,
+            "time_in_years": 10,
+            "fcf_margin": 10,
+            "desired_annual_return": 10,
+            "terminal_multiple": 10,
+        }
+        input_path.write_text(json.dumps(row) + "\n\n")
+
+        assert main(["dcf", str(input_path), "--quiet"]) == 0
+
+        captured = capsys.readouterr()
+
+        assert [json.loads(line) for line in captured.out.splitlines()] == [
+            {"ticker": "ABC", "dcf_value": pytest.approx(1_409_189.67)}
+        ]
+        assert captured.err == ""
+
+    def test_module_reads_standard_input(self):
+        """Tests python -m src.value_cli streams standard input to standard output."""
+
+        completed_process = subprocess.run(
+            [sys.executable, "-m", "src.value_cli", "dcf", "-", "--output-format", "ndjson", "-q"],
+            input=CSV_INPUT,
+            capture_output=True,
+            text=True,
+            cwd=REPOSITORY_ROOT,
+        )
+
+        assert completed_process.returncode == 1
+        assert [json.loads(line) for line in completed_process.stdout.splitlines()] == [
+            {"ticker": "ABC", "dcf_value": pytest.approx(1_409_189.67)},
+            {"ticker": "XYZ", "error": "revenue must be greater than or equal to 0"},
+        ]
+
+    def test_invalid_chunk_size(self, tmp_path):
+        """Tests a chunk size of 0 is rejected."""
+
+        with pytest.raises(SystemExit):
+            main(["dcf", str(tmp_path / "input.csv"), "--chunk-size", "0"])
+
+    @pytest.mark.parametrize("extension", [".csv", ".ndjson"])
+    def test_workers_match_sequential_output(self, tmp_path, capsys, extension):
+        """Tests valuing the input in worker processes writes the same output, in input order, with shard timings."""
+
+        input_path = tmp_path / f"input{extension}"
+        rows = [
+            {
+                "ticker": f"T{index}",
+                "revenue": 1_000 * index - 1_000,
+                "revenue_growth_rate": index % 7,
+                "time_in_years": 1 + index % 12,
+                "fcf_margin": 10,
+                "desired_annual_return": 10,
+                "terminal_multiple": 15,
+            }
+            for index in range(200)
+        ]
+
+        if extension == ".csv":
+            input_path.write_text(
+                ",".join(rows[0]) + "\n" + "".join(",".join(map(str, row.values())) + "\n" for row in rows)
+            )
+
+        else:
+            input_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+        assert main(["dcf", str(input_path), "-o", str(tmp_path / "sequential"), "-q"]) == 1
+        assert main(["dcf", str(input_path), "-o", str(tmp_path / "parallel"), "--workers", "2"]) == 1
+        assert (tmp_path / "parallel").read_text() == (tmp_path / "sequential").read_text()
+
+        summary = capsys.readouterr().err
+
+        assert "Shard 8/8" in summary
+        assert "Valued 200 rows (1 with errors)" in summary
+
+    def test_workers_need_an_input_file(self):
+        """Tests --workers cannot read standard input."""
+
+        with pytest.raises(SystemExit):
+            main(["dcf", "-", "--workers", "2"])
+
+    @pytest.mark.parametrize("workers", [[], ["--workers", "2"]])
+    def test_malformed_lines_are_reported(self, tmp_path, capsys, workers):
+        """Tests malformed NDJSON lines get an error row and exit status 1, keeping the CSV header and other rows."""
+
+        input_path = tmp_path / "input.ndjson"
+        output_path = tmp_path / "output.csv"
+        row = json.dumps(dict(zip(*(line.split(",") for line in CSV_INPUT.splitlines()[:2]))))
+        input_path.write_text(f'not json\n{row}\n["ABC"]\n{row}\n')
+
+        exit_status = main(["dcf", str(input_path), "-o", str(output_path), "--chunk-size", "1", *workers])
+
+        lines = output_path.read_text().splitlines()
+
+        assert exit_status == 1
+        assert lines[0] == "ticker,dcf_value,error"
+        assert lines[1].startswith(",,line 1 is not valid JSON: ")
+        assert lines[2:] == ["ABC,1409189.6682039495,", ",,row must be a JSON object", "ABC,1409189.6682039495,"]
+        assert "Valued 4 rows (2 with errors)" in capsys.readouterr().err